@@ -1,5 +1,10 @@
+import ast
 import json
 import os
+import py_compile
+import sys
+
+import pytest
 
 try:
     import doppel_analyze
@@ -56,3 +61,908 @@ class TestAnalyzePy:
                 ],
                 pkg_name,
             )
+
+    def test_static_mode(self, tmp_path):
+        """
+        analyze.py --mode static should produce the same
+        description as importing the package
+        """
+        for pkg_name in self.TEST_PACKAGES + ["pythonspecific2"]:
+            results = {}
+            for mode in ["import", "static"]:
+                output_dir = tmp_path / mode
+                output_dir.mkdir(exist_ok=True)
+                args = doppel_analyze.parse_args(
+                    [
+                        "--pkg",
+                        pkg_name,
+                        "--output_dir",
+                        str(output_dir),
+                        "--kwargs-string",
+                        "~~kwargs~~",
+                        "--constructor-string",
+                        "~~CONSTRUCTOR~~",
+                        "--mode",
+                        mode,
+                    ]
+                )
+                doppel_analyze.do_everything(args)
+                with open(output_dir / f"python_{pkg_name}.json", "r") as f:
+                    results[mode] = json.loads(f.read())
+            assert results["static"] == results["import"]
+
+    def test_static_class_shadowing_import(self, tmp_path, monkeypatch):
+        """
+        analyze.py --mode static should resolve the bases of a class when
+        its 'class' statement runs, so a class that extends the import it
+        replaces isn't its own base, and should skip 'if __name__ == "__main__"'
+        """
+        pkg_dir = tmp_path / "shadowpkg"
+        pkg_dir.mkdir()
+        (pkg_dir / "_impl.py").write_text(
+            "class Foo:\n"
+            "    def __init__(self, a):\n        pass\n"
+            "    def method(self, b):\n        pass\n"
+            "class Error(ValueError):\n    pass\n"
+        )
+        (pkg_dir / "__init__.py").write_text(
+            "from ._impl import Foo, Error\n"
+            "class Foo(Foo):\n"
+            "    def extra(self, c):\n        pass\n"
+            "class Error(Error):\n    pass\n"
+            "if __name__ == '__main__':\n"
+            "    def main():\n        pass\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        results = {
+            mode: doppel_analyze.describe_package(
+                pkg_name="shadowpkg",
+                kwargs_string="~~kwargs~~",
+                constructor_string="~~CONSTRUCTOR~~",
+                mode=mode,
+            )
+            for mode in ["import", "static"]
+        }
+        assert results["static"] == results["import"]
+        assert set(results["static"]["classes"]["Foo"]["public_methods"]) == {
+            "~~CONSTRUCTOR~~",
+            "method",
+            "extra",
+        }
+        assert "main" not in results["static"]["functions"]
+
+    def test_package_name_prefix(self, tmp_path, monkeypatch):
+        """
+        analyze.py should not treat a package whose name starts with
+        the name of the package being described as part of it
+        """
+        (tmp_path / "leakpkgfoo.py").write_text(
+            "def helper(a):\n    pass\n" "class Base:\n" "    def method(self, b):\n        pass\n"
+        )
+        (tmp_path / "leakpkg.py").write_text(
+            "from leakpkgfoo import helper, Base\n"
+            "def own(c):\n    pass\n"
+            "class Thing(Base):\n    pass\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        for mode in ["import", "static"]:
+            sidecar_file = tmp_path / f"{mode}.sidecar.json"
+            out = doppel_analyze.describe_package(
+                pkg_name="leakpkg",
+                kwargs_string="~~kwargs~~",
+                constructor_string="~~CONSTRUCTOR~~",
+                mode=mode,
+                sidecar_file=str(sidecar_file) if mode == "import" else None,
+            )
+            assert out["functions"] == {"own": {"args": ["c"]}}, mode
+            assert list(out["classes"]) == ["Thing"], mode
+        sidecar = json.loads((tmp_path / "import.sidecar.json").read_text())
+        assert sidecar["modules"]["leakpkg"]["depends_on"] == ["leakpkg"]
+
+    def test_static_builtin_and_generic_bases(self, tmp_path, monkeypatch):
+        """
+        analyze.py --mode static should inherit methods through subscripted
+        bases like 'Base[int]', and describe named tuples, typed dicts and
+        other subclasses of built-in classes like importing does
+        """
+        (tmp_path / "basespkg.py").write_text(
+            "import collections\n"
+            "import typing\n"
+            "from collections import namedtuple\n"
+            "from typing import Generic, NamedTuple, TypeVar\n"
+            "T = TypeVar('T')\n"
+            "class Base(Generic[T]):\n"
+            "    def convert(self, value):\n        pass\n"
+            "class IntType(Base[int]):\n    pass\n"
+            "Line = namedtuple('Line', ['begin', 'end'])\n"
+            "Row = collections.namedtuple('Row', 'a b')\n"
+            "Point = NamedTuple('Point', [('x', int)])\n"
+            "_name = 'Dynamic'\n"
+            "Dynamic = namedtuple(_name, 'a')\n"
+            "class DataRow(Line):\n"
+            "    def width(self):\n        pass\n"
+            "class TableFormat(NamedTuple):\n"
+            "    lineabove: Line\n"
+            "    padding: int = 0\n"
+            "    def total(self, extra):\n        pass\n"
+            "class Info(typing.TypedDict):\n    name: str\n"
+            "class Registry(dict):\n"
+            "    def register(self, name):\n        pass\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        results = {
+            mode: doppel_analyze.describe_package(
+                pkg_name="basespkg",
+                kwargs_string="~~kwargs~~",
+                constructor_string="~~CONSTRUCTOR~~",
+                mode=mode,
+            )
+            for mode in ["import", "static"]
+        }
+        assert results["static"] == results["import"]
+        classes = results["static"]["classes"]
+        assert "convert" in classes["IntType"]["public_methods"]
+        assert set(classes["Line"]["public_methods"]) == {"~~CONSTRUCTOR~~", "count", "index"}
+        assert {"Row", "Point", "Dynamic", "DataRow", "TableFormat"} <= set(classes)
+        assert {"width", "count"} <= set(classes["DataRow"]["public_methods"])
+        assert {"keys", "register"} <= set(classes["Registry"]["public_methods"])
+        assert "keys" in classes["Info"]["public_methods"]
+
+    def test_static_module_statements(self, tmp_path, monkeypatch):
+        """
+        analyze.py --mode static should follow the imports, assignments and
+        compound statements in a package the way importing it would
+        """
+        pkg_dir = tmp_path / "stmtpkg"
+        (pkg_dir / "sub").mkdir(parents=True)
+        (pkg_dir / "nspkg").mkdir()
+        (pkg_dir / "nspkg" / "inner.py").write_text("def inner_func(i):\n    pass\n")
+        (pkg_dir / "sub" / "__init__.py").write_text(
+            "from .. import _base as base_module\n"
+            "from .leaf import *\n"
+            "from ..nspkg import inner\n"
+            "__all__ = ['leaf_func']\n"
+            "__all__ += ['inner']\n"
+            "__all__ += some_list\n"
+        )
+        (pkg_dir / "sub" / "leaf.py").write_text(
+            "__all__ = ('leaf_func', 'missing_name')\n" "def leaf_func(a):\n    pass\n"
+        )
+        (pkg_dir / "_base.py").write_text(
+            "import os\n"
+            "class Base:\n"
+            "    def __init__(self, a):\n        pass\n"
+            "    class Options:\n"
+            "        pass\n"
+            "    class Settings:\n"
+            "        def __init__(self, verbose):\n            pass\n"
+            "    path_join = os.path.join\n"
+            "    if os.name:\n"
+            "        def named(self):\n            pass\n"
+            "    if os.name == 'nt':\n"
+            "        def win(self):\n            pass\n"
+            "    else:\n"
+            "        def posix(self):\n            pass\n"
+            "    try:\n"
+            "        def tried(self):\n            pass\n"
+            "    except ImportError:\n"
+            "        pass\n"
+            "    else:\n"
+            "        def tried_else(self):\n            pass\n"
+            "    finally:\n"
+            "        def tried_finally(self):\n            pass\n"
+            "    @property\n"
+            "    def prop(self):\n        pass\n"
+            "    @prop.setter\n"
+            "    def prop(self, value):\n        pass\n"
+            "    label: str = 'base'\n"
+            "    length = len\n"
+            "    tried_alias = tried\n"
+        )
+        (pkg_dir / "__init__.py").write_text(
+            "import os.path\n"
+            "import json as _json\n"
+            "import stmtpkg.sub\n"
+            "import stmtpkg.nspkg.inner as inner_alias\n"
+            "from os import path as os_path\n"
+            "from . import sub\n"
+            "from ._base import Base\n"
+            "from .sub import leaf_func, not_there\n"
+            "from ._base import *\n"
+            "from json import *\n"
+            "from . import nspkg\n"
+            "from .nspkg import inner\n"
+            "try:\n"
+            "    from .not_a_module import *\n"
+            "except ImportError:\n"
+            "    pass\n"
+            "lam = lambda x, y: None\n"
+            "leaf_alias = sub.leaf_func\n"
+            "here = __file__\n"
+            "annotated: int\n"
+            "max_value = max\n"
+            "Mapping = dict\n"
+            "DumpFunc = _json.dumps\n"
+            "counter = 0\n"
+            "counter += 1\n"
+            "def removed(a):\n    pass\n"
+            "del removed\n"
+            "del os_path.sep, counter\n"
+            "async def fetch(url):\n    pass\n"
+            "with open(__file__) as _f:\n"
+            "    def in_with(b):\n        pass\n"
+            "try:\n"
+            "    import ujson as _fast_json\n"
+            "except ImportError:\n"
+            "    _fast_json = None\n"
+            "else:\n"
+            "    def fast(c):\n        pass\n"
+            "finally:\n"
+            "    def always(d):\n        pass\n"
+            "if __name__ == 'stmtpkg':\n"
+            "    def imported(e):\n        pass\n"
+            "if unknown_flag:\n"
+            "    def maybe(f):\n        pass\n"
+            "else:\n"
+            "    def maybe_not(g):\n        pass\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        out = doppel_analyze.describe_package(
+            pkg_name="stmtpkg",
+            kwargs_string="~~kwargs~~",
+            constructor_string="~~CONSTRUCTOR~~",
+            mode="static",
+        )
+        # static mode assumes 'try' blocks succeed
+        assert set(out["functions"]) == {
+            "always",
+            "fast",
+            "fetch",
+            "imported",
+            "in_with",
+            "inner_func",
+            "lam",
+            "leaf_alias",
+            "leaf_func",
+            "maybe",
+            "maybe_not",
+        }
+        methods = out["classes"]["Base"]["public_methods"]
+        posix = "posix" if os.name != "nt" else "win"
+        assert set(methods) == {
+            "~~CONSTRUCTOR~~",
+            "Options",
+            "Settings",
+            "length",
+            "named",
+            posix,
+            "tried",
+            "tried_alias",
+            "tried_else",
+            "tried_finally",
+        }
+        assert methods["Options"] == {"args": ["~~kwargs~~"]}
+        assert methods["Settings"] == {"args": ["verbose"]}
+        assert methods["length"] == {"args": []}
+
+        with pytest.raises(ModuleNotFoundError):
+            doppel_analyze.describe_package(
+                pkg_name="not_a_package",
+                kwargs_string="~~kwargs~~",
+                constructor_string="~~CONSTRUCTOR~~",
+                mode="static",
+            )
+
+    def test_static_sourceless_module(self, tmp_path, monkeypatch, caplog):
+        """
+        analyze.py --mode static should warn about modules
+        it can't parse, like ones without source code
+        """
+        source = tmp_path / "compiledpkg.py"
+        source.write_text("def func(a):\n    pass\n")
+        py_compile.compile(str(source), cfile=str(tmp_path / "compiledpkg.pyc"))
+        source.unlink()
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        out = doppel_analyze.describe_package(
+            pkg_name="compiledpkg",
+            kwargs_string="~~kwargs~~",
+            constructor_string="~~CONSTRUCTOR~~",
+            mode="static",
+        )
+        assert out["functions"] == {}
+        assert "is not pure Python" in caplog.text
+
+    @pytest.mark.parametrize(
+        "test, expected",
+        [
+            ("True", True),
+            ("(1, 2) > (1, 1)", True),
+            ("TYPE_CHECKING", False),
+            ("typing.TYPE_CHECKING", False),
+            ("__name__ == '__main__'", False),
+            ("__name__ == 'pkg'", True),
+            ("os.name == os.name", True),
+            ("sys.version_info >= (3,)", True),
+            ("sys.version_info[0] < 3", False),
+            ("sys.implementation.name != sys.implementation.name", False),
+            ("not sys.platform", False),
+            ("sys.platform and os.name", True),
+            ("sys.maxsize <= 0 or os.sep", True),
+            ("'linux' in ('linux',)", True),
+            ("'linux' not in ('linux',)", False),
+            ("sys.modules.keys", None),
+            ("some_flag", None),
+            ("os.path.sep == '/'", None),
+            ("1 < 2 < 3", None),
+            ("callable(sys)", None),
+        ],
+    )
+    def test_static_conditions(self, test, expected):
+        """
+        analyze.py --mode static should evaluate 'if' tests that only
+        depend on the interpreter, and use both branches for the rest
+        """
+        node = ast.parse(test, mode="eval").body
+        assert doppel_analyze._evaluate_condition(node, "pkg") is expected
+
+    def test_describe_package(self):
+        """
+        describe_package() should return the same description
+        that do_everything() writes to disk
+        """
+        for pkg_name in self.TEST_PACKAGES:
+            args = doppel_analyze.parse_args(
+                [
+                    "--pkg",
+                    pkg_name,
+                    "--output_dir",
+                    self.output_dir,
+                    "--kwargs-string",
+                    "~~kwargs~~",
+                    "--constructor-string",
+                    "~~CONSTRUCTOR~~",
+                ]
+            )
+            written = doppel_analyze.do_everything(args)
+            returned = doppel_analyze.describe_package(
+                pkg_name=pkg_name,
+                kwargs_string="~~kwargs~~",
+                constructor_string="~~CONSTRUCTOR~~",
+            )
+            assert returned == written
+
+    def test_incremental(self, tmp_path, monkeypatch, caplog):
+        """
+        analyze.py --incremental should only re-introspect
+        modules whose source code changed
+        """
+        pkg_dir = tmp_path / "incrementalpkg"
+        pkg_dir.mkdir()
+        (pkg_dir / "__init__.py").write_text("from . import mod_a, mod_b\n")
+        (pkg_dir / "mod_a.py").write_text("def func_a(x):\n    pass\n")
+        (pkg_dir / "mod_b.py").write_text("def func_b(y):\n    pass\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        def _describe():
+            for name in list(sys.modules):
+                if name.startswith("incrementalpkg"):
+                    del sys.modules[name]
+            return doppel_analyze.describe_package(
+                pkg_name="incrementalpkg",
+                kwargs_string="~~kwargs~~",
+                constructor_string="~~CONSTRUCTOR~~",
+                sidecar_file=str(tmp_path / "sidecar.json"),
+            )
+
+        first = _describe()
+        assert first["functions"] == {"func_a": {"args": ["x"]}, "func_b": {"args": ["y"]}}
+
+        (pkg_dir / "mod_b.py").write_text("def func_b(y, z):\n    pass\n")
+        caplog.clear()
+        second = _describe()
+        assert second["functions"] == {"func_a": {"args": ["x"]}, "func_b": {"args": ["y", "z"]}}
+        assert "Module 'incrementalpkg.mod_a' has not changed, re-using it" in caplog.text
+        assert "Module 'incrementalpkg.mod_b' has not changed" not in caplog.text
+
+    def test_incremental_invalidation(self, tmp_path, monkeypatch, caplog):
+        """
+        analyze.py --incremental should re-use modules whose files only got
+        a new timestamp, and re-introspect modules when the settings change,
+        when another module adds names to them, or when they depend on a
+        module with no source file
+        """
+        pkg_dir = tmp_path / "invalidpkg"
+        pkg_dir.mkdir()
+        (pkg_dir / "__init__.py").write_text(
+            "import sys\n"
+            "import types\n"
+            "from . import mod_a, mod_b\n"
+            "virtual = types.ModuleType('invalidpkg.virtual')\n"
+            "exec('def virtual_func(v):\\n    pass\\n', virtual.__dict__)\n"
+            "sys.modules['invalidpkg.virtual'] = virtual\n"
+            "virtual_func = virtual.virtual_func\n"
+        )
+        (pkg_dir / "mod_a.py").write_text("def func_a(x):\n    pass\n")
+        (pkg_dir / "mod_b.py").write_text("def func_b(y):\n    pass\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        def _describe(kwargs_string="~~kwargs~~"):
+            for name in list(sys.modules):
+                if name.startswith("invalidpkg"):
+                    del sys.modules[name]
+            caplog.clear()
+            with caplog.at_level("INFO", logger=doppel_analyze.logger.name):
+                args = doppel_analyze.parse_args(
+                    [
+                        "--pkg",
+                        "invalidpkg",
+                        "--output_dir",
+                        str(tmp_path),
+                        "--kwargs-string",
+                        kwargs_string,
+                        "--constructor-string",
+                        "~~CONSTRUCTOR~~",
+                        "--incremental",
+                    ]
+                )
+                return doppel_analyze.do_everything(args)
+
+        def _reused(module_name):
+            return f"Module '{module_name}' has not changed, re-using it" in caplog.text
+
+        first = _describe()
+        assert set(first["functions"]) == {"func_a", "func_b", "virtual_func"}
+        assert (tmp_path / ".python_invalidpkg.modules.json").is_file()
+
+        # only the timestamp changed
+        os.utime(pkg_dir / "mod_a.py", ns=(1, 1))
+        assert _describe() == first
+        assert _reused("invalidpkg.mod_a")
+        assert _reused("invalidpkg.mod_b")
+        # its function comes from a module without a file
+        assert not _reused("invalidpkg")
+
+        # another module adds a name to mod_a without changing its source
+        (pkg_dir / "mod_b.py").write_text(
+            "from invalidpkg import mod_a\n"
+            "def func_b(y):\n    pass\n"
+            "def injected(z):\n    pass\n"
+            "mod_a.injected = injected\n"
+        )
+        second = _describe()
+        assert set(second["functions"]) == {"func_a", "func_b", "injected", "virtual_func"}
+        assert "'func_a' is a function in this package" in caplog.text
+
+        assert _describe() == second
+        assert _reused("invalidpkg.mod_a")
+        assert _describe(kwargs_string="~~KWARGS~~") == second
+        assert "Settings changed since" in caplog.text
+        assert "'func_a' is a function in this package" in caplog.text
+
+        # mod_b is now a package, so its source is in a different file
+        (pkg_dir / "mod_b").mkdir()
+        (pkg_dir / "mod_b.py").rename(pkg_dir / "mod_b" / "__init__.py")
+        assert _describe(kwargs_string="~~KWARGS~~") == second
+        assert "'func_b' is a function in this package" in caplog.text
+
+    def test_incremental_static(self, tmp_path, caplog):
+        """
+        describe_package() should ignore sidecar_file with mode="static"
+        """
+        sidecar_file = tmp_path / "sidecar.json"
+        out = doppel_analyze.describe_package(
+            pkg_name="testpkguno",
+            kwargs_string="~~kwargs~~",
+            constructor_string="~~CONSTRUCTOR~~",
+            mode="static",
+            sidecar_file=str(sidecar_file),
+        )
+        assert "function_a" in out["functions"]
+        assert "Incremental describe is not supported with mode 'static'" in caplog.text
+        assert not sidecar_file.exists()
+
+    def test_namespace_traversal(self, tmp_path, monkeypatch, caplog):
+        """
+        describe_package(traversal="namespace") should honor __all__
+        and only load names provided by a module-level __getattr__
+        if resolve_lazy=True, skipping ones that fail to load
+        """
+        pkg_dir = tmp_path / "lazypkg"
+        pkg_dir.mkdir()
+        (pkg_dir / "__init__.py").write_text(
+            "import importlib\n"
+            "__all__ = ['eager_func', 'heavy', 'LazyClass', 'broken']\n"
+            "def eager_func(x):\n    pass\n"
+            "def not_exported(y):\n    pass\n"
+            "def __getattr__(name):\n"
+            "    if name == 'heavy':\n"
+            "        return importlib.import_module('.heavy', __name__)\n"
+            "    if name == 'LazyClass':\n"
+            "        return importlib.import_module('._impl', __name__).LazyClass\n"
+            "    raise AttributeError(name)\n"
+        )
+        (pkg_dir / "heavy.py").write_text("def heavy_func(a):\n    pass\n")
+        (pkg_dir / "_impl.py").write_text(
+            "class LazyClass:\n    def method(self, b):\n        pass\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        def _describe(**kwargs):
+            for name in list(sys.modules):
+                if name.startswith("lazypkg"):
+                    del sys.modules[name]
+            return doppel_analyze.describe_package(
+                pkg_name="lazypkg",
+                kwargs_string="~~kwargs~~",
+                constructor_string="~~CONSTRUCTOR~~",
+                timings=True,
+                **kwargs,
+            )
+
+        out = _describe(traversal="namespace")
+        assert set(out["functions"]) == {"eager_func"}
+        assert out["classes"] == {}
+        assert out["_meta"]["lazy"] == ["lazypkg.LazyClass", "lazypkg.broken", "lazypkg.heavy"]
+        assert "lazypkg.heavy" not in sys.modules
+        assert "lazypkg._impl" not in sys.modules
+
+        out = _describe(traversal="namespace", resolve_lazy=True)
+        assert set(out["functions"]) == {"eager_func", "heavy_func"}
+        assert set(out["classes"]) == {"LazyClass"}
+        assert out["_meta"]["lazy"] == ["lazypkg.LazyClass", "lazypkg.broken", "lazypkg.heavy"]
+        assert "Module 'lazypkg' declares 'broken', but it could not be loaded" in caplog.text
+
+        # the default traversal doesn't use __all__ and doesn't report lazy names
+        out = _describe()
+        assert set(out["functions"]) == {"eager_func", "not_exported"}
+        assert "lazy" not in out["_meta"]
+
+    def test_static_class_introspection(self, tmp_path, monkeypatch):
+        """
+        describe_package(class_introspection="static") should find the same
+        methods as getattr() without running properties, descriptors or
+        metaclass hooks
+        """
+        methods = (
+            "    def __init__(self, a):\n        pass\n"
+            "    def method(self, b):\n        pass\n"
+            "    @classmethod\n"
+            "    def build(cls, c):\n        pass\n"
+            "    @staticmethod\n"
+            "    def helper(d):\n        pass\n"
+            "    limit = 10\n"
+            "    class Options:\n"
+            "        def __init__(self, e):\n            pass\n"
+        )
+        (tmp_path / "trappkg.py").write_text(
+            "class Meta(type):\n"
+            "    def __getattr__(cls, name):\n"
+            "        raise RuntimeError('metaclass hook ran')\n"
+            "class Trap:\n"
+            "    def __get__(self, obj, objtype=None):\n"
+            "        raise RuntimeError('descriptor ran')\n"
+            "class Thing(metaclass=Meta):\n"
+            "    trap = Trap()\n"
+            "    @property\n"
+            "    def prop(self):\n        raise RuntimeError('property ran')\n" + methods
+        )
+        (tmp_path / "plainpkg.py").write_text("class Thing:\n" + methods)
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        def _describe(pkg_name, class_introspection):
+            return doppel_analyze.describe_package(
+                pkg_name=pkg_name,
+                kwargs_string="~~kwargs~~",
+                constructor_string="~~CONSTRUCTOR~~",
+                class_introspection=class_introspection,
+            )
+
+        try:
+            _describe("trappkg", "getattr")
+            raise AssertionError("getattr() should have run code in the class")
+        except RuntimeError as err:
+            assert str(err).endswith(" ran")
+
+        out = _describe("trappkg", "static")
+        assert set(out["classes"]["Thing"]["public_methods"]) == {
+            "~~CONSTRUCTOR~~",
+            "method",
+            "build",
+            "helper",
+            "Options",
+        }
+        assert out["classes"]["Thing"]["public_methods"]["build"] == {"args": ["c"]}
+        assert out["classes"]["Thing"]["public_methods"]["Options"] == {"args": ["e"]}
+
+        # nothing changes for classes that are safe to getattr()
+        assert _describe("plainpkg", "static") == _describe("plainpkg", "getattr")
+        assert out["classes"]["Thing"] == _describe("plainpkg", "static")["classes"]["Thing"]
+
+    def test_memoized_inspection(self, tmp_path, monkeypatch, caplog):
+        """
+        describe_package() should inspect members inherited from a base class
+        once, and still describe methods that are overridden
+        """
+        (tmp_path / "deeppkg.py").write_text(
+            "class Base:\n"
+            "    def __init__(self, a):\n        pass\n"
+            "    def method(self, b):\n        pass\n"
+            "    @classmethod\n"
+            "    def build(cls, c):\n        pass\n"
+            "class Child(Base):\n    pass\n"
+            "class GrandChild(Child):\n"
+            "    def method(self, d, **kwargs):\n        pass\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        inspected = []
+        getfullargspec = doppel_analyze.inspect.getfullargspec
+
+        def _getfullargspec(f):
+            inspected.append(f.__qualname__)
+            return getfullargspec(f)
+
+        monkeypatch.setattr(doppel_analyze.inspect, "getfullargspec", _getfullargspec)
+        with caplog.at_level("DEBUG", logger=doppel_analyze.logger.name):
+            out = doppel_analyze.describe_package(
+                pkg_name="deeppkg",
+                kwargs_string="~~kwargs~~",
+                constructor_string="~~CONSTRUCTOR~~",
+            )
+
+        base = {
+            "~~CONSTRUCTOR~~": {"args": ["a"]},
+            "method": {"args": ["b"]},
+            "build": {"args": ["c"]},
+        }
+        assert out["classes"]["Base"]["public_methods"] == base
+        assert out["classes"]["Child"]["public_methods"] == base
+        assert out["classes"]["GrandChild"]["public_methods"] == {
+            **base,
+            "method": {"args": ["d", "~~kwargs~~"]},
+        }
+        assert sorted(inspected) == [
+            "Base.__init__",
+            "Base.build",
+            "Base.method",
+            "GrandChild.method",
+        ]
+        assert "class member cache: 5 hits, 4 misses" in caplog.text
+        # bound methods are new objects every time, so they aren't memoized
+        assert not [
+            obj
+            for obj, _ in doppel_analyze._UNWRAPPED._results.values()
+            if isinstance(obj, doppel_analyze.types.MethodType)
+        ]
+
+    def test_dynamic_class_member(self, tmp_path, monkeypatch):
+        """
+        describe_package() should describe attributes that a metaclass
+        adds to dir(), which aren't defined by any class in the MRO
+        """
+        (tmp_path / "dynpkg.py").write_text(
+            "def _made(x, y):\n    pass\n"
+            "class Meta(type):\n"
+            "    def __dir__(cls):\n        return super().__dir__() + ['made']\n"
+            "    def __getattr__(cls, name):\n"
+            "        if name == 'made':\n            return _made\n"
+            "        raise AttributeError(name)\n"
+            "class Thing(metaclass=Meta):\n"
+            "    def method(self, a):\n        pass\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+        out = doppel_analyze.describe_package(
+            pkg_name="dynpkg",
+            kwargs_string="~~kwargs~~",
+            constructor_string="~~CONSTRUCTOR~~",
+        )
+        assert out["classes"]["Thing"]["public_methods"] == {
+            "~~CONSTRUCTOR~~": {"args": []},
+            "method": {"args": ["a"]},
+            "made": {"args": ["x", "y"]},
+        }
+
+    def test_classification_without_repr(self, tmp_path, monkeypatch):
+        """
+        describe_package() should classify objects without calling their
+        __repr__(), and describe enums like any other class
+        """
+        (tmp_path / "reprpkg.py").write_text(
+            "import enum\n"
+            "class Meta(type):\n"
+            "    def __repr__(cls):\n"
+            "        raise RuntimeError('repr ran')\n"
+            "class Thing(metaclass=Meta):\n"
+            "    def __init__(self, a):\n        pass\n"
+            "    @classmethod\n"
+            "    def build(cls, c):\n        pass\n"
+            "class Color(enum.Enum):\n"
+            "    RED = 1\n"
+            "    def shade(self, amount):\n        pass\n"
+            "def func(x):\n    pass\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        out = doppel_analyze.describe_package(
+            pkg_name="reprpkg",
+            kwargs_string="~~kwargs~~",
+            constructor_string="~~CONSTRUCTOR~~",
+        )
+        assert out["functions"] == {"func": {"args": ["x"]}}
+        assert out["classes"]["Thing"]["public_methods"] == {
+            "~~CONSTRUCTOR~~": {"args": ["a"]},
+            "build": {"args": ["c"]},
+        }
+        # dir() of an enum only lists its methods on Python 3.12+
+        assert "Color" in out["classes"]
+
+        assert doppel_analyze._kind(min) == "builtin"
+        assert doppel_analyze._kind(doppel_analyze.describe_package) == "function"
+        assert doppel_analyze._kind(type("Meta", (type,), {})("X", (), {})) == "class"
+        assert doppel_analyze._kind(type("Lazy", (type(sys),), {})("lazy")) == "module"
+        assert doppel_analyze._kind(print.__call__) == "other"
+        assert doppel_analyze._in_package("reprpkg.sub", "reprpkg")
+        assert not doppel_analyze._in_package("reprpkgother", "reprpkg")
+        assert not doppel_analyze._in_package(None, "reprpkg")
+
+    def test_profile(self, tmp_path):
+        """
+        analyze.py --profile should write cProfile statistics
+        and the time spent in each phase
+        """
+        profile_file = tmp_path / "analyze.prof"
+        args = doppel_analyze.parse_args(
+            [
+                "--pkg",
+                "testpkguno",
+                "--output_dir",
+                str(tmp_path),
+                "--kwargs-string",
+                "~~kwargs~~",
+                "--constructor-string",
+                "~~CONSTRUCTOR~~",
+                "--profile",
+                str(profile_file),
+            ]
+        )
+        doppel_analyze.do_everything(args)
+        assert profile_file.exists()
+        with open(str(profile_file) + ".phases.json", "r") as f:
+            phases = json.loads(f.read())
+        assert set(phases) == {"import", "module walk", "class introspection", "JSON write"}
+
+    def test_stats(self, tmp_path):
+        """
+        analyze.py --stats should write the time spent in each
+        phase and the number of modules walked, in both modes
+        """
+        stats_file = tmp_path / "stats.json"
+        for mode in ["import", "static"]:
+            args = doppel_analyze.parse_args(
+                [
+                    "--pkg",
+                    "pythonspecific",
+                    "--output_dir",
+                    str(tmp_path),
+                    "--kwargs-string",
+                    "~~kwargs~~",
+                    "--constructor-string",
+                    "~~CONSTRUCTOR~~",
+                    "--mode",
+                    mode,
+                    "--stats",
+                    str(stats_file),
+                ]
+            )
+            doppel_analyze.do_everything(args)
+            with open(stats_file, "r") as f:
+                stats = json.loads(f.read())
+            assert "module walk" in stats["phases"]
+            assert stats["modules_walked"] >= 1
+
+    def test_timings(self, tmp_path):
+        """
+        analyze.py --timings should add timings for every
+        module and class to a '_meta' block, in both modes
+        """
+        for mode in ["import", "static"]:
+            args = doppel_analyze.parse_args(
+                [
+                    "--pkg",
+                    "pythonspecific",
+                    "--output_dir",
+                    str(tmp_path),
+                    "--kwargs-string",
+                    "~~kwargs~~",
+                    "--constructor-string",
+                    "~~CONSTRUCTOR~~",
+                    "--mode",
+                    mode,
+                    "--timings",
+                ]
+            )
+            out = doppel_analyze.do_everything(args)
+            meta = out.pop("_meta")
+            assert "pythonspecific" in meta["modules"]
+            for timing in list(meta["modules"].values()) + list(meta["classes"].values()):
+                assert timing["seconds"] >= 0
+                assert timing["attributes"] >= 0
+            class_names = {name.rsplit(".", 1)[1] for name in meta["classes"]}
+            assert class_names >= set(out["classes"])
+
+            args.timings = False
+            assert "_meta" not in doppel_analyze.do_everything(args)
+
+    def test_resources(self, tmp_path):
+        """
+        analyze.py --timings should record the wall time, CPU time and
+        peak memory usage of describing the package in the '_meta' block
+        """
+        args = doppel_analyze.parse_args(
+            [
+                "--pkg",
+                "pythonspecific",
+                "--output_dir",
+                str(tmp_path),
+                "--kwargs-string",
+                "~~kwargs~~",
+                "--constructor-string",
+                "~~CONSTRUCTOR~~",
+                "--timings",
+            ]
+        )
+        resources = doppel_analyze.do_everything(args)["_meta"]["resources"]
+        assert set(resources) == {
+            "wall_seconds",
+            "user_cpu_seconds",
+            "system_cpu_seconds",
+            "peak_rss_mb",
+        }
+        assert all(value >= 0 for value in resources.values())
+        assert resources["peak_rss_mb"] > 0
+
+        with open(os.path.join(tmp_path, "python_pythonspecific.json"), "r") as f:
+            assert json.load(f)["_meta"]["resources"] == resources
+
+    def test_trace(self, tmp_path, monkeypatch):
+        """
+        analyze.py should write a trace event for each phase when
+        doppel-describe passes it a trace context
+        """
+        trace_file = tmp_path / "events.json"
+        context = {"file": str(trace_file), "pid": 123, "tid": 456}
+        monkeypatch.setenv(doppel_analyze.TRACE_ENV_VAR, json.dumps(context))
+        args = doppel_analyze.parse_args(
+            [
+                "--pkg",
+                "testpkguno",
+                "--output_dir",
+                str(tmp_path),
+                "--kwargs-string",
+                "~~kwargs~~",
+                "--constructor-string",
+                "~~CONSTRUCTOR~~",
+            ]
+        )
+        doppel_analyze.do_everything(args)
+        with open(trace_file, "r") as f:
+            events = json.loads(f.read())
+        assert {e["name"] for e in events} == {
+            "import",
+            "module walk",
+            "class introspection",
+            "JSON write",
+        }
+        assert all(e["ph"] == "X" and e["pid"] == 123 and e["tid"] == 456 for e in events)
+        assert {"name": "testpkguno"} in [e.get("args") for e in events]
+
+        # tracing stops after each run
+        monkeypatch.delenv(doppel_analyze.TRACE_ENV_VAR)
+        trace_file.unlink()
+        doppel_analyze.do_everything(args)
+        assert not trace_file.exists()
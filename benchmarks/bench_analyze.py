@@ -0,0 +1,188 @@
+"""
+Benchmark the Python analyzer (``doppel/bin/analyze.py``) in-process.
+
+For each scenario, a package is generated with ``generate.py`` and imported
+once. Only ``describe_package()`` is timed, without the cost of starting
+Python or importing the package that ``bench_describe.py`` includes, so the
+results show how fast the analyzer walks modules and classes. The benchmark
+reports the number of objects (functions, classes and public methods)
+described per second.
+
+With ``--against``, ``analyze.py`` from another git revision is timed on
+the same packages too, to compare a change to what came before it.
+
+Results are compared to the baselines stored in ``baselines/analyze.json``.
+
+Usage:
+
+    python benchmarks/bench_analyze.py
+
+    # compare to analyze.py from the previous commit
+    python benchmarks/bench_analyze.py --scenarios large,deep --against HEAD~1
+
+    # store the results as the new baselines
+    python benchmarks/bench_analyze.py --update-baselines
+"""
+
+import argparse
+import gc
+import importlib.util
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from typing import Any, Dict, List, Optional, Tuple
+
+from bench_describe import SCENARIOS
+from common import (
+    BASELINES_DIR,
+    DEFAULT_THRESHOLD,
+    find_regressions,
+    load_baselines,
+    print_results,
+    save_baselines,
+)
+from generate import generate_python_package
+
+BASELINES_FILE = os.path.join(BASELINES_DIR, "analyze.json")
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ANALYZE_PY = os.path.join("doppel", "bin", "analyze.py")
+
+
+def load_analyzer(work_dir: str, revision: Optional[str] = None) -> types.ModuleType:
+    """
+    Load ``analyze.py`` as a module, from the working tree or
+    (if ``revision`` is given) from a git revision.
+    """
+    if revision is None:
+        path = os.path.join(REPO_DIR, ANALYZE_PY)
+    else:
+        source = subprocess.run(
+            ["git", "show", f"{revision}:{ANALYZE_PY}"],
+            cwd=REPO_DIR,
+            check=True,
+            stdout=subprocess.PIPE,
+        ).stdout
+        path = os.path.join(work_dir, "analyze_against.py")
+        with open(path, "wb") as f:
+            f.write(source)
+    spec = importlib.util.spec_from_file_location(f"doppel_analyze_{revision or 'current'}", path)
+    assert spec is not None and spec.loader is not None
+    analyzer = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(analyzer)
+    # analyze.py logs every object it finds, which would be most of what's timed
+    logging.getLogger().setLevel(logging.WARNING)
+    return analyzer
+
+
+def _count_objects(pkg_dict: Dict[str, Any]) -> int:
+    num_methods = sum(len(c["public_methods"]) for c in pkg_dict["classes"].values())
+    return len(pkg_dict["functions"]) + len(pkg_dict["classes"]) + num_methods
+
+
+def _time_describe(analyzer: types.ModuleType, pkg_name: str) -> Tuple[float, Dict[str, Any]]:
+    # like timeit, turn off garbage collection while timing
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        pkg_dict = analyzer.describe_package(
+            pkg_name=pkg_name, kwargs_string="~~KWARGS~~", constructor_string="~~CONSTRUCTOR~~"
+        )
+        return time.perf_counter() - start, pkg_dict
+    finally:
+        gc.enable()
+
+
+def run_scenario(
+    analyzers: Dict[str, types.ModuleType], pkg_name: str, repeat: int
+) -> Dict[str, Dict[str, float]]:
+    """
+    Describe an already-imported package with each analyzer. Runs of the
+    analyzers are interleaved, so they all see the same conditions. Time
+    is the fastest of ``repeat`` runs.
+    """
+    timings: Dict[str, List[float]] = {label: [] for label in analyzers}
+    pkg_dicts: Dict[str, Dict[str, Any]] = {}
+    for _ in range(repeat):
+        for label, analyzer in analyzers.items():
+            seconds, pkg_dicts[label] = _time_describe(analyzer, pkg_name)
+            timings[label].append(seconds)
+
+    results = {}
+    for label, label_timings in timings.items():
+        seconds = min(label_timings)
+        num_objects = _count_objects(pkg_dicts[label])
+        results[label] = {
+            "objects": num_objects,
+            "seconds": seconds,
+            "objects_per_second": num_objects / seconds,
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--scenarios", default=",".join(SCENARIOS), help="Comma-delimited list of scenarios"
+    )
+    parser.add_argument("--repeat", type=int, default=7, help="Number of runs per scenario")
+    parser.add_argument(
+        "--against",
+        default=None,
+        help="Git revision whose analyze.py to time too, like 'HEAD~1' or 'main'",
+    )
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument(
+        "--check", action="store_true", help="Exit with code 1 if any result regressed"
+    )
+    parser.add_argument(
+        "--update-baselines", action="store_true", help="Store results as the new baselines"
+    )
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, float]] = {}
+    against_results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        analyzers = {"current": load_analyzer(work_dir)}
+        if args.against:
+            analyzers["against"] = load_analyzer(work_dir, args.against)
+
+        src_dir = os.path.join(work_dir, "src")
+        sys.path.insert(0, src_dir)
+        for scenario in args.scenarios.split(","):
+            pkg_name = f"doppelbench{scenario}"
+            generate_python_package(pkg_name, src_dir, SCENARIOS[scenario])
+            # the first run imports the package
+            analyzers["current"].describe_package(pkg_name, "~~KWARGS~~", "~~CONSTRUCTOR~~")
+
+            scenario_results = run_scenario(analyzers, pkg_name, args.repeat)
+            results[f"python/{scenario}"] = scenario_results["current"]
+            if "against" in scenario_results:
+                against_results[f"python/{scenario}@{args.against}"] = scenario_results["against"]
+    print_results({**results, **against_results})
+
+    for name, result in results.items():
+        against_result = against_results.get(f"{name}@{args.against}")
+        if against_result is not None:
+            speedup = result["objects_per_second"] / against_result["objects_per_second"]
+            print(f"{name}: {speedup:.2f}x the objects per second of {args.against}")
+
+    if args.update_baselines:
+        save_baselines(BASELINES_FILE, results)
+        print(f"Wrote {BASELINES_FILE}")
+        return
+
+    regressions = find_regressions(results, load_baselines(BASELINES_FILE), args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    if regressions and args.check:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
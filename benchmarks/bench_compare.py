@@ -0,0 +1,234 @@
+"""
+Micro-benchmarks for ``doppel-test``: comparing packages and reporting on them.
+
+Each scenario builds synthetic ``PackageAPI`` objects in memory (no
+files involved), then times:
+
+* building a ``PackageCollection`` and each of its queries
+* each ``SimpleReporter._check_*`` method
+* ``SimpleReporter.compare()``, end to end
+
+Output is written to ``os.devnull``. Results are compared to the
+baselines stored in ``baselines/compare.json``.
+
+Usage:
+
+    python benchmarks/bench_compare.py
+    python benchmarks/bench_compare.py --scenarios 2pkgs-1k,10pkgs-10k --check
+    python benchmarks/bench_compare.py --update-baselines
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List, NamedTuple
+from unittest import mock
+
+from common import (
+    BASELINES_DIR,
+    DEFAULT_THRESHOLD,
+    find_regressions,
+    load_baselines,
+    print_results,
+    save_baselines,
+)
+
+from doppel import reporters
+from doppel.PackageAPI import PackageAPI
+from doppel.PackageCollection import PackageCollection
+from doppel.reporters import SimpleReporter
+
+BASELINES_FILE = os.path.join(BASELINES_DIR, "compare.json")
+
+# every method of a generated class
+METHODS_PER_CLASS = 10
+
+# each round of timing runs for at least this long
+MIN_ROUND_SECONDS = 0.02
+
+CHECKS = [
+    "function_count",
+    "function_names",
+    "function_args",
+    "class_count",
+    "class_names",
+    "class_public_methods",
+    "class_public_method_args",
+]
+
+
+class Scenario(NamedTuple):
+    """
+    Shape of the packages being compared.
+
+    ``num_symbols`` is split roughly evenly between functions and
+    class methods. Symbols with an index below ``overlap * num_symbols``
+    are in every package. All others are in each package with
+    probability 0.5. ``num_args`` is the length of every argument list.
+    """
+
+    num_packages: int
+    num_symbols: int
+    overlap: float
+    num_args: int
+
+
+SCENARIOS = {
+    "1pkg-10k": Scenario(num_packages=1, num_symbols=10_000, overlap=1.0, num_args=3),
+    "2pkgs-10": Scenario(num_packages=2, num_symbols=10, overlap=0.5, num_args=3),
+    "2pkgs-1k": Scenario(num_packages=2, num_symbols=1_000, overlap=0.9, num_args=3),
+    "2pkgs-100k": Scenario(num_packages=2, num_symbols=100_000, overlap=0.9, num_args=3),
+    "2pkgs-10k-longargs": Scenario(num_packages=2, num_symbols=10_000, overlap=0.9, num_args=50),
+    "10pkgs-10k": Scenario(num_packages=10, num_symbols=10_000, overlap=0.5, num_args=5),
+    "100pkgs-1k": Scenario(num_packages=100, num_symbols=1_000, overlap=0.5, num_args=3),
+}
+
+
+def _args(rng: random.Random, num_args: int) -> List[str]:
+    args = [f"arg_{i}" for i in range(num_args)]
+    # make some argument lists differ between packages
+    if num_args and rng.random() < 0.1:
+        args[-1] = "other_arg"
+    return args
+
+
+def make_packages(scenario: Scenario, seed: int = 708) -> List[PackageAPI]:
+    """
+    Build synthetic packages. The same scenario and seed
+    always produce the same packages.
+    """
+    rng = random.Random(seed)
+    num_functions = scenario.num_symbols // 2
+    num_classes = max(1, scenario.num_symbols // (2 * METHODS_PER_CLASS))
+    shared_functions = int(scenario.overlap * num_functions)
+    shared_classes = int(scenario.overlap * num_classes)
+
+    pkgs = []
+    for pkg_index in range(scenario.num_packages):
+        pkg_dict: Dict[str, Any] = {
+            "name": f"pkg{pkg_index}",
+            "language": "python",
+            "functions": {},
+            "classes": {},
+        }
+        for i in range(num_functions):
+            if i < shared_functions or rng.random() < 0.5:
+                pkg_dict["functions"][f"func_{i}"] = {"args": _args(rng, scenario.num_args)}
+        for i in range(num_classes):
+            if i < shared_classes or rng.random() < 0.5:
+                methods = {"~~CONSTRUCTOR~~": {"args": _args(rng, scenario.num_args)}}
+                for j in range(METHODS_PER_CLASS):
+                    if i < shared_classes or rng.random() < 0.9:
+                        methods[f"method_{j}"] = {"args": _args(rng, scenario.num_args)}
+                pkg_dict["classes"][f"Class{i}"] = {"public_methods": methods}
+        pkgs.append(PackageAPI(pkg_dict))
+    return pkgs
+
+
+def best_time(func: Callable[[], Any], repeat: int) -> float:
+    """
+    Time ``func``, in seconds per call. Like ``timeit``, calls
+    are grouped into rounds long enough to measure reliably, and
+    the fastest of ``repeat`` rounds is used.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_ROUND_SECONDS:
+            break
+        number *= 10
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / number
+
+
+def _compare(pkgs: List[PackageAPI]) -> None:
+    try:
+        SimpleReporter(pkgs, errors_allowed=0).compare()
+    except SystemExit:
+        pass
+
+
+def run_scenario(scenario: Scenario, repeat: int) -> Dict[str, float]:
+    """
+    Time everything for one scenario.
+
+    :return: ``{operation: seconds per call}``
+    """
+    pkgs = make_packages(scenario)
+    collection = PackageCollection(pkgs)
+    func_name = collection.all_functions()[0]
+
+    queries: Dict[str, Callable[[], Any]] = {
+        "collection.init": lambda: PackageCollection(pkgs),
+        "collection.all_functions": collection.all_functions,
+        "collection.shared_functions": collection.shared_functions,
+        "collection.non_shared_functions": collection.non_shared_functions,
+        "collection.all_classes": collection.all_classes,
+        "collection.shared_methods_by_class": collection.shared_methods_by_class,
+        "collection.non_shared_methods_by_class": collection.non_shared_methods_by_class,
+        "collection.function_presence": lambda: collection.function_presence(func_name),
+    }
+    out = {name: best_time(query, repeat) for name, query in queries.items()}
+
+    with open(os.devnull, "w") as devnull, mock.patch.object(reporters, "stdout", devnull):
+        reporter = SimpleReporter(pkgs, errors_allowed=0)
+        for check in CHECKS:
+            check_function = getattr(reporter, f"_check_{check}")
+
+            def _run_check(check_function: Callable[[], None] = check_function) -> None:
+                reporter.errors = []
+                check_function()
+
+            out[f"check.{check}"] = best_time(_run_check, repeat)
+
+        out["compare"] = best_time(lambda: _compare(pkgs), repeat)
+
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--scenarios", default=",".join(SCENARIOS), help="Comma-delimited list of scenarios"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timing rounds")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument(
+        "--check", action="store_true", help="Exit with code 1 if any result regressed"
+    )
+    parser.add_argument(
+        "--update-baselines", action="store_true", help="Store results as the new baselines"
+    )
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, float]] = {}
+    for scenario in args.scenarios.split(","):
+        for operation, seconds in run_scenario(SCENARIOS[scenario], args.repeat).items():
+            results[f"{scenario}/{operation}"] = {"seconds": seconds}
+    print_results(results)
+
+    if args.update_baselines:
+        save_baselines(BASELINES_FILE, results)
+        print(f"Wrote {BASELINES_FILE}")
+        return
+
+    regressions = find_regressions(results, load_baselines(BASELINES_FILE), args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    if regressions and args.check:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
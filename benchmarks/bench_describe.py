@@ -0,0 +1,189 @@
+"""
+Benchmark ``doppel-describe`` on generated packages.
+
+For each scenario, a package is generated with ``generate.py`` and
+described with ``doppel-describe``, in a fresh process. The benchmark
+records the wall time and peak memory of that process, and the number
+of objects (functions, classes and public methods) described per second.
+
+Results are compared to the baselines stored in ``baselines/describe.json``.
+
+Usage:
+
+    # run all Python scenarios and compare to the baselines
+    python benchmarks/bench_describe.py
+
+    # exit with a non-zero code if anything regressed by more than 25%
+    python benchmarks/bench_describe.py --check --threshold 0.25
+
+    # store the results as the new baselines
+    python benchmarks/bench_describe.py --update-baselines
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+from common import (
+    BASELINES_DIR,
+    DEFAULT_THRESHOLD,
+    find_regressions,
+    load_baselines,
+    print_results,
+    run_measured,
+    save_baselines,
+)
+from generate import PackageShape, generate_python_package, generate_r_package
+
+BASELINES_FILE = os.path.join(BASELINES_DIR, "describe.json")
+
+SCENARIOS = {
+    "small": PackageShape(modules=5, functions=10, classes=5, methods=5),
+    "medium": PackageShape(modules=20, functions=25, classes=10, methods=10),
+    "large": PackageShape(modules=80, functions=25, classes=10, methods=10),
+    "deep": PackageShape(
+        modules=20, functions=25, classes=10, methods=10, decorator_depth=10, inheritance_depth=10
+    ),
+}
+
+# scenarios that only differ in size, used to check how describe time scales
+SIZE_SCENARIOS = ["medium", "large"]
+
+
+def _count_objects(output_file: str) -> int:
+    with open(output_file, "r") as f:
+        pkg_dict = json.load(f)
+    num_methods = sum(len(c["public_methods"]) for c in pkg_dict["classes"].values())
+    return len(pkg_dict["functions"]) + len(pkg_dict["classes"]) + num_methods
+
+
+def _describe_cmd(language: str, pkg_name: str, data_dir: str, mode: str) -> List[str]:
+    cmd = [sys.executable, "-m", "doppel.describe", "-l", language, "-p", pkg_name]
+    cmd += ["--data-dir", data_dir]
+    if language == "python":
+        cmd += ["--mode", mode]
+    return cmd
+
+
+def _prepend_path(env: Dict[str, str], var: str, path: str) -> None:
+    env[var] = os.pathsep.join(p for p in [path, env.get(var, "")] if p)
+
+
+def run_scenario(
+    language: str, scenario: str, shape: PackageShape, mode: str, repeat: int, work_dir: str
+) -> Dict[str, float]:
+    """
+    Generate and describe one package. Wall time is the fastest of
+    ``repeat`` runs, and peak memory the largest.
+    """
+    pkg_name = f"doppelbench{scenario}"
+    src_dir = os.path.join(work_dir, "src")
+    data_dir = os.path.join(work_dir, "out")
+    os.makedirs(data_dir, exist_ok=True)
+
+    env = dict(os.environ)
+    if language == "python":
+        generate_python_package(pkg_name, src_dir, shape)
+        _prepend_path(env, "PYTHONPATH", src_dir)
+    else:
+        pkg_dir = generate_r_package(pkg_name, src_dir, shape)
+        lib_dir = os.path.join(work_dir, "lib")
+        os.makedirs(lib_dir, exist_ok=True)
+        subprocess.run(
+            ["R", "CMD", "INSTALL", f"--library={lib_dir}", pkg_dir],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        _prepend_path(env, "R_LIBS", lib_dir)
+
+    cmd = _describe_cmd(language, pkg_name, data_dir, mode)
+    measurements = [run_measured(cmd, env=env) for _ in range(repeat)]
+    wall_seconds = min(m.wall_seconds for m in measurements)
+
+    num_objects = _count_objects(os.path.join(data_dir, f"{language}_{pkg_name}.json"))
+    result = {
+        "objects": num_objects,
+        "wall_seconds": wall_seconds,
+        "objects_per_second": num_objects / wall_seconds,
+    }
+    peak_rss = [m.peak_rss_mb for m in measurements if m.peak_rss_mb is not None]
+    if peak_rss:
+        result["peak_rss_mb"] = max(peak_rss)
+    return result
+
+
+def scaling_exponent(small: Dict[str, float], large: Dict[str, float]) -> float:
+    """
+    Estimate ``k`` in ``time ~ objects ** k`` from two results. Around 1.0
+    means describe time grows linearly with the size of the package.
+    """
+    size_ratio = large["objects"] / small["objects"]
+    time_ratio = large["wall_seconds"] / small["wall_seconds"]
+    return math.log(time_ratio) / math.log(size_ratio)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--language",
+        choices=["python", "r", "all"],
+        default="python",
+        help="R scenarios need R and the R6 package. 'all' skips R if Rscript is not found.",
+    )
+    parser.add_argument("--mode", choices=["import", "static"], default="import")
+    parser.add_argument(
+        "--scenarios", default=",".join(SCENARIOS), help="Comma-delimited list of scenarios"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs per scenario")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument(
+        "--check", action="store_true", help="Exit with code 1 if any result regressed"
+    )
+    parser.add_argument(
+        "--update-baselines", action="store_true", help="Store results as the new baselines"
+    )
+    args = parser.parse_args()
+
+    languages = ["python", "r"] if args.language == "all" else [args.language]
+    if args.language == "all" and shutil.which("Rscript") is None:
+        print("Rscript not found, skipping R scenarios")
+        languages = ["python"]
+
+    results: Dict[str, Dict[str, float]] = {}
+    for language in languages:
+        mode = args.mode if language == "python" else "import"
+        for scenario in args.scenarios.split(","):
+            name = f"{language}/{mode}/{scenario}"
+            with tempfile.TemporaryDirectory() as work_dir:
+                results[name] = run_scenario(
+                    language, scenario, SCENARIOS[scenario], mode, args.repeat, work_dir
+                )
+    print_results(results)
+
+    for language in languages:
+        mode = args.mode if language == "python" else "import"
+        small, large = (results.get(f"{language}/{mode}/{s}") for s in SIZE_SCENARIOS)
+        if small and large:
+            exponent = scaling_exponent(small, large)
+            print(f"{language}/{mode}: describe time ~ objects ** {exponent:.2f}")
+
+    if args.update_baselines:
+        save_baselines(BASELINES_FILE, results)
+        print(f"Wrote {BASELINES_FILE}")
+        return
+
+    regressions = find_regressions(results, load_baselines(BASELINES_FILE), args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    if regressions and args.check:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
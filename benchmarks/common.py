@@ -0,0 +1,146 @@
+"""
+Helpers shared by the benchmark scripts: running and measuring
+commands, and comparing results to stored baselines.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence
+
+BASELINES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# a result is only flagged as a regression if it is this much worse than the baseline
+DEFAULT_THRESHOLD = 0.25
+
+# metrics where bigger numbers are better. For everything else, smaller is better.
+HIGHER_IS_BETTER = {"objects_per_second"}
+
+# metrics that describe the benchmark itself, and are never regressions
+INFORMATIONAL = {"objects"}
+
+
+class Measurement(NamedTuple):
+    """
+    Wall time and peak memory of a child process. ``peak_rss_mb``
+    is ``None`` on platforms without ``os.wait4()``.
+    """
+
+    wall_seconds: float
+    peak_rss_mb: Optional[float]
+
+
+def _rss_mb(ru_maxrss: int) -> float:
+    # ru_maxrss is in bytes on macOS and kilobytes everywhere else
+    if sys.platform == "darwin":
+        return ru_maxrss / (1024 * 1024)
+    return ru_maxrss / 1024
+
+
+def run_measured(cmd: Sequence[str], env: Optional[Mapping[str, str]] = None) -> Measurement:
+    """
+    Run a command and measure its wall time and peak resident
+    set size. Raises ``RuntimeError`` if the command fails.
+
+    Peak RSS is only measured on platforms with ``os.wait4()``.
+    Everywhere else (e.g. Windows), only wall time is.
+
+    :param cmd: Command to run
+    :param env: Environment variables for the command
+    """
+    start = time.perf_counter()
+    if not hasattr(os, "wait4"):
+        result = subprocess.run(
+            cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=False
+        )
+        wall_seconds = time.perf_counter() - start
+        _check_returncode(cmd, result.returncode, result.stderr)
+        return Measurement(wall_seconds=wall_seconds, peak_rss_mb=None)
+
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    assert proc.stderr is not None
+    stderr = proc.stderr.read()
+    proc.stderr.close()
+    # wait4() reports resource usage of this one child, unlike getrusage(RUSAGE_CHILDREN)
+    _, status, rusage = os.wait4(proc.pid, 0)
+    wall_seconds = time.perf_counter() - start
+    if os.WIFEXITED(status):
+        proc.returncode = os.WEXITSTATUS(status)
+    else:
+        proc.returncode = -os.WTERMSIG(status)
+    _check_returncode(cmd, proc.returncode, stderr)
+    return Measurement(wall_seconds=wall_seconds, peak_rss_mb=_rss_mb(rusage.ru_maxrss))
+
+
+def _check_returncode(cmd: Sequence[str], returncode: int, stderr: bytes) -> None:
+    if returncode != 0:
+        raise RuntimeError(
+            f"'{' '.join(cmd)}' failed with exit code {returncode}:\n"
+            + stderr.decode("utf-8", errors="replace")
+        )
+
+
+def load_baselines(filename: str) -> Dict[str, Dict[str, float]]:
+    """
+    Load stored baselines, ``{benchmark_name: {metric: value}}``.
+    Returns an empty dictionary if there are none yet.
+    """
+    if not os.path.isfile(filename):
+        return {}
+    with open(filename, "r") as f:
+        return json.load(f)
+
+
+def save_baselines(filename: str, results: Mapping[str, Mapping[str, float]]) -> None:
+    """
+    Store results as the new baselines. Existing baselines for
+    benchmarks that were not run are kept.
+    """
+    baselines = load_baselines(filename)
+    for name, metrics in results.items():
+        baselines[name] = {metric: float(f"{value:.4g}") for metric, value in metrics.items()}
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(filename, "w") as f:
+        json.dump(baselines, f, indent=4, sort_keys=True)
+        f.write("\n")
+
+
+def find_regressions(
+    results: Mapping[str, Mapping[str, float]],
+    baselines: Mapping[str, Mapping[str, float]],
+    threshold: float,
+) -> List[str]:
+    """
+    Compare results to baselines.
+
+    :param results: ``{benchmark_name: {metric: value}}``
+    :param baselines: Baselines, in the same format as ``results``
+    :param threshold: Fraction by which a metric can be worse than its
+        baseline before it's considered a regression
+    :return: A description of each regression
+    """
+    out = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            baseline = baselines.get(name, {}).get(metric)
+            if not baseline or metric in INFORMATIONAL:
+                continue
+            if metric in HIGHER_IS_BETTER:
+                regressed = value < baseline * (1 - threshold)
+            else:
+                regressed = value > baseline * (1 + threshold)
+            if regressed:
+                out.append(f"{name}: {metric} is {value:.4g}, baseline is {baseline:.4g}")
+    return out
+
+
+def print_results(results: Mapping[str, Mapping[str, float]]) -> None:
+    """
+    Print one line per benchmark.
+    """
+    width = max((len(name) for name in results), default=0)
+    for name, metrics in results.items():
+        cols = "  ".join(f"{metric}={value:<10.4g}" for metric, value in metrics.items())
+        print(f"{name:<{width}}  {cols}")
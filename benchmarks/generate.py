@@ -0,0 +1,211 @@
+"""
+Generate synthetic Python and R packages for benchmarking ``doppel-describe``.
+
+Every generated package has ``modules`` modules (R files, for R packages),
+each with ``functions`` functions and ``classes`` classes. Every class has
+``methods`` public methods of its own and inherits from a chain of
+``inheritance_depth`` base classes, each adding one more method.
+
+Python-only options:
+
+* ``decorator_depth``: number of decorators wrapped around each function
+* ``reexports``: number of modules whose functions and classes are also
+  re-exported from the package's ``__init__.py``. All other modules are
+  only available as submodules.
+
+Usage:
+
+    python benchmarks/generate.py --language python --name bigpkg --output-dir /tmp/pkgs
+"""
+
+import argparse
+import os
+from typing import List, NamedTuple
+
+
+class PackageShape(NamedTuple):
+    """
+    Size and structure of a generated package.
+    """
+
+    modules: int = 10
+    functions: int = 10
+    classes: int = 5
+    methods: int = 5
+    decorator_depth: int = 1
+    inheritance_depth: int = 2
+    reexports: int = 5
+
+    def num_objects(self) -> int:
+        """
+        Number of functions, classes and public methods that
+        ``doppel-describe`` should find in the package.
+        """
+        # every class also gets a constructor and a method from each base class
+        methods_per_class = self.methods + self.inheritance_depth + 1
+        return self.modules * (self.functions + self.classes * (1 + methods_per_class))
+
+
+def _args(i: int) -> str:
+    # vary the kinds of arguments a bit
+    return ["x", "x, y=1", "x, *args", "x, y, **kwargs", "x, *, flag=False"][i % 5]
+
+
+def _python_module(module: int, shape: PackageShape) -> str:
+    lines = ["from . import _decorators", "", ""]
+    for f in range(shape.functions):
+        lines += ["@_decorators.passthrough"] * shape.decorator_depth
+        lines += [f"def func_{module}_{f}({_args(f)}):", f'    """function {f}"""', "    return x"]
+        lines += ["", ""]
+
+    # chain of private base classes, shared by all the classes in this module
+    parent = "object"
+    for depth in range(shape.inheritance_depth):
+        base = f"_Base{module}_{depth}"
+        lines += [f"class {base}({parent}):", f"    def base_method_{depth}(self, value):"]
+        lines += ["        return value", "", ""]
+        parent = base
+
+    for c in range(shape.classes):
+        lines += [f"class Class{module}_{c}({parent}):", f'    """class {c}"""', ""]
+        lines += ["    def __init__(self, name, size=0):", "        self.name = name", ""]
+        for m in range(shape.methods):
+            lines += [f"    def method_{m}(self, {_args(m)}):", "        return x", ""]
+        lines += ["    def _private(self):", "        return None", "", ""]
+
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def generate_python_package(name: str, output_dir: str, shape: PackageShape) -> str:
+    """
+    Write a Python package to ``output_dir/name``.
+
+    :return: Path to the package
+    """
+    pkg_dir = os.path.join(output_dir, name)
+    os.makedirs(pkg_dir, exist_ok=True)
+
+    with open(os.path.join(pkg_dir, "_decorators.py"), "w") as f:
+        f.write(
+            "import functools\n\n\n"
+            "def passthrough(func):\n"
+            "    @functools.wraps(func)\n"
+            "    def wrapper(*args, **kwargs):\n"
+            "        return func(*args, **kwargs)\n\n"
+            "    return wrapper\n"
+        )
+
+    init_lines: List[str] = []
+    for module in range(shape.modules):
+        with open(os.path.join(pkg_dir, f"mod_{module}.py"), "w") as f:
+            f.write(_python_module(module, shape))
+        init_lines.append(f"from . import mod_{module}")
+        if module < shape.reexports:
+            names = [f"func_{module}_{i}" for i in range(shape.functions)]
+            names += [f"Class{module}_{i}" for i in range(shape.classes)]
+            for exported in names:
+                init_lines.append(f"from .mod_{module} import {exported}")
+
+    with open(os.path.join(pkg_dir, "__init__.py"), "w") as f:
+        f.write("\n".join(init_lines) + "\n")
+
+    return pkg_dir
+
+
+def _r_file(module: int, shape: PackageShape) -> str:
+    lines = []
+    for f in range(shape.functions):
+        r_args = _args(f).replace("*args", "...").replace("**kwargs", "...").replace("*, ", "")
+        r_args = r_args.replace("=False", " = FALSE").replace("=1", " = 1")
+        lines += [f"func_{module}_{f} <- function({r_args}) {{", "    return(x)", "}", ""]
+
+    parent = None
+    for depth in range(shape.inheritance_depth):
+        base = f".Base{module}_{depth}"
+        inherit = f"    inherit = {parent},\n" if parent else ""
+        lines += [
+            f"{base} <- R6::R6Class(",
+            f'    classname = "Base{module}_{depth}",',
+            f"{inherit}    public = list(",
+            f"        base_method_{depth} = function(value) {{ return(value) }}",
+            "    )",
+            ")",
+            "",
+        ]
+        parent = base
+
+    for c in range(shape.classes):
+        methods = [
+            f"        method_{m} = function(x) {{ return(x) }}" for m in range(shape.methods)
+        ]
+        methods.append("        initialize = function(name, size = 0) { self$name <- name }")
+        inherit = f"    inherit = {parent},\n" if parent else ""
+        lines += [
+            f"Class{module}_{c} <- R6::R6Class(",
+            f'    classname = "Class{module}_{c}",',
+            f"{inherit}    public = list(",
+            "        name = NULL,",
+            ",\n".join(methods),
+            "    )",
+            ")",
+            "",
+        ]
+
+    return "\n".join(lines)
+
+
+def generate_r_package(name: str, output_dir: str, shape: PackageShape) -> str:
+    """
+    Write the source code of an R package to ``output_dir/name``.
+    It has to be installed (``R CMD INSTALL``) before it can be described.
+
+    :return: Path to the package
+    """
+    pkg_dir = os.path.join(output_dir, name)
+    os.makedirs(os.path.join(pkg_dir, "R"), exist_ok=True)
+
+    with open(os.path.join(pkg_dir, "DESCRIPTION"), "w") as f:
+        f.write(
+            f"Package: {name}\n"
+            "Type: Package\n"
+            f"Title: {name}\n"
+            "Version: 0.0.1\n"
+            "Description: Synthetic package for benchmarking doppel-cli\n"
+            "Imports:\n    R6\n"
+            "License: BSD_3_clause\n"
+            "Encoding: UTF-8\n"
+        )
+
+    exports = []
+    for module in range(shape.modules):
+        with open(os.path.join(pkg_dir, "R", f"mod_{module}.R"), "w") as f:
+            f.write(_r_file(module, shape))
+        exports += [f"func_{module}_{i}" for i in range(shape.functions)]
+        exports += [f"Class{module}_{i}" for i in range(shape.classes)]
+
+    with open(os.path.join(pkg_dir, "NAMESPACE"), "w") as f:
+        f.write("".join(f"export({exported})\n" for exported in exports))
+        f.write("importFrom(R6,R6Class)\n")
+
+    return pkg_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--language", choices=["python", "r"], default="python")
+    parser.add_argument("--name", required=True, help="Name of the package")
+    parser.add_argument("--output-dir", required=True, help="Directory to write the package to")
+    for field, default in PackageShape._field_defaults.items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=int, default=default)
+    args = parser.parse_args()
+
+    shape = PackageShape(**{field: getattr(args, field) for field in PackageShape._fields})
+    if args.language == "python":
+        pkg_dir = generate_python_package(args.name, args.output_dir, shape)
+    else:
+        pkg_dir = generate_r_package(args.name, args.output_dir, shape)
+    print(f"Wrote {pkg_dir} ({shape.num_objects()} objects)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,16 +2,21 @@
 Custom error class for testing errors
 """
 
+from typing import Optional
+
 
 class DoppelTestError:
     """
     Custom error class used for testing issues.
 
     :param msg: Error text to print
+    :param check: Name of the check that found the error,
+        like ``"function_names"``
     """
 
-    def __init__(self, msg: str):
+    def __init__(self, msg: str, check: Optional[str] = None):
         self.msg = msg
+        self.check = check
 
     def __str__(self) -> str:
         return f"{self.msg}\n"
@@ -2,15 +2,30 @@
 Class for package details.
 """
 
-import json
-from typing import Any, Dict, List
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from doppel.binary import is_binary, read_binary
+from doppel.loader import compact_package, expand_package, read_package
 
 
 def _log_info(msg: str) -> None:
     print(msg)
 
 
-class PackageAPI:
+def _read_only(value: Any) -> Any:
+    """
+    Copy of a parsed JSON value that can't be changed in place:
+    dictionaries become ``MappingProxyType`` and lists become tuples.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({k: _read_only(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_read_only(v) for v in value)
+    return value
+
+
+class PackageAPI:  # pylint: disable=too-many-instance-attributes
     """Package API class
 
     This class is used to hold the interface of a given package
@@ -31,13 +46,45 @@ class PackageAPI:
         """
 
         self._validate_pkg(pkg_dict)
-        self.pkg_dict = pkg_dict
+        self._load(compact_package(pkg_dict))
+
+    def _load(self, compact: Mapping[str, Any]) -> None:
+        """
+        Store a package description (in the compact form
+        from ``doppel.loader``) and build sorted, immutable views
+        of its names once, so that repeated queries from the
+        reporters don't re-sort anything.
+        """
+        self._compact = compact
+        self._pkg_dict: Optional[Mapping[str, Any]] = None
+
+        self._function_args: Mapping[str, Tuple[str, ...]] = compact["functions"]
+        self._function_names = tuple(sorted(self._function_args.keys()))
+        self._function_set = frozenset(self._function_names)
+
+        self._method_args: Mapping[str, Mapping[str, Tuple[str, ...]]] = compact["classes"]
+        self._class_names = tuple(sorted(self._method_args.keys()))
+        self._class_set = frozenset(self._class_names)
+        self._methods = {
+            class_name: tuple(sorted(method_args.keys()))
+            for class_name, method_args in self._method_args.items()
+        }
+
+    @classmethod
+    def _from_compact(cls, compact: Mapping[str, Any]) -> "PackageAPI":
+        cls._validate_pkg(compact)
+        pkg = cls.__new__(cls)
+        pkg._load(compact)
+        return pkg
 
     @classmethod
     def from_json(cls, filename: str) -> "PackageAPI":
         """
         Instantiate a Package object from a file.
 
+        The file is read incrementally, so memory usage depends on
+        the size of the package's API rather than the size of the file.
+
         :param filename: Name of the JSON file
             that contains the description of the
             target package's API.
@@ -47,13 +94,66 @@ class PackageAPI:
 
         # read in output of "analyze.*" script
         with open(filename, "r") as f:
-            pkg_dict = json.loads(f.read())
+            compact = read_package(f)
 
         # validate
-        return cls(pkg_dict)
+        return cls._from_compact(compact)
+
+    @classmethod
+    def from_binary(cls, filename: str) -> "PackageAPI":
+        """
+        Instantiate a Package object from a file in the
+        binary format (see ``doppel.binary``).
+
+        The file is memory-mapped. Names are read right away, but
+        argument lists are only read when they're needed.
+
+        :param filename: Name of the binary file
+            that contains the description of the
+            target package's API.
+
+        """
+        _log_info(f"Creating package from {filename}")
+        return cls._from_compact(read_binary(filename))
+
+    @classmethod
+    def from_file(cls, filename: str) -> "PackageAPI":
+        """
+        Instantiate a Package object from a file written
+        by ``doppel-describe``, in either the JSON or the binary format.
+
+        :param filename: Name of the file
+            that contains the description of the
+            target package's API.
+
+        """
+        if is_binary(filename):
+            return cls.from_binary(filename)
+        return cls.from_json(filename)
+
+    @property
+    def pkg_dict(self) -> Mapping[str, Any]:
+        """
+        Read-only dictionary representation of the package, in the
+        output format of doppel-describe. Dictionaries in it are
+        ``types.MappingProxyType`` and argument lists are tuples, so
+        it always matches what the other methods on this class return.
+        It is built (once) from the compact form the package is stored
+        in, so prefer those methods when working with big packages.
+
+        Setting it replaces the package's description.
+        """
+        if self._pkg_dict is None:
+            self._pkg_dict = _read_only(expand_package(self._compact))
+        return self._pkg_dict
+
+    @pkg_dict.setter
+    def pkg_dict(self, pkg_dict: Dict[str, Any]) -> None:
+        self._validate_pkg(pkg_dict)
+        self._load(compact_package(pkg_dict))
 
     @staticmethod
-    def _validate_pkg(pkg_dict: Dict[str, Any]) -> None:
+    def _validate_pkg(pkg_dict: Mapping[str, Any]) -> None:
         assert isinstance(pkg_dict, dict)
         assert pkg_dict["name"] is not None
         assert pkg_dict["language"] is not None
@@ -64,25 +164,41 @@ class PackageAPI:
         """
         Get the name of the package.
         """
-        return self.pkg_dict["name"]
+        return self._compact["name"]
 
     def num_functions(self) -> int:
         """
         Get the number of exported functions in the package.
         """
-        return len(self.function_names())
+        return len(self._function_names)
 
-    def function_names(self) -> List[str]:
+    def function_names(self) -> Tuple[str, ...]:
         """
-        Get a list with the names of all exported functions
+        Get a sorted tuple with the names of all exported functions
         in the package.
         """
-        return sorted(list(self.pkg_dict["functions"].keys()))
+        return self._function_names
 
-    def functions_with_args(self) -> Dict[str, Dict[str, Any]]:
+    def function_args(self, func_name: str) -> Tuple[str, ...]:
         """
-        Get a dictionary with all exported functions in the package
-        and some  details describing them.
+        Get a tuple of arguments for an exported function.
+
+        :param func_name: Name of a function in the package
+        """
+        return self._function_args[func_name]
+
+    def has_function(self, func_name: str) -> bool:
+        """
+        Check whether the package exports a function.
+
+        :param func_name: Name of the function
+        """
+        return func_name in self._function_set
+
+    def functions_with_args(self) -> Mapping[str, Mapping[str, Any]]:
+        """
+        Get a read-only dictionary with all exported functions in the
+        package and some details describing them (see ``pkg_dict``).
         """
         return self.pkg_dict["functions"]
 
@@ -90,28 +206,45 @@ class PackageAPI:
         """
         Get the number of exported classes in the package.
         """
-        return len(self.class_names())
+        return len(self._class_names)
 
-    def class_names(self) -> List[str]:
+    def class_names(self) -> Tuple[str, ...]:
         """
-        Get a list with the names of all exported classes
+        Get a sorted tuple with the names of all exported classes
         in the package.
         """
-        return sorted(list(self.pkg_dict["classes"].keys()))
+        return self._class_names
+
+    def has_class(self, class_name: str) -> bool:
+        """
+        Check whether the package exports a class.
+
+        :param class_name: Name of the class
+        """
+        return class_name in self._class_set
+
+    def public_methods(self, class_name: str) -> Tuple[str, ...]:
+        """
+        Get a sorted tuple with the names of all public methods for a class.
+
+        :param class_name: Name of a class in the package
+        """
+        return self._methods[class_name]
 
-    def public_methods(self, class_name: str) -> List[str]:
+    def has_public_method(self, class_name: str, method_name: str) -> bool:
         """
-        Get a list with the names of all public methods for a class.
+        Check whether a class in the package has a public method.
 
         :param class_name: Name of a class in the package
+        :param method_name: Name of the method
         """
-        return sorted(list(self.pkg_dict["classes"][class_name]["public_methods"].keys()))
+        return class_name in self._class_set and method_name in self._method_args[class_name]
 
-    def public_method_args(self, class_name: str, method_name: str) -> List[str]:
+    def public_method_args(self, class_name: str, method_name: str) -> Tuple[str, ...]:
         """
-        Get a list of arguments for a public method from a class.
+        Get a tuple of arguments for a public method from a class.
 
         :param class_name: Name of a class in the package
         :param method-name: Name of the method to get arguments for
         """
-        return list(self.pkg_dict["classes"][class_name]["public_methods"][method_name]["args"])
+        return self._method_args[class_name][method_name]
@@ -3,17 +3,91 @@
 a list of multiple ``PackageAPI`` objects.
 """
 
-from typing import Dict, List, Set
+import sys
+from typing import Dict, Iterable, List
 
 from doppel.PackageAPI import PackageAPI
 
 
-class PackageCollection:
+class _SymbolTable:
+    """
+    Names of symbols (functions, classes, methods) found in a
+    collection of packages.
+
+    Each name is interned and given an integer ID. For every ID, the
+    table holds a bitmask of the packages the symbol was found in
+    (bit ``i`` is set if it exists in the ``i``-th package) and the
+    number of packages it was found in.
+    """
+
+    def __init__(self, num_packages: int):
+        self.num_packages = num_packages
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.masks: List[int] = []
+        self.counts: List[int] = []
+
+    def add(self, names: Iterable[str], pkg_index: int) -> None:
+        """
+        Record that all of ``names`` exist in the ``pkg_index``-th package.
+        """
+        bit = 1 << pkg_index
+        for name in names:
+            symbol_id = self.ids.get(name)
+            if symbol_id is None:
+                symbol_id = len(self.names)
+                name = sys.intern(name)
+                self.ids[name] = symbol_id
+                self.names.append(name)
+                self.masks.append(0)
+                self.counts.append(0)
+            if not self.masks[symbol_id] & bit:
+                self.masks[symbol_id] |= bit
+                self.counts[symbol_id] += 1
+
+    def sort(self) -> None:
+        """
+        Re-number the symbols in order of their names, so
+        everything read from the table comes out sorted.
+        """
+        order = sorted(range(len(self.names)), key=self.names.__getitem__)
+        self.names = [self.names[i] for i in order]
+        self.masks = [self.masks[i] for i in order]
+        self.counts = [self.counts[i] for i in order]
+        self.ids = {name: symbol_id for symbol_id, name in enumerate(self.names)}
+
+    def mask(self, name: str) -> int:
+        """
+        Bitmask of the packages that ``name`` exists in.
+        """
+        symbol_id = self.ids.get(name)
+        if symbol_id is None:
+            return 0
+        return self.masks[symbol_id]
+
+    def in_at_least(self, k: int) -> List[str]:
+        """
+        Names of all symbols that exist in at least ``k`` packages.
+        """
+        return [name for name, count in zip(self.names, self.counts) if count >= k]
+
+    def in_fewer_than(self, k: int) -> List[str]:
+        """
+        Names of all symbols that exist in fewer than ``k`` packages.
+        """
+        return [name for name, count in zip(self.names, self.counts) if count < k]
+
+
+class PackageCollection:  # pylint: disable=too-many-instance-attributes
     """
     Create a collection of multiple ``PackageAPI`` objects.
     This class contains access methods so you don't have to
     keep doing ``for package in packages`` over a collection
     of ``PackageAPI`` instances.
+
+    The comparison between packages is computed once, when the
+    collection is created. Every method below just reads from it,
+    and lists of names are always sorted.
     """
 
     def __init__(self, packages: List[PackageAPI]):
@@ -32,6 +106,30 @@ class PackageCollection:
             raise ValueError(msg)
 
         self.pkgs = packages
+        self._num_pkgs = len(packages)
+
+        self._functions = _SymbolTable(self._num_pkgs)
+        self._classes = _SymbolTable(self._num_pkgs)
+        for i, pkg in enumerate(packages):
+            self._functions.add(pkg.function_names(), i)
+            self._classes.add(pkg.class_names(), i)
+        self._functions.sort()
+        self._classes.sort()
+
+        # public methods are compared within each class
+        self._methods: Dict[str, _SymbolTable] = {}
+        for class_name, mask in zip(self._classes.names, self._classes.masks):
+            methods = _SymbolTable(self._num_pkgs)
+            for i, pkg in enumerate(packages):
+                if mask & (1 << i):
+                    methods.add(pkg.public_methods(class_name), i)
+            methods.sort()
+            self._methods[class_name] = methods
+
+        self._shared_functions = self._functions.in_at_least(self._num_pkgs)
+        self._non_shared_functions = self._functions.in_fewer_than(self._num_pkgs)
+        self._shared_classes = self._classes.in_at_least(self._num_pkgs)
+        self._non_shared_classes = self._classes.in_fewer_than(self._num_pkgs)
 
     def package_names(self) -> List[str]:
         """
@@ -39,76 +137,101 @@ class PackageCollection:
         """
         return [p.name() for p in self.pkgs]
 
+    def _presence(self, mask: int) -> List[bool]:
+        return [bool(mask & (1 << i)) for i in range(self._num_pkgs)]
+
     def all_classes(self) -> List[str]:
         """
         List of all classes that exist in at least
         one of the packages.
         """
-        out: Set[str] = set([])
-        for pkg in self.pkgs:
-            out = out.union(pkg.class_names())
-        return list(out)
+        return list(self._classes.names)
 
     def shared_classes(self) -> List[str]:
         """
         List of shared classes
         across all the packages in the collection
         """
-        # Only work on shared classes
-        out = set(self.pkgs[0].class_names())
-        for pkg in self.pkgs[1:]:
-            out = out.intersection(pkg.class_names())
-        return list(out)
+        return list(self._shared_classes)
 
     def non_shared_classes(self) -> List[str]:
         """
         List of all classes that are present in
         at least one but not ALL packages
         """
-        all_classes = set(self.all_classes())
-        shared_classes = set(self.shared_classes())
-        return list(all_classes.difference(shared_classes))
+        return list(self._non_shared_classes)
+
+    def classes_in_at_least(self, k: int) -> List[str]:
+        """
+        List of all classes that are present in
+        at least ``k`` of the packages.
+
+        :param k: Minimum number of packages
+        """
+        return self._classes.in_at_least(k)
+
+    def class_presence(self, class_name: str) -> List[bool]:
+        """
+        For each package, whether or not it exports a class.
+
+        :param class_name: Name of the class
+        """
+        return self._presence(self._classes.mask(class_name))
 
     def all_functions(self) -> List[str]:
         """
         List of all functions that exist in at least
         one of the packages.
         """
-        out: Set[str] = set([])
-        for pkg in self.pkgs:
-            out = out.union(pkg.function_names())
-        return list(out)
+        return list(self._functions.names)
 
     def shared_functions(self) -> List[str]:
         """
         List of shared functions
         across all the packages in the collection
         """
-        # Only work on shared classes
-        out = set(self.pkgs[0].function_names())
-        for pkg in self.pkgs[1:]:
-            out = out.intersection(pkg.function_names())
-        return list(out)
+        return list(self._shared_functions)
 
     def non_shared_functions(self) -> List[str]:
         """
         List of all functions that are present in
         at least one but not ALL packages
         """
-        all_funcs = set(self.all_functions())
-        shared_funcs = set(self.shared_functions())
-        return list(all_funcs.difference(shared_funcs))
+        return list(self._non_shared_functions)
+
+    def functions_in_at_least(self, k: int) -> List[str]:
+        """
+        List of all functions that are present in
+        at least ``k`` of the packages.
+
+        :param k: Minimum number of packages
+        """
+        return self._functions.in_at_least(k)
+
+    def function_presence(self, func_name: str) -> List[bool]:
+        """
+        For each package, whether or not it exports a function.
+
+        :param func_name: Name of the function
+        """
+        return self._presence(self._functions.mask(func_name))
 
     def shared_methods_by_class(self) -> Dict[str, List[str]]:
         """
         List of public methods in each shared
         class across all packages
         """
-        out = {}
-        shared_classes = self.shared_classes()
-        for class_name in shared_classes:
-            methods = set(self.pkgs[0].public_methods(class_name))
-            for pkg in self.pkgs[1:]:
-                methods = methods.intersection(pkg.public_methods(class_name))
-            out[class_name] = list(methods)
-        return out
+        return {
+            class_name: self._methods[class_name].in_at_least(self._num_pkgs)
+            for class_name in self._shared_classes
+        }
+
+    def non_shared_methods_by_class(self) -> Dict[str, List[str]]:
+        """
+        List of public methods in each shared class
+        that are not present in ALL packages
+        """
+        return {
+            class_name: self._methods[class_name].in_fewer_than(self._num_pkgs)
+            for class_name in self._shared_classes
+        }
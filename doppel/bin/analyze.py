@@ -1,14 +1,26 @@
 #!/usr/bin/env python3
 
 import argparse
+import ast
+import builtins
+import cProfile
+import hashlib
+import importlib.util
 import inspect
 import json
 import logging
 import os
-import re
 import sys
+import time
 import types
-from typing import Any, Callable, List
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # not available on Windows
+    resource = None  # type: ignore[assignment]
 
 logger = logging.getLogger()
 logging.basicConfig(
@@ -17,6 +29,240 @@ logging.basicConfig(
     stream=sys.stdout,
 )
 
+LANGUAGE = "python"
+
+# Other repeated constants
+ARGS_KEY = "args"
+CLASSES_KEY = "classes"
+FUNCTIONS_KEY = "functions"
+PUBLIC_METHODS_KEY = "public_methods"
+
+# These are lanaguage-specific
+# conventions we can drop
+SELF_KEYWORD = "self"
+CLASS_KEYWORD = "cls"
+SPECIAL_METHOD_ARGS = [SELF_KEYWORD, CLASS_KEYWORD]
+
+# Keys only used in the per-module results of _describe_module()
+SUBMODULES_KEY = "submodules"
+DEPENDS_ON_KEY = "depends_on"
+NAMES_HASH_KEY = "names_hash"
+# names declared by a module but not yet in its namespace, like
+# those loaded by a module-level __getattr__ (PEP 562)
+LAZY_KEY = "lazy"
+
+# Keys in the optional "_meta" block of the output, with timings
+META_KEY = "_meta"
+MODULES_KEY = "modules"
+SECONDS_KEY = "seconds"
+ATTRIBUTES_KEY = "attributes"
+RESOURCES_KEY = "resources"
+
+# Set by doppel-describe --trace, see doppel/tracing.py
+TRACE_ENV_VAR = "DOPPEL_TRACE_CONTEXT"
+
+# Identifies this version of the analysis code
+with open(__file__, "rb") as _f:
+    _ANALYZER_HASH = hashlib.sha256(_f.read()).hexdigest()
+
+
+class _PhaseTimer:
+    """
+    Time spent in each phase of describing a package. Phases can be
+    nested, and time in an inner phase is not counted in the outer one.
+    This is a copy of doppel.profiling.PhaseTimer, plus trace events. It
+    can't import that one: this script is run on its own, by whichever
+    Python has the package being described installed, and doppel may not
+    be installed there. Keep the two in sync.
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._stack: List[str] = []
+        self._started = 0.0
+        # when tracing, a Chrome trace event for each phase goes
+        # in events, on the process and thread in trace_ids
+        self.trace_ids: Optional[Dict[str, int]] = None
+        self.events: List[Dict[str, Any]] = []
+
+    def _charge(self, now: float) -> None:
+        if self._stack:
+            name = self._stack[-1]
+            self.timings[name] = self.timings.get(name, 0.0) + now - self._started
+        self._started = now
+
+    @contextmanager
+    def phase(self, name: str, detail: Optional[str] = None) -> Iterator[None]:
+        self._charge(time.perf_counter())
+        self._stack.append(name)
+        start_us = time.time_ns() / 1000
+        try:
+            yield
+        finally:
+            self._charge(time.perf_counter())
+            self._stack.pop()
+            if self.trace_ids is not None:
+                end_us = time.time_ns() / 1000
+                event = {"name": name, "ph": "X", "ts": start_us, "dur": end_us - start_us}
+                event.update(self.trace_ids)
+                if detail is not None:
+                    event["args"] = {"name": detail}
+                self.events.append(event)
+
+
+_TIMER = _PhaseTimer()
+
+# about the last package described
+_LAST_RUN = {"modules_walked": 0}
+
+
+class _Memo:
+    """
+    Results computed from objects during one describe_package() run.
+
+    Results are keyed on the identity of the object (plus ``key``), so
+    unhashable objects can be used. A reference to each object is kept,
+    so its ``id()`` can't be re-used by another object during the run.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._results: Dict[Tuple[Any, ...], Tuple[Any, Any]] = {}
+
+    def lookup(self, obj: Any, compute: Callable[..., Any], *args: Any, key: Tuple = ()) -> Any:
+        """
+        Return ``compute(*args)`` for ``obj``, only calling it the first time.
+        """
+        memo_key = (id(obj),) + key
+        if memo_key in self._results:
+            self.hits += 1
+            return self._results[memo_key][1]
+        self.misses += 1
+        result = compute(*args)
+        self._results[memo_key] = (obj, result)
+        return result
+
+    def clear(self) -> None:
+        """
+        Forget all results, at the start of a run.
+        """
+        self._results.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def log_counts(self) -> None:
+        """
+        Log how often results were re-used.
+        """
+        msg = "{} cache: {} hits, {} misses".format(self.name, self.hits, self.misses)
+        logger.debug(msg)
+
+
+# decorators removed from each object, other than bound methods
+_UNWRAPPED = _Memo("decorator")
+# argument names of each function, keyed on the function
+# (not the bound method) so all classes share them
+_ARG_NAMES = _Memo("signature")
+# class members, keyed on the class in the MRO that defines them, so
+# members inherited from a base class are only inspected once
+_CLASS_MEMBERS = _Memo("class member")
+_MEMOS = [_UNWRAPPED, _ARG_NAMES, _CLASS_MEMBERS]
+
+
+def phase_timings() -> Dict[str, float]:
+    """
+    Seconds spent in each phase ("import", "module walk", "class introspection"
+    and "JSON write") of the last package described.
+    """
+    return dict(_TIMER.timings)
+
+
+def modules_walked() -> int:
+    """
+    Number of modules walked to describe the last package.
+    """
+    return _LAST_RUN["modules_walked"]
+
+
+def start_tracing(pid: int, tid: int) -> None:
+    """
+    Record a Chrome trace event for each phase from now on, as if it
+    ran on thread ``tid`` of process ``pid``.
+    """
+    _TIMER.trace_ids = {"pid": pid, "tid": tid}
+    _TIMER.events = []
+
+
+def stop_tracing() -> List[Dict[str, Any]]:
+    """
+    Stop recording trace events and return the ones recorded.
+    """
+    _TIMER.trace_ids = None
+    events = _TIMER.events
+    _TIMER.events = []
+    return events
+
+
+def usage_snapshot() -> Tuple[float, float, float]:
+    """
+    Wall time, user CPU time and system CPU time of this process so far,
+    to pass to resource_usage() later.
+    """
+    if resource is None:  # pragma: no cover
+        return (time.perf_counter(), 0.0, 0.0)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return (time.perf_counter(), usage.ru_utime, usage.ru_stime)
+
+
+def resource_usage(since: Tuple[float, float, float]) -> Dict[str, float]:
+    """
+    Wall time, user and system CPU time used since ``since`` (from
+    usage_snapshot()), and the peak resident set size of this process.
+    CPU time and memory are only measured on platforms with the
+    ``resource`` module.
+    """
+    wall_seconds = time.perf_counter() - since[0]
+    if resource is None:  # pragma: no cover
+        return {"wall_seconds": wall_seconds}
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is in bytes on macOS and kilobytes everywhere else
+    rss_bytes = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    return {
+        "wall_seconds": wall_seconds,
+        "user_cpu_seconds": usage.ru_utime - since[1],
+        "system_cpu_seconds": usage.ru_stime - since[2],
+        "peak_rss_mb": rss_bytes / (1024 * 1024),
+    }
+
+
+def log_resource_usage(pkg_name: str, usage: Dict[str, float]) -> None:
+    logger.info(
+        "Resources used to describe {}: {}".format(
+            pkg_name, ", ".join("{}={:.3f}".format(k, v) for k, v in usage.items())
+        )
+    )
+
+
+@contextmanager
+def _record_timing(
+    meta: Optional[Dict[str, Any]], section: str, name: str
+) -> Iterator[Dict[str, Any]]:
+    """
+    Record the time spent in a block in ``meta[section][name]``. The block can
+    add other details (like the number of attributes examined) to the yielded
+    dictionary. Nothing is recorded if ``meta`` is None.
+    """
+    entry: Dict[str, Any] = {}
+    started = time.perf_counter()
+    try:
+        yield entry
+    finally:
+        if meta is not None:
+            entry[SECONDS_KEY] = time.perf_counter() - started
+            meta[section][name] = entry
+
 
 def parse_args(args):
     parser = argparse.ArgumentParser()
@@ -33,10 +279,82 @@ def parse_args(args):
     parser.add_argument(
         "--verbose", action="store_true", help="Use this flag to get more detailed logs"
     )
+    parser.add_argument(
+        "--mode",
+        type=str,
+        choices=["import", "static"],
+        default="import",
+        help=(
+            "How to find the package's API. 'import' imports the package and inspects "
+            "the live objects. 'static' parses its source files without importing it."
+        ),
+    )
+    parser.add_argument(
+        "--traversal",
+        type=str,
+        choices=["dir", "namespace"],
+        default="dir",
+        help=(
+            "How to find the names in each module. 'dir' gets every attribute in dir(). "
+            "'namespace' reads the module's __dict__, limited to __all__ if it is defined, "
+            "and doesn't load names provided lazily by a module-level __getattr__. "
+            "Ignored with --mode static."
+        ),
+    )
+    parser.add_argument(
+        "--class-introspection",
+        type=str,
+        choices=["getattr", "static"],
+        default="getattr",
+        help=(
+            "How to get class attributes. 'getattr' uses getattr(), which runs properties, "
+            "descriptors and metaclass hooks. 'static' uses inspect.getattr_static() and "
+            "skips descriptors whose __get__() is written in Python. "
+            "Ignored with --mode static."
+        ),
+    )
+    parser.add_argument(
+        "--resolve-lazy",
+        action="store_true",
+        help="With --traversal namespace, load and describe lazily-provided names too.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Store per-module results next to the output file, and only re-introspect "
+            "modules whose source changed since the last run. Ignored with --mode static."
+        ),
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help=(
+            "Record the time spent on each module and class, and the number of attributes "
+            "examined, in a '_meta' block of the output."
+        ),
+    )
+    parser.add_argument(
+        "--stats",
+        type=str,
+        default=None,
+        help="Write the time spent in each phase and the number of modules walked to this file.",
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        help=(
+            "Profile this run with cProfile and write the statistics to this file. "
+            "Time spent in each phase is written to '<file>.phases.json'."
+        ),
+    )
     return parser.parse_args(args)
 
 
-def do_everything(parsed_args):
+def do_everything(parsed_args) -> Dict[str, Any]:
+    started = usage_snapshot()
+
     # Grab args (store in constants for easier debugging)
     PKG_NAME = parsed_args.pkg
     OUT_DIR = parsed_args.output_dir
@@ -50,67 +368,367 @@ def do_everything(parsed_args):
     else:
         logger.setLevel(logging.INFO)
 
-    LANGUAGE = "python"
+    profiler = None
+    if parsed_args.profile is not None:
+        profiler = cProfile.Profile()
+        profiler.enable()
 
-    # Other repeated constants
-    ARGS_KEY = "args"
-    CLASSES_KEY = "classes"
-    FUNCTIONS_KEY = "functions"
-    PUBLIC_METHODS_KEY = "public_methods"
+    trace_context = json.loads(os.environ.get(TRACE_ENV_VAR, "null"))
+    if trace_context is not None:
+        start_tracing(pid=trace_context["pid"], tid=trace_context["tid"])
 
-    # These are lanaguage-specific
-    # conventions we can drop
-    SELF_KEYWORD = "self"
-    CLASS_KEYWORD = "cls"
-    SPECIAL_METHOD_ARGS = [SELF_KEYWORD, CLASS_KEYWORD]
+    out = describe_package(
+        pkg_name=PKG_NAME,
+        kwargs_string=KWARGS_STRING,
+        constructor_string=CONSTRUCTOR_STRING,
+        mode=parsed_args.mode,
+        sidecar_file=sidecar_path(PKG_NAME, OUT_DIR) if parsed_args.incremental else None,
+        timings=parsed_args.timings,
+        traversal=parsed_args.traversal,
+        resolve_lazy=parsed_args.resolve_lazy,
+        class_introspection=parsed_args.class_introspection,
+    )
+    usage = resource_usage(started)
+    log_resource_usage(PKG_NAME, usage)
+    if META_KEY in out:
+        out[META_KEY][RESOURCES_KEY] = usage
+    write_output(out, pkg_name=PKG_NAME, output_dir=OUT_DIR)
+
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(parsed_args.profile)
+        with open(parsed_args.profile + ".phases.json", "w") as f:
+            f.write(json.dumps(phase_timings()))
+
+    if parsed_args.stats is not None:
+        with open(parsed_args.stats, "w") as f:
+            f.write(json.dumps({"phases": phase_timings(), "modules_walked": modules_walked()}))
+
+    if trace_context is not None:
+        with open(trace_context["file"], "w") as f:
+            f.write(json.dumps(stop_tracing()))
+    return out
 
-    # value to use for an empty function
-    EMPTY_FUNCTION_DICT = {ARGS_KEY: []}
+
+def _get_arg_names(f: Callable, kwargs_string: str) -> List[str]:
+    """
+    Given a function object, get its argument names.
+    """
+    func = getattr(f, "__func__", f)
+    args = _ARG_NAMES.lookup(func, _inspect_arg_names, func, kwargs_string, key=(kwargs_string,))
+    # callers are free to change the list they get
+    return list(args)
+
+
+def _inspect_arg_names(f: Callable, kwargs_string: str) -> List[str]:
+    f_dict = inspect.getfullargspec(f)._asdict()
+    args = f_dict["args"] + f_dict["kwonlyargs"]
+    # deal with people passing "**kwargs"
+    if f_dict["varkw"] is not None:
+        args.append(kwargs_string)
+    return args
+
+
+_NOT_WRAPPED = object()
+
+
+def _remove_decorators(thing: Any, static: bool = False) -> Any:
+    """
+    Given a python object instrumented with one
+    or more decorators, keep removing decorators
+    until you get to the base object
+
+    With ``static=True``, ``__wrapped__`` is looked up with
+    ``inspect.getattr_static()``, so ``__getattr__()`` hooks don't run.
+    """
+    if isinstance(thing, types.MethodType):
+        # every getattr() creates a new bound method, so a result keyed on
+        # its id() would never be re-used, and would keep the method alive
+        return _unwrap(thing, static)
+    return _UNWRAPPED.lookup(thing, _unwrap, thing, static, key=(static,))
+
+
+def _unwrap(thing: Any, static: bool) -> Any:
+    if static:
+        wrapped = inspect.getattr_static(thing, "__wrapped__", _NOT_WRAPPED)
+    else:
+        wrapped = getattr(thing, "__wrapped__", _NOT_WRAPPED)
+    if wrapped is _NOT_WRAPPED:
+        return thing
+    else:
+        msg = "'{}' is decorated, grabbing the underlying object"
+        logger.info(msg.format(thing.__name__))
+        return _remove_decorators(wrapped, static=static)
+
+
+def _static_dir(cls: type) -> List[str]:
+    """
+    Like ``dir(cls)``, but without calling a ``__dir__()`` defined by
+    the class's metaclass.
+    """
+    names: Set[str] = set()
+    for klass in inspect.getmro(cls):
+        names.update(vars(klass))
+    return sorted(names)
+
+
+def _static_class_attribute(cls: type, name: str) -> Any:
+    """
+    What ``getattr(cls, name)`` returns, found with ``inspect.getattr_static()``
+    so that no descriptors or metaclass hooks defined in Python run. A
+    descriptor whose ``__get__()`` is written in Python (like
+    ``functools.cached_property``) could run any code, so ``None`` is
+    returned for it.
+    """
+    attribute = inspect.getattr_static(cls, name)
+    if isinstance(attribute, classmethod):
+        # not attribute.__get__(), which can run a descriptor wrapped in it
+        return types.MethodType(attribute.__func__, cls)
+    if _kind(attribute) == "class" or not hasattr(type(attribute), "__get__"):
+        return attribute
+    if not isinstance(inspect.getattr_static(type(attribute), "__get__"), types.FunctionType):
+        # the __get__() of functions, static methods, properties, lru_cache()
+        # wrappers and the descriptors of built-in types is implemented in C,
+        # and doesn't run any user code when there's no instance
+        return attribute.__get__(None, cls)
+    logger.debug("'{}' is a {}, skipping it".format(name, type(attribute).__name__))
+    return None
+
+
+class _ClassMember(NamedTuple):
+    """
+    What was found about one attribute of a class.
+
+    'module' is the ``__module__`` of the attribute, if it has one. 'name'
+    is the name to describe it under as a public method. 'args' are its
+    argument names, or ``None`` if it isn't a public method.
+    """
+
+    module: Optional[str]
+    name: Optional[str]
+    args: Optional[List[str]]
+
+
+def _defining_class(cls: type, name: str) -> Optional[type]:
+    """
+    The class in the MRO of ``cls`` whose namespace has attribute ``name``,
+    or ``None`` if it isn't in any of them.
+    """
+    for klass in inspect.getmro(cls):
+        if name in vars(klass):
+            return klass
+    return None
+
+
+def _describe_class_member(
+    obj: type, f: str, kwargs_string: str, constructor_string: str, class_introspection: str
+) -> _ClassMember:
+    """
+    Describe attribute ``f`` of class ``obj``. See describe_package()
+    for the other arguments.
+    """
+    is_constructor = f == "__init__"
+
+    # Check characteristics of this attribute
+    if class_introspection == "static":
+        class_member = _static_class_attribute(obj, f)
+    else:
+        class_member = getattr(obj, f)
+    class_member = _remove_decorators(class_member, static=class_introspection == "static")
+    member_module = getattr(class_member, "__module__", None)
+    if not isinstance(member_module, str):
+        member_module = None
+    is_function = _kind(class_member) == "function"
+
+    # class members like a dictionary or string literal
+    # should not be included
+    if not callable(class_member):
+        return _ClassMember(member_module, f, None)
+
+    # built-ins like 'min()' need special handling
+    if _is_builtin(class_member):
+        msg = f"found built-in '{class_member.__name__}', could not get signature"
+        logger.warning(msg)
+        return _ClassMember(member_module, f, [])
+
+    # Class methods are technically classes, types.FunctionType()
+    # yields false. But we want to treat them as public methods of
+    # a parent class here
+    # h/t https://stackoverflow.com/a/31843829 on the solution
+    #
+    # If ClassA has a class ClassB as a public member,
+    # ClassB is basically being used like a public method. Treat it
+    # like that and grab the arguments of its constructor
+    #
+    is_class_method = getattr(class_member, "__self__", None) is obj
+    if not is_function and not is_constructor and not is_class_method:
+        init_args = _get_arg_names(class_member.__init__, kwargs_string)
+        is_class_method = (CLASS_KEYWORD in init_args) or (SELF_KEYWORD in init_args)
+        if is_class_method:
+            class_member = class_member.__init__
+            is_function = True
+            logger.debug("'" + f + "' is a class method")
+
+    # Try figuring out the actual signature, to see if
+    # we hit the "no signature found for built-in" error
+    # details:
+    # https://docs.python.org/3/library/inspect.html#introspecting-callables-with-the-signature-object
+    #
+    # this is_function is still here to catch the case where the constructor
+    # wasn't implemented
+    if not is_function and not is_class_method:
+        return _ClassMember(member_module, f, None)
+    method_args = _get_arg_names(class_member, kwargs_string)
+
+    # Handle Python "self" conventions
+    method_args = [a for a in method_args if a not in SPECIAL_METHOD_ARGS]
+
+    # If we're dealing with the class constructor, use the
+    # passed-in replacement value
+    if is_constructor:
+        f = constructor_string
+
+    return _ClassMember(member_module, f, method_args)
+
+
+# the kind of object that instances of each type are, in the order
+# they are checked. These use the same names as _StaticObject.kind.
+_KINDS = [
+    (types.FunctionType, "function"),
+    (type, "class"),
+    (types.ModuleType, "module"),
+    (types.BuiltinFunctionType, "builtin"),
+]
+
+
+def _kind(obj: Any) -> str:
+    """
+    Whether ``obj`` is a ``"function"``, ``"class"``, ``"module"``,
+    ``"builtin"`` (like ``min()``) or ``"other"``.
+
+    This only looks at ``type(obj)``. Unlike ``isinstance()``, it doesn't
+    read ``obj.__class__``, and unlike ``str()`` it doesn't call a
+    ``__repr__()`` defined in Python, so no code from the package runs.
+    """
+    obj_type = type(obj)
+    for kind_type, kind in _KINDS:
+        if obj_type is kind_type:
+            return kind
+    # subclasses, like metaclasses or module types used for lazy loading
+    for kind_type, kind in _KINDS:
+        if issubclass(obj_type, kind_type):
+            return kind
+    return "other"
+
+
+def _is_builtin(obj: Any) -> bool:
+    """
+    Checks whether an object is a built-in,
+    such as 'min()'.
+    """
+    return _kind(obj) == "builtin"
+
+
+def _in_package(module_name: Any, pkg_name: str) -> bool:
+    """
+    Whether ``module_name`` (the ``__module__`` of something) is
+    ``pkg_name`` or one of its sub-modules.
+    """
+    if not isinstance(module_name, str):
+        return False
+    return module_name == pkg_name or module_name.startswith(pkg_name + ".")
+
+
+def describe_package(
+    pkg_name: str,
+    kwargs_string: str,
+    constructor_string: str,
+    mode: str = "import",
+    sidecar_file: Optional[str] = None,
+    timings: bool = False,
+    traversal: str = "dir",
+    resolve_lazy: bool = False,
+    class_introspection: str = "getattr",
+) -> Dict[str, Any]:
+    """
+    Describe the public API of a Python package.
+
+    This is the entrypoint used by doppel-describe when it runs
+    in the same process as this code. It returns the description
+    instead of writing it to a file.
+
+    :param pkg_name: Name of the package to describe
+    :param kwargs_string: String value to replace ``**kwargs`` with
+    :param constructor_string: String value to use as the name of class constructors
+    :param mode: ``"import"`` to import the package, ``"static"`` to parse its source
+    :param sidecar_file: Path to a file with per-module results from previous runs.
+        Modules whose source hasn't changed are not introspected again. The file
+        is created or updated with the results of this run. Only used with
+        ``mode="import"``.
+    :param timings: If ``True``, add a ``"_meta"`` block to the output with the
+        time spent on each module (including its classes) and class, and the
+        number of attributes examined in each. Modules re-used from
+        ``sidecar_file`` are not included. Callers can add the resources used
+        to describe the package (from resource_usage()) to it.
+    :param traversal: How to find the names in each module. ``"dir"`` gets every
+        attribute in ``dir(module)``. ``"namespace"`` reads ``vars(module)``, limited
+        to ``__all__`` if the module defines it, and skips names that a module-level
+        ``__getattr__`` would load lazily. These are logged, and listed in
+        ``"_meta"`` if ``timings`` is ``True``. Only used with ``mode="import"``.
+    :param resolve_lazy: With ``traversal="namespace"``, load and describe
+        lazily-provided names too.
+    :param class_introspection: How to get class attributes. ``"getattr"`` uses
+        ``getattr()``. ``"static"`` uses ``inspect.getattr_static()``, and skips
+        descriptors whose ``__get__()`` is written in Python.
+        Only used with ``mode="import"``.
+    """
+    _TIMER.timings.clear()
+    for memo in _MEMOS:
+        memo.clear()
+    meta: Optional[Dict[str, Any]] = {MODULES_KEY: {}, CLASSES_KEY: {}} if timings else None
+
+    if mode == "static":
+        if sidecar_file is not None:
+            logger.warning("Incremental describe is not supported with mode 'static', ignoring it")
+        return _describe_statically(
+            pkg_name=pkg_name,
+            kwargs_string=kwargs_string,
+            constructor_string=constructor_string,
+            meta=meta,
+        )
+
+    sidecar = None
+    if sidecar_file is not None:
+        sidecar = _Sidecar(
+            sidecar_file,
+            settings={
+                "analyzer": _ANALYZER_HASH,
+                "pkg_name": pkg_name,
+                "kwargs_string": kwargs_string,
+                "constructor_string": constructor_string,
+                "traversal": traversal,
+                "resolve_lazy": resolve_lazy,
+                "class_introspection": class_introspection,
+            },
+        )
 
     # Import that module
-    top_level_env = __import__(PKG_NAME)
+    with _TIMER.phase("import", pkg_name):
+        top_level_env = __import__(pkg_name)
 
     # Set up the thing
-    out = {
-        "name": "{} [python]".format(PKG_NAME),
+    out: Dict[str, Any] = {
+        "name": "{} [python]".format(pkg_name),
         "language": "python",
         FUNCTIONS_KEY: {},
         CLASSES_KEY: {},
     }
-
-    def _get_arg_names(f: Callable, kwargs_string: str) -> List[str]:
-        """
-        Given a function object, get its argument names.
-        """
-        f_dict = inspect.getfullargspec(f)._asdict()
-        args = f_dict["args"] + f_dict["kwonlyargs"]
-        # deal with people passing "**kwargs"
-        if f_dict["varkw"] is not None:
-            args.append(kwargs_string)
-        return args
-
-    def _remove_decorators(thing: Any) -> Any:
-        """
-        Given a python object instrumented with one
-        or more decorators, keep removing decorators
-        until you get to the base object
-        """
-        if not hasattr(thing, "__wrapped__"):
-            return thing
-        else:
-            msg = "'{}' is decorated, grabbing the underlying object"
-            logger.info(msg.format(thing.__name__))
-            return _remove_decorators(thing.__wrapped__)
-
-    def _is_builtin(obj: Any) -> bool:
-        """
-        Checks whether an object is a built-in,
-        such as 'min()'.
-        """
-        return str(obj).startswith("<built-in ")
+    if meta is not None:
+        out[META_KEY] = meta
 
     modules_to_parse = [top_level_env]
     names_of_parsed_modules = set([])
+    lazy_names: List[str] = []
 
     while len(modules_to_parse) > 0:
         # Grab the next module
@@ -119,49 +737,164 @@ def do_everything(parsed_args):
         # Add it to the list of "modules we've already seen"
         names_of_parsed_modules.add(pkg_env.__name__)
 
-        # Get the exported stuff
-        export_names = list(filter(lambda x: not x.startswith("_"), dir(pkg_env)))
+        with _TIMER.phase("module walk", pkg_env.__name__):
+            found = sidecar.get(pkg_env) if sidecar is not None else None
+            if found is None:
+                found = _describe_module(
+                    pkg_env,
+                    pkg_name=pkg_name,
+                    kwargs_string=kwargs_string,
+                    constructor_string=constructor_string,
+                    meta=meta,
+                    traversal=traversal,
+                    resolve_lazy=resolve_lazy,
+                    class_introspection=class_introspection,
+                )
+                if sidecar is not None:
+                    sidecar.put(pkg_env, found)
+            else:
+                logger.info("Module '{}' has not changed, re-using it".format(pkg_env.__name__))
+
+        out[FUNCTIONS_KEY].update(found[FUNCTIONS_KEY])
+        out[CLASSES_KEY].update(found[CLASSES_KEY])
+        lazy_names.extend("{}.{}".format(pkg_env.__name__, x) for x in found.get(LAZY_KEY, []))
 
-        for obj_name in export_names:
-            # Grab the object
+        for obj_name in found[SUBMODULES_KEY]:
             obj = getattr(pkg_env, obj_name)
-            obj = _remove_decorators(obj)
-
-            # Is it a function?
-            if isinstance(obj, types.FunctionType):
-                # Handle special cases where someone did
-                # "from <pkg> import <whatever>" in a module.
-                #
-                # So, for example, "from requests import get"
-                # would make it look like an object "get" is in
-                # the namespace of your package. However, get.__module__
-                # holds the fully-qualified name that tells you it's from
-                # requests
-                #
-                if obj.__module__.startswith(PKG_NAME):
-                    logger.info("'{}' is a function in this package, adding it".format(obj_name))
-                    out[FUNCTIONS_KEY][obj_name] = {
-                        ARGS_KEY: _get_arg_names(obj, kwargs_string=KWARGS_STRING)
-                    }
-
-                next
-
-            # Is it a class?
-            elif inspect.isclass(obj):
-                # Is it an exception? (skip)
-                if issubclass(obj, Exception):
-                    logger.info("{} is an Exception. Skipping.".format(obj_name))
+
+            # Some importing strategies can make it seem like the package
+            # has a sub-module exactly named the same as the package, which
+            # can cause an infinite recursion problem. Skip it when that happens
+            if obj.__name__ == pkg_name:
+                logger.debug("Skipping module '{}'".format(obj.__name__))
+            else:
+                if obj.__name__ in names_of_parsed_modules:
+                    msg = "Module '{}' is in this package but has already been parsed."
+                    logger.debug(msg.format(obj.__name__))
                 else:
-                    # imports like 'from requests.adapter import HTTPAdapter'
-                    regex = "'" + PKG_NAME + "\\.+.*"
-                    is_in_package = bool(re.search(regex, str(obj)))
+                    logger.info("Module '{}' is in this package, adding it.".format(obj.__name__))
+                    modules_to_parse.append(obj)
+
+    if sidecar is not None:
+        sidecar.save()
+    _LAST_RUN["modules_walked"] = len(names_of_parsed_modules)
+    for memo in _MEMOS:
+        memo.log_counts()
+
+    if lazy_names:
+        verb = "Described" if resolve_lazy else "Skipped"
+        msg = "{} {} lazily-loaded names: {}"
+        logger.info(msg.format(verb, len(lazy_names), ", ".join(sorted(lazy_names))))
+    if meta is not None and traversal == "namespace":
+        meta[LAZY_KEY] = sorted(lazy_names)
+
+    return out
+
+
+def _describe_module(
+    pkg_env: types.ModuleType,
+    pkg_name: str,
+    kwargs_string: str,
+    constructor_string: str,
+    meta: Optional[Dict[str, Any]] = None,
+    traversal: str = "dir",
+    resolve_lazy: bool = False,
+    class_introspection: str = "getattr",
+) -> Dict[str, Any]:
+    """
+    Find the functions and classes in one module's namespace.
 
-                    if is_in_package:
+    Returns a dictionary with the functions and classes found (in the
+    same format as the output of describe_package()), the names of
+    attributes that are sub-modules of this package, and the names of
+    all modules where the things that were found are defined.
+
+    If ``meta`` is given, timings for the module and each class in
+    it are added to it. See describe_package() for ``traversal``,
+    ``resolve_lazy`` and ``class_introspection``. With ``traversal="namespace"``, the lazy
+    names found are returned too.
+    """
+    started = time.perf_counter()
+
+    # Grab args (store in constants for easier debugging)
+    PKG_NAME = pkg_name
+    KWARGS_STRING = kwargs_string
+    CONSTRUCTOR_STRING = constructor_string
+
+    # value to use for an empty function
+    EMPTY_FUNCTION_DICT: Dict[str, List[str]] = {ARGS_KEY: []}
+
+    found: Dict[str, Any] = {
+        FUNCTIONS_KEY: {},
+        CLASSES_KEY: {},
+        SUBMODULES_KEY: [],
+        DEPENDS_ON_KEY: set([pkg_env.__name__]),
+    }
+
+    # Get the exported stuff
+    if traversal == "namespace":
+        namespace, found[LAZY_KEY] = _module_namespace(pkg_env, resolve_lazy=resolve_lazy)
+        export_names = list(namespace)
+    else:
+        export_names = list(filter(lambda x: not x.startswith("_"), dir(pkg_env)))
+
+    for obj_name in export_names:
+        # Grab the object
+        if traversal == "namespace":
+            obj = namespace[obj_name]
+        else:
+            obj = getattr(pkg_env, obj_name)
+        obj = _remove_decorators(obj, static=class_introspection == "static")
+        kind = _kind(obj)
+
+        # Is it a function?
+        if kind == "function":
+            # Handle special cases where someone did
+            # "from <pkg> import <whatever>" in a module.
+            #
+            # So, for example, "from requests import get"
+            # would make it look like an object "get" is in
+            # the namespace of your package. However, get.__module__
+            # holds the fully-qualified name that tells you it's from
+            # requests
+            #
+            if _in_package(obj.__module__, PKG_NAME):
+                logger.info("'{}' is a function in this package, adding it".format(obj_name))
+                found[FUNCTIONS_KEY][obj_name] = {
+                    ARGS_KEY: _get_arg_names(obj, kwargs_string=KWARGS_STRING)
+                }
+                found[DEPENDS_ON_KEY].add(obj.__module__)
+
+            next
+
+        # Is it a class?
+        elif kind == "class":
+            # Is it an exception? (skip)
+            if issubclass(obj, Exception):
+                logger.info("{} is an Exception. Skipping.".format(obj_name))
+            else:
+                # imports like 'from requests.adapter import HTTPAdapter'
+                is_in_package = _in_package(obj.__module__, PKG_NAME)
+
+                if is_in_package:
+                    with _TIMER.phase("class introspection", obj_name), _record_timing(
+                        meta, CLASSES_KEY, "{}.{}".format(pkg_env.__name__, obj_name)
+                    ) as class_timing:
                         logger.info("'{}' is a class in this package, adding it".format(obj_name))
-                        out[CLASSES_KEY][obj_name] = {}
-                        out[CLASSES_KEY][obj_name][PUBLIC_METHODS_KEY] = {}
+                        found[CLASSES_KEY][obj_name] = {}
+                        found[CLASSES_KEY][obj_name][PUBLIC_METHODS_KEY] = {}
+                        found[DEPENDS_ON_KEY].update(
+                            c.__module__
+                            for c in inspect.getmro(obj)
+                            if _in_package(c.__module__, PKG_NAME)
+                        )
 
-                        for f in dir(obj):
+                        if class_introspection == "static":
+                            class_attributes = _static_dir(obj)
+                        else:
+                            class_attributes = dir(obj)
+                        class_timing[ATTRIBUTES_KEY] = len(class_attributes)
+                        for f in class_attributes:
                             # If attribute is internal, move on.
                             # This short-circuiting is nice to also avoid having to deal
                             # with custom stuff like read-only descriptors
@@ -171,78 +904,35 @@ def do_everything(parsed_args):
                             if is_private and not is_constructor:
                                 continue
 
-                            # Check characteristics of this attribute
-                            class_member = getattr(obj, f)
-                            class_member = _remove_decorators(class_member)
-                            is_function = isinstance(class_member, types.FunctionType)
-
-                            # class members like a dictionary or string literal
-                            # should not be included
-                            if not callable(class_member):
-                                continue
-
-                            # built-ins like 'min()' need special handling
-                            if _is_builtin(class_member):
-                                msg = (
-                                    f"found built-in '{class_member.__name__}', "
-                                    "could not get signature"
-                                )
-                                logger.warning(msg)
-                                method_args = []
-                                out[CLASSES_KEY][obj_name][PUBLIC_METHODS_KEY][f] = {
-                                    ARGS_KEY: method_args
-                                }
-                                continue
-
-                            # Class methods are technically classes, types.FunctionType()
-                            # yields false. But we want to treat them as public methods of
-                            # a parent class here
-                            # h/t https://stackoverflow.com/a/31843829 on the solution
-                            #
-                            # If ClassA has a class ClassB as a public member,
-                            # ClassB is basically being used like a public method. Treat it
-                            # like that and grab the arguments of its constructor
-                            #
-                            is_class_method = str(getattr(class_member, "__self__", None)) == str(
-                                obj
+                            describe_args = (
+                                obj,
+                                f,
+                                KWARGS_STRING,
+                                CONSTRUCTOR_STRING,
+                                class_introspection,
                             )
-                            if not is_function and not is_constructor and not is_class_method:
-                                init_args = _get_arg_names(class_member.__init__, KWARGS_STRING)
-                                is_class_method = (CLASS_KEYWORD in init_args) or (
-                                    SELF_KEYWORD in init_args
+                            # members inherited from a class that was already
+                            # described are re-used
+                            owner = _defining_class(obj, f)
+                            if owner is None:
+                                member = _describe_class_member(*describe_args)
+                            else:
+                                member = _CLASS_MEMBERS.lookup(
+                                    owner,
+                                    _describe_class_member,
+                                    *describe_args,
+                                    key=describe_args[1:],
                                 )
-                                if is_class_method:
-                                    class_member = class_member.__init__
-                                    is_function = True
-                                    logger.debug("'" + f + "' is a class method")
-
-                            # Try figuring out the actual signature, to see if
-                            # we hit the "no signature found for built-in" error
-                            # details:
-                            # https://docs.python.org/3/library/inspect.html#introspecting-callables-with-the-signature-object
-                            #
-                            # this is_function is still here to catch the case where the constructor
-                            # wasn't implemented
-                            if is_function or is_class_method:
-                                method_args = _get_arg_names(class_member, KWARGS_STRING)
-
-                                # Handle Python "self" conventions
-                                method_args = [
-                                    a for a in method_args if a not in SPECIAL_METHOD_ARGS
-                                ]
-
-                                # If we're dealing with the class constructor, use the
-                                # passed-in replacement value
-                                if is_constructor:
-                                    f = CONSTRUCTOR_STRING
-
-                                out[CLASSES_KEY][obj_name][PUBLIC_METHODS_KEY][f] = {
-                                    ARGS_KEY: method_args
+                            if _in_package(member.module, PKG_NAME):
+                                found[DEPENDS_ON_KEY].add(member.module)
+                            if member.args is not None:
+                                found[CLASSES_KEY][obj_name][PUBLIC_METHODS_KEY][member.name] = {
+                                    ARGS_KEY: list(member.args)
                                 }
 
                         # classes that don't implement a constructor
                         # still have one!
-                        if not out[CLASSES_KEY][obj_name][PUBLIC_METHODS_KEY].get(
+                        if not found[CLASSES_KEY][obj_name][PUBLIC_METHODS_KEY].get(
                             CONSTRUCTOR_STRING, None
                         ):
                             msg = "Class '{}' did not implement __init__. Adding it".format(
@@ -250,58 +940,843 @@ def do_everything(parsed_args):
                             )
                             logger.info(msg)
 
-                            out[CLASSES_KEY][obj_name][PUBLIC_METHODS_KEY][
+                            found[CLASSES_KEY][obj_name][PUBLIC_METHODS_KEY][
                                 CONSTRUCTOR_STRING
                             ] = EMPTY_FUNCTION_DICT
 
-                next
+            next
 
-            elif isinstance(obj, types.ModuleType):
-                logger.debug("{} is a module".format(obj_name))
+        elif kind == "module":
+            logger.debug("{} is a module".format(obj_name))
 
-                # If the module isn't defined inside this package, ignore it.
-                # Otherwise, it must be a sub-package we need to explore
-                exact_match = obj.__package__ == PKG_NAME
-                looks_like_submodule = obj.__name__.startswith(PKG_NAME + ".")
+            # If the module isn't defined inside this package, ignore it.
+            # Otherwise, it must be a sub-package we need to explore
+            exact_match = obj.__package__ == PKG_NAME
+            looks_like_submodule = obj.__name__.startswith(PKG_NAME + ".")
 
-                is_in_package = exact_match or looks_like_submodule
-                if is_in_package:
-                    # Some importing strategies can make it seem like the package
-                    # has a sub-module exactly named the same as the package, which
-                    # can cause an infinite recursion problem. Skip it when that happens
-                    if obj.__name__ == PKG_NAME:
-                        logger.debug("Skipping module '{}'".format(obj.__name__))
-                    else:
-                        if obj.__name__ in names_of_parsed_modules:
-                            msg = "Module '{}' is in this package but has already been parsed."
-                            logger.debug(msg.format(obj.__name__))
-                        else:
-                            logger.info(
-                                "Module '{}' is in this package, adding it.".format(obj.__name__)
-                            )
-                            modules_to_parse.append(obj)
-
-            # built-ins like 'min()' are not classes, functions, or modules,
-            # according to the previous checks, but if they're callable
-            # they should count as exported functions
-            elif _is_builtin(obj) and callable(obj):
-                if not obj.__module__.startswith(PKG_NAME):
-                    msg = (
-                        "Callable '{}' is a built-in not included in this "
-                        "package's namespace. Skipping it."
-                    )
-                    logger.info(msg.format(obj.__name__))
-                next
+            is_in_package = exact_match or looks_like_submodule
+            if is_in_package:
+                found[SUBMODULES_KEY].append(obj_name)
+
+        # built-ins like 'min()' are not classes, functions, or modules,
+        # according to the previous checks, but if they're callable
+        # they should count as exported functions
+        elif kind == "builtin":
+            if not _in_package(obj.__module__, PKG_NAME):
+                msg = (
+                    "Callable '{}' is a built-in not included in this "
+                    "package's namespace. Skipping it."
+                )
+                logger.info(msg.format(obj.__name__))
+            next
+
+        else:
+            logger.debug("Could not figure out what {} is".format(obj_name))
+
+    if meta is not None:
+        meta[MODULES_KEY][pkg_env.__name__] = {
+            SECONDS_KEY: time.perf_counter() - started,
+            ATTRIBUTES_KEY: len(export_names),
+        }
+
+    return found
+
+
+def _module_namespace(
+    module: types.ModuleType, resolve_lazy: bool
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Get the public names in a module from its ``__dict__``, without
+    triggering a module-level ``__getattr__`` (PEP 562).
+
+    The names are the ones in ``__all__`` if the module defines it, and
+    otherwise the ones in ``dir(module)`` (which can come from a
+    module-level ``__dir__``). Names that aren't in ``__dict__`` yet are
+    lazy. They are only loaded with ``getattr()`` if ``resolve_lazy``
+    is ``True``.
+
+    :return: The names found and their values, and the lazy names
+    """
+    module_dict = vars(module)
+    declared = module_dict.get("__all__")
+    if declared is None:
+        declared = dir(module)
+
+    namespace: Dict[str, Any] = {}
+    lazy_names = []
+    for name in declared:
+        if name.startswith("_"):
+            continue
+        if name in module_dict:
+            namespace[name] = module_dict[name]
+            continue
+        lazy_names.append(name)
+        if resolve_lazy:
+            try:
+                namespace[name] = getattr(module, name)
+            except AttributeError:
+                msg = "Module '{}' declares '{}', but it could not be loaded"
+                logger.warning(msg.format(module.__name__, name))
+    return namespace, lazy_names
+
+
+def _source_signature(module_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Identify the current version of a module's source file.
+    Returns None for modules that don't have one.
+    """
+    module = sys.modules.get(module_name)
+    path = getattr(module, "__file__", None)
+    if path is None or not os.path.isfile(path):
+        return None
+    stat = os.stat(path)
+    return {"path": path, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
 
+
+class _Sidecar:
+    """
+    Per-module results from a previous run, stored next to the output
+    file. A module's entry is re-used if none of the source files that
+    contributed to it have changed since it was stored.
+
+    Files are first compared by modification time and size, and only
+    hashed if those differ.
+    """
+
+    def __init__(self, path: str, settings: Dict[str, Any]):
+        self.path = path
+        self.settings = settings
+        self.modules: Dict[str, Any] = {}
+        self.sources: Dict[str, Any] = {}
+        if os.path.isfile(path):
+            with open(path, "r") as f:
+                previous = json.loads(f.read())
+            if previous.get("settings") == settings:
+                self.modules = previous["modules"]
+                self.sources = previous["sources"]
             else:
-                logger.debug("Could not figure out what {} is".format(obj_name))
+                logger.info("Settings changed since '{}' was written, ignoring it".format(path))
+
+    def _unchanged(self, module_name: str) -> bool:
+        stored = self.sources.get(module_name)
+        current = _source_signature(module_name)
+        if stored is None or current is None or stored["path"] != current["path"]:
+            return False
+        if stored["mtime_ns"] == current["mtime_ns"] and stored["size"] == current["size"]:
+            return True
+        current["sha256"] = _file_hash(current["path"])
+        if current["sha256"] != stored["sha256"]:
+            return False
+
+        # only the timestamp changed, no need to hash it next time
+        self.sources[module_name] = current
+        return True
+
+    @staticmethod
+    def _names_hash(module: types.ModuleType) -> str:
+        # other modules can add names to this one (e.g. 'import pkg.sub' adds 'sub'
+        # to 'pkg'), so changes to the namespace have to be checked too
+        names = [x for x in dir(module) if not x.startswith("_")]
+        return hashlib.sha256(",".join(names).encode("utf-8")).hexdigest()
+
+    def get(self, module: types.ModuleType) -> Optional[Dict[str, Any]]:
+        found = self.modules.get(module.__name__)
+        if found is None:
+            return None
+        if found[NAMES_HASH_KEY] != self._names_hash(module):
+            return None
+        if not all(self._unchanged(m) for m in found[DEPENDS_ON_KEY]):
+            return None
+        return found
+
+    def put(self, module: types.ModuleType, found: Dict[str, Any]) -> None:
+        for dependency in found[DEPENDS_ON_KEY]:
+            signature = _source_signature(dependency)
+            if signature is None:
+                # no way to tell if this changed, so never re-use it
+                self.modules.pop(module.__name__, None)
+                return
+            signature["sha256"] = _file_hash(signature["path"])
+            self.sources[dependency] = signature
+        self.modules[module.__name__] = dict(
+            found,
+            **{
+                DEPENDS_ON_KEY: sorted(found[DEPENDS_ON_KEY]),
+                NAMES_HASH_KEY: self._names_hash(module),
+            },
+        )
+
+    def save(self) -> None:
+        logger.info("Writing per-module results to {}".format(self.path))
+        with open(self.path, "w") as f:
+            f.write(
+                json.dumps(
+                    {"settings": self.settings, "modules": self.modules, "sources": self.sources}
+                )
+            )
+
 
-    # write it out
-    out_file = os.path.join(OUT_DIR, "{}_{}.json".format(LANGUAGE, PKG_NAME))
-    logger.info("Writing output to {}".format(PKG_NAME))
-    with open(out_file, "w") as f:
+def sidecar_path(pkg_name: str, output_dir: str) -> str:
+    """
+    Where per-module results for incremental runs are kept.
+    """
+    return os.path.join(output_dir, ".{}_{}.modules.json".format(LANGUAGE, pkg_name))
+
+
+def write_output(out: Dict[str, Any], pkg_name: str, output_dir: str) -> str:
+    """
+    Write a package description to ``<output_dir>/python_<pkg_name>.json``.
+    Returns the path to that file.
+    """
+    out_file = os.path.join(output_dir, "{}_{}.json".format(LANGUAGE, pkg_name))
+    logger.info("Writing output to {}".format(out_file))
+    with _TIMER.phase("JSON write"), open(out_file, "w") as f:
         f.write(json.dumps(out))
     logger.info("Done analyzing this package.")
+    return out_file
+
+
+# --- static mode ---
+#
+# Everything below here describes a package without importing it. It
+# parses the package's source files with 'ast' and replays the bits of
+# the import system that decide what names end up in a module's namespace
+# (function and class definitions, 'import' / 'from ... import', simple
+# aliases like 'x = y', '__all__'). The walk over the resulting namespaces
+# mirrors the one in do_everything(), so both modes produce the same JSON.
+#
+# Limitations: code that builds the namespace dynamically (e.g. setattr() or
+# module-level loops) is not seen, decorators are assumed to preserve the
+# signature of what they wrap (functools.wraps), and classes or functions
+# coming from outside the package are never introspected, except for
+# built-in base classes like 'tuple' or 'dict', which are already loaded.
+
+
+class _StaticObject(NamedTuple):
+    """
+    Something bound to a name in a module or class namespace.
+
+    kind is one of "function", "class", "module", "builtin", "external",
+    "inherited" or "other". 'module' is the name of the module where the
+    object was defined (for "module", the module itself). "inherited" is
+    an attribute of a built-in base class like 'tuple', and 'module' is
+    the name of that class.
+    """
+
+    kind: str
+    module: str
+    node: Optional[ast.AST] = None
+
+
+_NOT_CALLABLE_DECORATORS = {"property", "cached_property"}
+
+# things that create a subclass of a built-in class when they're called, like
+# 'namedtuple("Point", ["x", "y"])', or used as a base class, like 'NamedTuple'
+_CLASS_FACTORIES = {
+    "collections.namedtuple": tuple,
+    "typing.NamedTuple": tuple,
+    "typing.TypedDict": dict,
+}
+
+
+def _builtin_class(base: _StaticObject) -> Optional[type]:
+    """
+    The built-in class (like 'dict' or 'Exception') that a base class
+    refers to, or None if it isn't one. 'typing.NamedTuple' is 'tuple'
+    and 'typing.TypedDict' is 'dict'.
+    """
+    if base.kind != "external":
+        return None
+    if base.module in _CLASS_FACTORIES:
+        return _CLASS_FACTORIES[base.module]
+    if base.module == "builtins":
+        name = getattr(base.node, "id", "")
+    elif base.module.startswith("builtins."):
+        name = base.module.partition(".")[2]
+    else:
+        return None
+    builtin = getattr(builtins, name, None)
+    return builtin if inspect.isclass(builtin) else None
+
+
+class _StaticModule:
+    """
+    The parsed source of a single module and the namespace
+    built up by "executing" it.
+    """
+
+    def __init__(self, name: str, path: Optional[str], search_locations: Optional[List[str]]):
+        self.name = name
+        self.path = path
+        self.search_locations = search_locations
+        self.namespace: Dict[str, _StaticObject] = {}
+        self.all_names: Optional[List[str]] = None
+
+        # importing "pkg.sub" sets attribute "sub" on "pkg"
+        self.submodules: Dict[str, str] = {}
+
+    @property
+    def is_package(self) -> bool:
+        return self.search_locations is not None
+
+    def lookup(self, name: str) -> Optional[_StaticObject]:
+        if name in self.namespace:
+            return self.namespace[name]
+        if name in self.submodules:
+            return _StaticObject("module", self.submodules[name])
+        return None
+
+    def names(self) -> List[str]:
+        return sorted(set(self.namespace).union(self.submodules))
+
+
+class _StaticPackage:
+    """
+    Parses modules from one package on demand, the same way
+    the import system would load them.
+    """
+
+    def __init__(self, pkg_name: str):
+        spec = importlib.util.find_spec(pkg_name)
+        if spec is None:
+            raise ModuleNotFoundError("No module named '{}'".format(pkg_name))
+        self.pkg_name = pkg_name
+        self.modules: Dict[str, _StaticModule] = {}
+        # bases of each class, resolved when its 'class' statement ran
+        self._bases: Dict[ast.ClassDef, List[_StaticObject]] = {}
+        self._top_level = _StaticModule(
+            name=pkg_name,
+            path=spec.origin if spec.has_location else None,
+            search_locations=spec.submodule_search_locations,
+        )
+
+    def _in_package(self, module_name: str) -> bool:
+        return module_name == self.pkg_name or module_name.startswith(self.pkg_name + ".")
+
+    def _find(self, module_name: str) -> Optional[_StaticModule]:
+        if module_name == self.pkg_name:
+            return self._top_level
+        parent_name, _, child_name = module_name.rpartition(".")
+        parent = self.load(parent_name)
+        if parent is None or not parent.is_package:
+            return None
+        for location in parent.search_locations or []:
+            pkg_dir = os.path.join(location, child_name)
+            init_file = os.path.join(pkg_dir, "__init__.py")
+            if os.path.isfile(init_file):
+                return _StaticModule(module_name, init_file, [pkg_dir])
+            module_file = pkg_dir + ".py"
+            if os.path.isfile(module_file):
+                return _StaticModule(module_name, module_file, None)
+            if os.path.isdir(pkg_dir):
+                # namespace package
+                return _StaticModule(module_name, None, [pkg_dir])
+        return None
+
+    def load(self, module_name: str) -> Optional[_StaticModule]:
+        """
+        Get a module, parsing it if this is the first time
+        it has been imported. Returns None for modules that
+        can't be found in the package's source.
+        """
+        if module_name in self.modules:
+            # may still be loading, same as a circular import
+            return self.modules[module_name]
+        module = self._find(module_name)
+        if module is None:
+            return None
+
+        self.modules[module_name] = module
+        parent_name, _, child_name = module_name.rpartition(".")
+        if parent_name:
+            self.modules[parent_name].submodules[child_name] = module_name
+
+        if module.path is None:
+            logger.debug("'{}' is a namespace package".format(module_name))
+        elif not module.path.endswith(".py"):
+            msg = "Module '{}' is not pure Python ({}), its contents cannot be parsed"
+            logger.warning(msg.format(module_name, module.path))
+        else:
+            logger.debug("Parsing '{}'".format(module.path))
+            with open(module.path, "rb") as f:
+                tree = ast.parse(f.read(), filename=module.path)
+            self._exec_body(module, tree.body)
+
+        return module
+
+    def _import(self, module_name: str) -> _StaticObject:
+        if self._in_package(module_name) and self.load(module_name) is not None:
+            return _StaticObject("module", module_name)
+        return _StaticObject("external", module_name)
+
+    def _resolve_relative(self, module: _StaticModule, node: ast.ImportFrom) -> str:
+        if not node.level:
+            return node.module or ""
+        base = module.name if module.is_package else module.name.rpartition(".")[0]
+        for _ in range(node.level - 1):
+            base = base.rpartition(".")[0]
+        if node.module:
+            return "{}.{}".format(base, node.module) if base else node.module
+        return base
+
+    def _get_attribute(self, module_name: str, attr: str) -> _StaticObject:
+        """
+        What 'from <module_name> import <attr>' would bind.
+        """
+        source = self.load(module_name)
+        found = source.lookup(attr) if source is not None else None
+        if found is None:
+            # not an attribute (yet), so it could be a submodule
+            submodule_name = "{}.{}".format(module_name, attr)
+            if self.load(submodule_name) is not None:
+                return _StaticObject("module", submodule_name)
+            return _StaticObject("other", module_name)
+        return found
+
+    def _public_names(self, module_name: str) -> List[str]:
+        source = self.load(module_name)
+        if source is None:
+            return []
+        if source.all_names is not None:
+            return list(source.all_names)
+        return [n for n in source.names() if not n.startswith("_")]
+
+    def resolve_expr(
+        self,
+        module: _StaticModule,
+        node: ast.AST,
+        local_ns: Optional[Dict[str, _StaticObject]] = None,
+    ) -> _StaticObject:
+        """
+        Figure out what an expression like 'some_name' or 'some_module.some_name'
+        refers to, looking first in 'local_ns' (a class body), then the module.
+        """
+        if isinstance(node, ast.Lambda):
+            return _StaticObject("function", module.name, node)
+        if isinstance(node, ast.Name):
+            if local_ns is not None and node.id in local_ns:
+                return local_ns[node.id]
+            found = module.lookup(node.id)
+            if found is not None:
+                return found
+            builtin = getattr(builtins, node.id, None)
+            if inspect.isclass(builtin):
+                return _StaticObject("external", "builtins", node)
+            if callable(builtin):
+                return _StaticObject("builtin", "builtins", node)
+            return _StaticObject("other", module.name)
+        if isinstance(node, ast.Attribute):
+            owner = self.resolve_expr(module, node.value, local_ns)
+            if owner.kind == "module":
+                return self._get_attribute(owner.module, node.attr)
+            if owner.kind == "external":
+                return _StaticObject("external", "{}.{}".format(owner.module, node.attr))
+        if isinstance(node, ast.Call):
+            func = self.resolve_expr(module, node.func, local_ns)
+            if func.kind == "external" and func.module in _CLASS_FACTORIES:
+                return self._define_factory_class(module, node, _CLASS_FACTORIES[func.module])
+        return _StaticObject("other", module.name)
+
+    def _exec_body(self, module: _StaticModule, body: List[ast.stmt]) -> None:
+        for stmt in body:
+            self._exec_stmt(module, stmt)
+
+    def _exec_stmt(self, module: _StaticModule, stmt: ast.stmt) -> None:
+        ns = module.namespace
+        if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            ns[stmt.name] = _StaticObject("function", module.name, stmt)
+        elif isinstance(stmt, ast.ClassDef):
+            ns[stmt.name] = self._define_class(module, stmt)
+        elif isinstance(stmt, ast.Import):
+            for alias in stmt.names:
+                imported = self._import(alias.name)
+                if alias.asname:
+                    ns[alias.asname] = imported
+                else:
+                    top_level_name = alias.name.partition(".")[0]
+                    ns[top_level_name] = self._import(top_level_name)
+        elif isinstance(stmt, ast.ImportFrom):
+            source_name = self._resolve_relative(module, stmt)
+            in_package = self._in_package(source_name)
+            if in_package:
+                self.load(source_name)
+            for alias in stmt.names:
+                if alias.name == "*":
+                    if in_package:
+                        for name in self._public_names(source_name):
+                            ns[name] = self._get_attribute(source_name, name)
+                    continue
+                if in_package:
+                    imported = self._get_attribute(source_name, alias.name)
+                else:
+                    imported = _StaticObject("external", "{}.{}".format(source_name, alias.name))
+                ns[alias.asname or alias.name] = imported
+        elif isinstance(stmt, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            targets = stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+            for target in targets:
+                if not isinstance(target, ast.Name) or stmt.value is None:
+                    continue
+                if target.id == "__all__":
+                    self._set_all(module, stmt)
+                elif isinstance(stmt, ast.AugAssign):
+                    ns[target.id] = _StaticObject("other", module.name)
+                else:
+                    ns[target.id] = self.resolve_expr(module, stmt.value)
+        elif isinstance(stmt, ast.Delete):
+            for target in stmt.targets:
+                if isinstance(target, ast.Name):
+                    ns.pop(target.id, None)
+        elif isinstance(stmt, ast.If):
+            condition = _evaluate_condition(stmt.test, module.name)
+            if condition is not False:
+                self._exec_body(module, stmt.body)
+            if condition is not True:
+                self._exec_body(module, stmt.orelse)
+        elif isinstance(stmt, ast.Try):
+            # assume the 'try' succeeds, 'except' blocks are usually fallbacks
+            self._exec_body(module, stmt.body)
+            self._exec_body(module, stmt.orelse)
+            self._exec_body(module, stmt.finalbody)
+        elif isinstance(stmt, (ast.With, ast.AsyncWith)):
+            self._exec_body(module, stmt.body)
+
+    @staticmethod
+    def _set_all(module: _StaticModule, stmt: ast.stmt) -> None:
+        value = getattr(stmt, "value", None)
+        if not isinstance(value, (ast.List, ast.Tuple)):
+            return
+        names = [
+            elt.value
+            for elt in value.elts
+            if isinstance(elt, ast.Constant) and isinstance(elt.value, str)
+        ]
+        if isinstance(stmt, ast.AugAssign):
+            module.all_names = (module.all_names or []) + names
+        else:
+            module.all_names = names
+
+    def _define_class(
+        self,
+        module: _StaticModule,
+        stmt: ast.ClassDef,
+        local_ns: Optional[Dict[str, _StaticObject]] = None,
+    ) -> _StaticObject:
+        """
+        What a 'class' statement binds. Its bases are resolved now, before
+        the class's own name is bound, so that something like
+        'from ._impl import Foo' followed by 'class Foo(Foo)' finds the
+        imported class and not the new one.
+        """
+        self._bases[stmt] = [
+            # 'Base[int]' or 'Generic[T]' subclasses 'Base' or 'Generic'
+            self.resolve_expr(
+                module, base.value if isinstance(base, ast.Subscript) else base, local_ns
+            )
+            for base in stmt.bases
+        ]
+        return _StaticObject("class", module.name, stmt)
+
+    def _define_factory_class(
+        self, module: _StaticModule, call: ast.Call, builtin: type
+    ) -> _StaticObject:
+        """
+        What a call like 'namedtuple("Point", ["x", "y"])' returns: a
+        subclass of 'builtin' with no methods of its own. The fields of
+        a named tuple are properties, so they aren't public methods.
+        """
+        name_arg = call.args[0] if call.args else None
+        name = getattr(name_arg, "value", None)
+        if not isinstance(name, str):
+            name = ""
+        node = ast.ClassDef(name=name, bases=[], keywords=[], body=[], decorator_list=[])
+        self._bases[node] = [_StaticObject("external", "builtins." + builtin.__name__)]
+        return _StaticObject("class", module.name, node)
+
+    def class_bases(self, obj: _StaticObject) -> List[_StaticObject]:
+        assert isinstance(obj.node, ast.ClassDef)
+        return self._bases.get(obj.node, [])
+
+    def is_exception(self, obj: _StaticObject, _seen: Optional[Set[ast.AST]] = None) -> bool:
+        assert isinstance(obj.node, ast.ClassDef)
+        seen = set() if _seen is None else _seen
+        seen.add(obj.node)
+        for base in self.class_bases(obj):
+            if base.kind == "class" and base.node not in seen and self.is_exception(base, seen):
+                return True
+            builtin = _builtin_class(base)
+            if builtin is not None and issubclass(builtin, Exception):
+                return True
+        return False
+
+    def class_members(
+        self, obj: _StaticObject, _seen: Optional[Set[ast.AST]] = None
+    ) -> Dict[str, _StaticObject]:
+        """
+        All the attributes of a class defined in this package,
+        including those inherited from parent classes in this package
+        and from built-in classes like 'tuple' or 'dict'.
+        Earlier bases win over later ones, and the class's own body
+        wins over all of them. Each class is visited once, so a base
+        shared by several parents doesn't override any of them.
+        """
+        assert isinstance(obj.node, ast.ClassDef)
+        seen = set() if _seen is None else _seen
+        seen.add(obj.node)
+        members: Dict[str, _StaticObject] = {}
+        for base in reversed(self.class_bases(obj)):
+            if base.kind == "class" and base.node not in seen:
+                members.update(self.class_members(base, seen))
+            builtin = _builtin_class(base)
+            if builtin is not None:
+                inherited = _StaticObject("inherited", builtin.__name__)
+                members.update((name, inherited) for name in dir(builtin))
+
+        module = self.modules[obj.module]
+        own: Dict[str, _StaticObject] = {}
+        self._exec_class_body(module, obj.node.body, own)
+        members.update(own)
+        return members
+
+    def _exec_class_body(
+        self, module: _StaticModule, body: List[ast.stmt], own: Dict[str, _StaticObject]
+    ) -> None:
+        for stmt in body:
+            if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                decorators = [
+                    d.id if isinstance(d, ast.Name) else getattr(d, "attr", None)
+                    for d in stmt.decorator_list
+                ]
+                is_property = any(
+                    d in _NOT_CALLABLE_DECORATORS or d in {"setter", "getter", "deleter"}
+                    for d in decorators
+                )
+                kind = "other" if is_property else "function"
+                own[stmt.name] = _StaticObject(kind, module.name, stmt)
+            elif isinstance(stmt, ast.ClassDef):
+                own[stmt.name] = self._define_class(module, stmt, own)
+            elif isinstance(stmt, (ast.Assign, ast.AnnAssign)):
+                targets = stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+                for target in targets:
+                    if isinstance(target, ast.Name) and stmt.value is not None:
+                        own[target.id] = self.resolve_expr(module, stmt.value, own)
+            elif isinstance(stmt, ast.If):
+                condition = _evaluate_condition(stmt.test, module.name)
+                if condition is not False:
+                    self._exec_class_body(module, stmt.body, own)
+                if condition is not True:
+                    self._exec_class_body(module, stmt.orelse, own)
+            elif isinstance(stmt, ast.Try):
+                self._exec_class_body(module, stmt.body, own)
+                self._exec_class_body(module, stmt.orelse, own)
+                self._exec_class_body(module, stmt.finalbody, own)
+
+
+_CONDITION_NAMES = {"os": os, "sys": sys}
+
+
+def _evaluate_condition(test: ast.expr, module_name: str) -> Optional[bool]:
+    """
+    Evaluate the test in an 'if' statement if it only depends on
+    things like 'sys.platform', 'sys.version_info' or 'os.name',
+    using the values from the running interpreter. 'TYPE_CHECKING'
+    is always False, and '__name__' is 'module_name' (the module is
+    imported, never run as '__main__'). Returns None if the test can't
+    be evaluated, in which case both branches are used.
+    """
+
+    def _eval(node: ast.expr) -> Any:
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Tuple):
+            return tuple(_eval(elt) for elt in node.elts)
+        if isinstance(node, ast.Name):
+            if node.id == "TYPE_CHECKING":
+                return False
+            if node.id == "__name__":
+                return module_name
+            return _CONDITION_NAMES[node.id]
+        if isinstance(node, ast.Attribute):
+            if node.attr == "TYPE_CHECKING":
+                return False
+            value = _eval(node.value)
+            if value not in (os, sys, sys.implementation):
+                raise ValueError(node.attr)
+            return getattr(value, node.attr)
+        if isinstance(node, ast.Subscript) and isinstance(node.slice, ast.Constant):
+            return _eval(node.value)[node.slice.value]
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return not _eval(node.operand)
+        if isinstance(node, ast.BoolOp):
+            values = [bool(_eval(v)) for v in node.values]
+            return all(values) if isinstance(node.op, ast.And) else any(values)
+        if isinstance(node, ast.Compare) and len(node.ops) == 1:
+            left = _eval(node.left)
+            right = _eval(node.comparators[0])
+            compare = {
+                ast.Eq: lambda a, b: a == b,
+                ast.NotEq: lambda a, b: a != b,
+                ast.Lt: lambda a, b: a < b,
+                ast.LtE: lambda a, b: a <= b,
+                ast.Gt: lambda a, b: a > b,
+                ast.GtE: lambda a, b: a >= b,
+                ast.In: lambda a, b: a in b,
+                ast.NotIn: lambda a, b: a not in b,
+            }[type(node.ops[0])]
+            return compare(left, right)
+        raise ValueError(ast.dump(node))
+
+    try:
+        return bool(_eval(test))
+    except Exception:
+        return None
+
+
+def _get_static_arg_names(node: Any, kwargs_string: str) -> List[str]:
+    """
+    Static equivalent of inspect.getfullargspec(): positional and
+    keyword-only argument names, plus 'kwargs_string' if the function
+    takes '**kwargs'.
+    """
+    arguments = node.args
+    args = [a.arg for a in getattr(arguments, "posonlyargs", []) + arguments.args]
+    args += [a.arg for a in arguments.kwonlyargs]
+    if arguments.kwarg is not None:
+        args.append(kwargs_string)
+    return args
+
+
+def _describe_statically(
+    pkg_name: str,
+    kwargs_string: str,
+    constructor_string: str,
+    meta: Optional[Dict[str, Any]] = None,
+) -> Dict:
+    """
+    Describe a package by parsing its source code instead of importing it.
+    If ``meta`` is given, timings for each module and class are added to it.
+
+    Classes get the attributes they inherit from classes in the package and
+    from built-in classes like ``tuple``, but not from classes in other
+    packages or the standard library (like ``enum.IntEnum``).
+    """
+    logger.info("Parsing source code for package {}".format(pkg_name))
+    package = _StaticPackage(pkg_name)
+    with _TIMER.phase("import"):
+        top_level_env = package.load(pkg_name)
+    assert top_level_env is not None
+
+    out: Dict[str, Any] = {
+        "name": "{} [python]".format(pkg_name),
+        "language": "python",
+        FUNCTIONS_KEY: {},
+        CLASSES_KEY: {},
+    }
+    if meta is not None:
+        out[META_KEY] = meta
+
+    def _method_args(name: str, member: _StaticObject) -> Optional[List[str]]:
+        if member.kind == "builtin":
+            return []
+        if member.kind == "inherited":
+            # built-in classes are already loaded, so describe them like import mode does
+            builtin = getattr(builtins, member.module)
+            return _describe_class_member(
+                builtin, name, kwargs_string, constructor_string, "getattr"
+            ).args
+        if member.kind == "function":
+            args = _get_static_arg_names(member.node, kwargs_string)
+            return [a for a in args if a not in SPECIAL_METHOD_ARGS]
+        if member.kind == "class":
+            # nested classes are treated like methods that take
+            # the arguments of their constructor
+            constructor = package.class_members(member).get("__init__")
+            if constructor is not None and constructor.kind == "function":
+                return _method_args("__init__", constructor)
+            # what inspect.getfullargspec() says about object.__init__()
+            return [kwargs_string]
+        return None
+
+    modules_to_parse = [top_level_env]
+    names_of_parsed_modules = set([])
+
+    with _TIMER.phase("module walk"):
+        while len(modules_to_parse) > 0:
+            pkg_env = modules_to_parse.pop()
+            names_of_parsed_modules.add(pkg_env.name)
+            started = time.perf_counter()
+
+            export_names = [name for name in pkg_env.names() if not name.startswith("_")]
+            for obj_name in export_names:
+                obj = pkg_env.lookup(obj_name)
+                assert obj is not None
+
+                if obj.kind == "function":
+                    if package._in_package(obj.module):
+                        logger.info(
+                            "'{}' is a function in this package, adding it".format(obj_name)
+                        )
+                        out[FUNCTIONS_KEY][obj_name] = {
+                            ARGS_KEY: _get_static_arg_names(obj.node, kwargs_string)
+                        }
+
+                elif obj.kind == "class":
+                    if package.is_exception(obj):
+                        logger.info("{} is an Exception. Skipping.".format(obj_name))
+                        continue
+
+                    with _TIMER.phase("class introspection", obj_name), _record_timing(
+                        meta, CLASSES_KEY, "{}.{}".format(pkg_env.name, obj_name)
+                    ) as class_timing:
+                        logger.info("'{}' is a class in this package, adding it".format(obj_name))
+                        public_methods: Dict[str, Dict[str, List[str]]] = {}
+                        members = package.class_members(obj)
+                        class_timing[ATTRIBUTES_KEY] = len(members)
+                        for f in sorted(members):
+                            is_constructor = f == "__init__"
+                            if f.startswith("_") and not is_constructor:
+                                continue
+                            method_args = _method_args(f, members[f])
+                            if method_args is None:
+                                continue
+                            if is_constructor:
+                                f = constructor_string
+                            public_methods[f] = {ARGS_KEY: method_args}
+
+                        if not public_methods.get(constructor_string, None):
+                            msg = "Class '{}' did not implement __init__. Adding it".format(
+                                obj_name
+                            )
+                            logger.info(msg)
+                            public_methods[constructor_string] = {ARGS_KEY: []}
+
+                        out[CLASSES_KEY][obj_name] = {PUBLIC_METHODS_KEY: public_methods}
+
+                elif obj.kind == "module":
+                    if obj.module == pkg_name:
+                        logger.debug("Skipping module '{}'".format(obj.module))
+                    elif obj.module in names_of_parsed_modules:
+                        msg = "Module '{}' is in this package but has already been parsed."
+                        logger.debug(msg.format(obj.module))
+                    else:
+                        logger.info("Module '{}' is in this package, adding it.".format(obj.module))
+                        modules_to_parse.append(package.modules[obj.module])
+
+                else:
+                    logger.debug("Could not figure out what {} is".format(obj_name))
+
+            if meta is not None:
+                meta[MODULES_KEY][pkg_env.name] = {
+                    SECONDS_KEY: time.perf_counter() - started,
+                    ATTRIBUTES_KEY: len(export_names),
+                }
+
+    _LAST_RUN["modules_walked"] = len(names_of_parsed_modules)
+    return out
 
 
 # Structuring things like this so it can be instrumented
@@ -0,0 +1,309 @@
+"""
+Binary format for package descriptions.
+
+JSON stays the default output of ``doppel-describe``. The binary
+format holds the same information, but it can be memory-mapped
+and read without parsing the whole file: names are read when the
+file is opened, and argument lists only when they are first used.
+
+All integers are little-endian. A file is made up of:
+
+* header: magic bytes, format version and the offset of each section
+* strings: every name and argument name, stored once. A count,
+  ``count + 1`` offsets into the string data, then the UTF-8 data itself
+* functions: a count, then one ``(name, args position)`` entry per function
+* classes: a count, then one ``(name, first method, number of methods)``
+  entry per class
+* methods: a count, then one ``(name, args position)`` entry per public
+  method, grouped by class
+* args: argument lists, each one a length followed by that many string
+  IDs. Identical lists are only stored once.
+* extra: all other top-level fields (like ``name`` and ``language``),
+  stored as JSON
+"""
+
+import json
+import mmap
+import struct
+import sys
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from doppel.loader import expand_package, read_package
+
+MAGIC = b"\x89DOPPEL\n"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<8sII6Q")
+_COUNT = struct.Struct("<I")
+_STRING_OFFSET = struct.Struct("<Q")
+_ARGS_ENTRY = struct.Struct("<IQ")
+_CLASS_ENTRY = struct.Struct("<III")
+_EXTRA_LENGTH = struct.Struct("<Q")
+
+
+def is_binary(filename: str) -> bool:
+    """
+    Check whether a file is a binary package description.
+
+    :param filename: Path to a file written by ``doppel-describe``
+    """
+    with open(filename, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.string_ids: Dict[str, int] = {}
+        self.strings = bytearray()
+        self.string_offsets = [0]
+        self.args = bytearray()
+        self.args_positions: Dict[Tuple[str, ...], int] = {}
+
+    def string(self, value: str) -> int:
+        string_id = self.string_ids.get(value)
+        if string_id is None:
+            string_id = len(self.string_ids)
+            self.string_ids[value] = string_id
+            self.strings += value.encode("utf-8")
+            self.string_offsets.append(len(self.strings))
+        return string_id
+
+    def arg_list(self, args: Tuple[str, ...]) -> int:
+        """
+        Add an argument list and return its position
+        (relative to the start of the args section).
+        """
+        pos = self.args_positions.get(args)
+        if pos is None:
+            pos = len(self.args)
+            self.args_positions[args] = pos
+            ids = [self.string(arg) for arg in args]
+            self.args += _COUNT.pack(len(ids))
+            self.args += struct.pack(f"<{len(ids)}I", *ids)
+        return pos
+
+
+def write_binary(compact: Dict[str, Any], filename: str) -> None:
+    """
+    Write a package description to a file, in the binary format.
+
+    :param compact: Package description, in the compact form
+        from ``doppel.loader``
+    :param filename: Path to write to
+    """
+    writer = _Writer()
+
+    functions = bytearray(_COUNT.pack(len(compact["functions"])))
+    for func_name, args in compact["functions"].items():
+        functions += _ARGS_ENTRY.pack(writer.string(func_name), writer.arg_list(args))
+
+    classes = bytearray(_COUNT.pack(len(compact["classes"])))
+    methods = bytearray(_COUNT.size)
+    num_methods = 0
+    for class_name, public_methods in compact["classes"].items():
+        classes += _CLASS_ENTRY.pack(writer.string(class_name), num_methods, len(public_methods))
+        for method_name, args in public_methods.items():
+            methods += _ARGS_ENTRY.pack(writer.string(method_name), writer.arg_list(args))
+        num_methods += len(public_methods)
+    _COUNT.pack_into(methods, 0, num_methods)
+
+    strings = bytearray(_COUNT.pack(len(writer.string_ids)))
+    for offset in writer.string_offsets:
+        strings += _STRING_OFFSET.pack(offset)
+    strings += writer.strings
+
+    extra = {k: v for k, v in compact.items() if k not in ("functions", "classes")}
+    extra_json = json.dumps(extra).encode("utf-8")
+
+    sections = [strings, functions, classes, methods, writer.args]
+    offsets = []
+    pos = _HEADER.size
+    for section in sections:
+        offsets.append(pos)
+        pos += len(section)
+    offsets.append(pos)
+
+    with open(filename, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, *offsets))
+        for section in sections:
+            f.write(section)
+        f.write(_EXTRA_LENGTH.pack(len(extra_json)))
+        f.write(extra_json)
+
+
+class _BinaryFile:  # pylint: disable=too-many-instance-attributes
+    """
+    Memory-mapped binary package description. Strings and
+    argument lists are decoded on first use.
+    """
+
+    def __init__(self, filename: str):
+        with open(filename, "rb") as f:
+            self.buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        not_binary = f"'{filename}' is not a binary doppel package description"
+        if len(self.buf) < _HEADER.size:
+            raise ValueError(not_binary)
+        header = _HEADER.unpack_from(self.buf, 0)
+        if header[0] != MAGIC:
+            raise ValueError(not_binary)
+        version = header[1]
+        if version != FORMAT_VERSION:
+            raise ValueError(
+                f"'{filename}' uses version {version} of the binary format, "
+                f"but this version of doppel can only read version {FORMAT_VERSION}"
+            )
+        strings, self.functions, self.classes, self.methods, self.args, self.extra = header[3:]
+
+        num_strings = self.count(strings)
+        self._string_offsets = strings + _COUNT.size
+        self._string_data = self._string_offsets + _STRING_OFFSET.size * (num_strings + 1)
+        self._strings: List[Optional[str]] = [None] * num_strings
+        self._arg_lists: Dict[int, Tuple[str, ...]] = {}
+
+    def bytes(self, start: int, end: int) -> bytes:
+        return self.buf[start:end]
+
+    def count(self, section: int) -> int:
+        return _COUNT.unpack_from(self.buf, section)[0]
+
+    def string(self, string_id: int) -> str:
+        out = self._strings[string_id]
+        if out is None:
+            pos = self._string_offsets + _STRING_OFFSET.size * string_id
+            start, end = struct.unpack_from("<QQ", self.buf, pos)
+            data = self.bytes(self._string_data + start, self._string_data + end)
+            out = sys.intern(data.decode("utf-8"))
+            self._strings[string_id] = out
+        return out
+
+    def arg_list(self, pos: int) -> Tuple[str, ...]:
+        out = self._arg_lists.get(pos)
+        if out is None:
+            start = self.args + pos
+            num_args = _COUNT.unpack_from(self.buf, start)[0]
+            ids = struct.unpack_from(f"<{num_args}I", self.buf, start + _COUNT.size)
+            out = tuple(self.string(string_id) for string_id in ids)
+            self._arg_lists[pos] = out
+        return out
+
+    def args_entries(self, section: int, first: int, num: int) -> Dict[str, int]:
+        """
+        Read ``(name, args position)`` entries from the
+        functions or methods section.
+        """
+        out = {}
+        pos = section + _COUNT.size + _ARGS_ENTRY.size * first
+        entries = self.bytes(pos, pos + _ARGS_ENTRY.size * num)
+        for name_id, args_pos in _ARGS_ENTRY.iter_unpack(entries):
+            out[self.string(name_id)] = args_pos
+        return out
+
+    def class_entries(self) -> Dict[str, Tuple[int, int]]:
+        out = {}
+        num = self.count(self.classes)
+        pos = self.classes + _COUNT.size
+        entries = self.bytes(pos, pos + _CLASS_ENTRY.size * num)
+        for name_id, first, num_methods in _CLASS_ENTRY.iter_unpack(entries):
+            out[self.string(name_id)] = (first, num_methods)
+        return out
+
+    def extra_fields(self) -> Dict[str, Any]:
+        length = _EXTRA_LENGTH.unpack_from(self.buf, self.extra)[0]
+        start = self.extra + _EXTRA_LENGTH.size
+        return json.loads(self.bytes(start, start + length).decode("utf-8"))
+
+
+class _ArgsByName(Mapping[str, Tuple[str, ...]]):
+    """
+    ``{name: args}`` for functions or the methods of one class.
+    Argument lists are decoded when they're first looked up.
+    """
+
+    def __init__(self, binary_file: _BinaryFile, positions: Dict[str, int]):
+        self._file = binary_file
+        self._positions = positions
+
+    def __getitem__(self, name: str) -> Tuple[str, ...]:
+        return self._file.arg_list(self._positions[name])
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._positions)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+
+class _MethodsByClass(Mapping[str, Mapping[str, Tuple[str, ...]]]):
+    """
+    ``{class_name: {method_name: args}}``. The methods of
+    a class are read when the class is first looked up.
+    """
+
+    def __init__(self, binary_file: _BinaryFile):
+        self._file = binary_file
+        self._spans = binary_file.class_entries()
+        self._classes: Dict[str, _ArgsByName] = {}
+
+    def __getitem__(self, class_name: str) -> _ArgsByName:
+        out = self._classes.get(class_name)
+        if out is None:
+            first, num = self._spans[class_name]
+            positions = self._file.args_entries(self._file.methods, first, num)
+            out = _ArgsByName(self._file, positions)
+            self._classes[class_name] = out
+        return out
+
+    def __contains__(self, class_name: object) -> bool:
+        return class_name in self._spans
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._spans)
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+
+def read_binary(filename: str) -> Dict[str, Any]:
+    """
+    Open a binary package description. The result has the same
+    structure as the compact form from ``doppel.loader``, but is
+    backed by a memory-mapped file and decoded lazily.
+
+    :param filename: Path to a binary package description
+    """
+    binary_file = _BinaryFile(filename)
+    out = binary_file.extra_fields()
+    num_functions = binary_file.count(binary_file.functions)
+    out["functions"] = _ArgsByName(
+        binary_file, binary_file.args_entries(binary_file.functions, 0, num_functions)
+    )
+    out["classes"] = _MethodsByClass(binary_file)
+    return out
+
+
+def json_to_binary(json_file: str, binary_file: str) -> None:
+    """
+    Convert a JSON package description to the binary format.
+
+    :param json_file: Path to a JSON file written by ``doppel-describe``
+    :param binary_file: Path to write the binary description to
+    """
+    with open(json_file, "r") as f:
+        compact = read_package(f)
+    write_binary(compact, binary_file)
+
+
+def binary_to_json(binary_file: str, json_file: str) -> None:
+    """
+    Convert a binary package description to JSON.
+
+    :param binary_file: Path to a binary package description
+    :param json_file: Path to write the JSON description to
+    """
+    pkg_dict = expand_package(read_binary(binary_file))
+    with open(json_file, "w") as f:
+        f.write(json.dumps(pkg_dict))
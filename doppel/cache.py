@@ -0,0 +1,229 @@
+"""
+On-disk cache for ``doppel-describe`` output.
+
+Entries are keyed on everything that can change a package's
+description: the language, package name and installed version,
+a hash of the package's installed files, the analysis script and
+the options passed to it. Unchanged packages can then be "described"
+by copying the cached file.
+"""
+
+import hashlib
+import importlib.metadata
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional
+
+
+def _hash_files(paths: List[str]) -> str:
+    """
+    Hash the names and contents of a list of files.
+    """
+    sha = hashlib.sha256()
+    for path in sorted(paths):
+        sha.update(path.encode("utf-8"))
+        with open(path, "rb") as f:
+            chunk = f.read(1024 * 1024)
+            while chunk:
+                sha.update(chunk)
+                chunk = f.read(1024 * 1024)
+    return sha.hexdigest()
+
+
+def _source_files(locations: List[str]) -> List[str]:
+    out = []
+    for location in locations:
+        if os.path.isfile(location):
+            out.append(location)
+            continue
+        for root, dirs, files in os.walk(location):
+            dirs[:] = [d for d in dirs if d != "__pycache__"]
+            out += [os.path.join(root, f) for f in files if not f.endswith(".pyc")]
+    return out
+
+
+def _find_distribution(pkg_name: str) -> Optional[importlib.metadata.Distribution]:
+    try:
+        return importlib.metadata.distribution(pkg_name)
+    except importlib.metadata.PackageNotFoundError:
+        pass
+
+    # the import name and distribution name don't always match
+    # (e.g. "yaml" comes from "PyYAML")
+    packages_distributions = getattr(importlib.metadata, "packages_distributions", None)
+    if packages_distributions is not None:
+        for dist_name in packages_distributions().get(pkg_name, []):
+            try:
+                return importlib.metadata.distribution(dist_name)
+            except importlib.metadata.PackageNotFoundError:
+                continue
+    return None
+
+
+def python_package_fingerprint(pkg_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Identify the installed version of a Python package, without importing it.
+
+    Uses the version and ``RECORD`` (which already holds a hash of every
+    installed file) from the package's distribution metadata. For packages
+    that aren't installed from a distribution, or that are installed in
+    editable mode, the package's files are hashed instead.
+
+    :param pkg_name: Name of the package, as it would be imported
+    :return: ``None`` if the package can't be found
+    """
+    spec = importlib.util.find_spec(pkg_name)
+    if spec is None:
+        return None
+    if spec.submodule_search_locations is not None:
+        locations = list(spec.submodule_search_locations)
+    elif spec.origin is not None and spec.has_location:
+        locations = [spec.origin]
+    else:
+        return None
+
+    fingerprint: Dict[str, Any] = {
+        "python": list(sys.version_info[:2]),
+        "version": None,
+    }
+    dist = _find_distribution(pkg_name)
+    if dist is not None:
+        fingerprint["version"] = dist.version
+        record = dist.read_text("RECORD")
+        install_dir = os.path.abspath(str(dist.locate_file("")))
+        installed_with_dist = all(
+            os.path.abspath(loc).startswith(install_dir + os.sep) for loc in locations
+        )
+        if record is not None and installed_with_dist:
+            fingerprint["files"] = hashlib.sha256(record.encode("utf-8")).hexdigest()
+            return fingerprint
+
+    fingerprint["files"] = _hash_files(_source_files(locations))
+    return fingerprint
+
+
+def r_package_fingerprint(pkg_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Identify the installed version of an R package, using its
+    ``DESCRIPTION`` file and, if the package has one, its ``MD5``
+    file (checksums of all installed files).
+
+    :param pkg_name: Name of the R package
+    :return: ``None`` if R or the package can't be found
+    """
+    try:
+        result = subprocess.run(
+            # pass the name as an argument, so it's never parsed as R code
+            ["Rscript", "--vanilla", "-e", "cat(find.package(commandArgs(TRUE)[1]))", pkg_name],
+            check=False,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+    except FileNotFoundError:
+        return None
+    pkg_dir = result.stdout.strip()
+    description_file = os.path.join(pkg_dir, "DESCRIPTION")
+    if result.returncode != 0 or not os.path.isfile(description_file):
+        return None
+
+    version = None
+    with open(description_file, "r") as f:
+        for line in f:
+            if line.startswith("Version:"):
+                version = line.split(":", 1)[1].strip()
+                break
+
+    files = [description_file]
+    md5_file = os.path.join(pkg_dir, "MD5")
+    if os.path.isfile(md5_file):
+        files.append(md5_file)
+    return {"version": version, "files": _hash_files(files)}
+
+
+class DescribeCache:
+    """
+    Least-recently-used cache of package descriptions, stored as
+    one file per entry in a directory.
+
+    :param cache_dir: Directory to keep cached descriptions in.
+        It is created if it doesn't exist.
+    :param max_size: Maximum total size (in bytes) of all cached
+        descriptions. The least recently used entries are removed
+        when the cache gets bigger than this.
+    """
+
+    _SUFFIX = ".json"
+
+    def __init__(self, cache_dir: str, max_size: int):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+    @staticmethod
+    def key(**parts: Any) -> str:
+        """
+        Build a cache key from everything that identifies a description.
+        """
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + self._SUFFIX)
+
+    def get(self, key: str, destination: str) -> bool:
+        """
+        Copy a cached description to ``destination``.
+
+        :return: ``True`` if the key was found in the cache
+        """
+        path = self._path(key)
+        try:
+            shutil.copyfile(path, destination)
+        except FileNotFoundError:
+            return False
+
+        # mark it as recently used. Another process may have evicted
+        # it since it was copied, which is still a hit.
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return True
+
+    def put(self, key: str, source: str) -> None:
+        """
+        Add the description in file ``source`` to the cache.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        shutil.copyfile(source, tmp_path)
+
+        # rename so other processes never see partially-written entries
+        os.replace(tmp_path, self._path(key))
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self._SUFFIX):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            total_size -= size
@@ -3,40 +3,130 @@ Implementation for ``doppel-test``
 """
 
 import os
+from contextlib import ExitStack
 from sys import stdout
+from typing import List, Optional
 
 import click
 
+from doppel.memory import MemoryReport, checkpoint
+from doppel.metrics import Metrics, record
 from doppel.PackageAPI import PackageAPI
-from doppel.reporters import SimpleReporter
+from doppel.profiling import Profile, phase
+from doppel.reporters import (
+    TABLE_FORMATTERS,
+    JSONLinesReporter,
+    JUnitXMLReporter,
+    SimpleReporter,
+    StreamingReporter,
+)
+from doppel.tracing import Trace
 
 
 @click.command()
-@click.option("--files", "-f", default=None, help="Comma-delimited list of doppel output files.")
+@click.option(
+    "--files",
+    "-f",
+    default=None,
+    help="Comma-delimited list of doppel output files (JSON or binary).",
+)
 @click.option(
     "--errors-allowed",
     default=0,
     help="Integer number of errors to allow before returning non-zero exit code. Default is 0.",
 )
+@click.option(
+    "--table-formatter",
+    type=click.Choice(TABLE_FORMATTERS),
+    default="builtin",
+    help=(
+        "How to write tables. 'builtin' (the default) is fastest. "
+        "'tabulate' requires the tabulate package."
+    ),
+)
+@click.option(
+    "--jsonl",
+    default=None,
+    help="Also write results to this file as JSON Lines, one finding per line.",
+)
+@click.option(
+    "--junit-xml",
+    default=None,
+    help="Also write results to this file as JUnit XML.",
+)
+@click.option(
+    "--profile",
+    default=None,
+    help=(
+        "Profile this run with cProfile and write the statistics to this file. "
+        "A summary of the time spent in each phase is written to stderr."
+    ),
+)
+@click.option(
+    "--trace",
+    default=None,
+    help=(
+        "Write a timeline of this run to this file as Chrome trace events, to view in "
+        "Perfetto or chrome://tracing. If the file already has a trace in it (like one "
+        "from doppel-describe --trace), events are added to it."
+    ),
+)
+@click.option(
+    "--metrics-dir",
+    default=None,
+    help=(
+        "Write metrics about this run (time per phase, errors per check and the "
+        "headroom under --errors-allowed) to 'doppel_test.prom' in this directory, "
+        "in the Prometheus text format read by node_exporter's textfile collector."
+    ),
+)
+@click.option(
+    "--memory-report",
+    default=False,
+    is_flag=True,
+    help=(
+        "Trace memory allocations with tracemalloc and write a report on the memory "
+        "used in each phase, and the lines of code that allocated the most, to stderr. "
+        "This makes doppel-test much slower."
+    ),
+)
 @click.option(
     "--version",
     default=False,
     help="Get the current version of doppel-test",
     is_flag=True,
 )
-def main(files: str, errors_allowed: int, version: bool) -> None:
+def main(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    files: str,
+    errors_allowed: int,
+    table_formatter: str,
+    jsonl: Optional[str],
+    junit_xml: Optional[str],
+    profile: Optional[str],
+    trace: Optional[str],
+    metrics_dir: Optional[str],
+    memory_report: bool,
+    version: bool,
+) -> None:
     """
     doppel is a a continuous integration tool for testing
     the continuity of APIs for libraries implemented in
     different languages.
 
     :param files: A string with a comma-delimited list of
-        file paths to JSON files generated by
+        file paths to JSON or binary files generated by
         ``doppel-describe``.
     :param errors_allowed: Number of errors that are
         permissible before throwing a non-zero exit
         code. Set this to a higher value to make doppel-cli
         more permissive.
+    :param table_formatter: How to write tables of results.
+    :param jsonl: Path to write results to as JSON Lines.
+    :param junit_xml: Path to write results to as JUnit XML.
+    :param profile: Path to write profiling statistics to.
+    :param trace: Path to write a timeline of this run to.
+    :param metrics_dir: Directory to write Prometheus metrics to.
+    :param memory_report: Write a report on memory usage to stderr.
     :param version: Get the current version of doppel-test.
     """
     if version is True:
@@ -49,16 +139,40 @@ def main(files: str, errors_allowed: int, version: bool) -> None:
     if files is None:
         raise RuntimeError('Missing option "--files"')
 
-    print("Loading comparison files")
+    with ExitStack() as stack:
+        if profile is not None:
+            stack.enter_context(Profile(profile))
+        if trace is not None:
+            stack.enter_context(Trace(trace, name="doppel-test"))
+        if metrics_dir is not None:
+            stack.enter_context(Metrics(metrics_dir, command="test"))
+        if memory_report is True:
+            stack.enter_context(MemoryReport())
+
+        print("Loading comparison files")
+
+        f_list = files.split(",")
 
-    f_list = files.split(",")
+        # Check if these are legit package objects
+        pkgs: List[PackageAPI] = []
+        with phase("load"):
+            for file_name in f_list:
+                pkgs.append(PackageAPI.from_file(file_name))
+                checkpoint(f"load {os.path.basename(file_name)}")
+        record("packages", len(pkgs))
 
-    # Check if these are legit package objects
-    pkgs = [PackageAPI.from_json(f) for f in f_list]
+        # Report
+        reporters: List[StreamingReporter] = []
+        if jsonl is not None:
+            reporters.append(JSONLinesReporter(stack.enter_context(open(jsonl, "w"))))
+        if junit_xml is not None:
+            junit_file = stack.enter_context(open(junit_xml, "w", encoding="utf-8"))
+            reporters.append(JUnitXMLReporter(junit_file))
 
-    # Report
-    reporter = SimpleReporter(pkgs, errors_allowed)
-    reporter.compare()
+        reporter = SimpleReporter(
+            pkgs, errors_allowed, table_formatter=table_formatter, reporters=reporters
+        )
+        reporter.compare()
 
 
 if __name__ == "__main__":
@@ -1,29 +1,638 @@
 """
 Code for ``doppel-describe``. This code calls scripts in ``bin/``:
 
-* ``analyze.py``: describe a Python package
+* ``analyze.py``: describe a Python package. By default this is imported
+  and run in the same process as ``doppel-describe``.
 * ``analyze.R``: describe an R package
 """
 
+import hashlib
+import importlib.util
+import json
 import logging
 import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
+from functools import lru_cache
 from sys import stdout
+from types import ModuleType
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
 
 import click
-import pkg_resources
+
+from doppel import metrics, profiling, tracing
+from doppel.binary import json_to_binary
+from doppel.cache import DescribeCache, python_package_fingerprint, r_package_fingerprint
+from doppel.importtime import parse_importtime, write_report
 
 logger = logging.getLogger()
 logging.basicConfig(format="%(levelname)s [%(asctime)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
 
+_ANALYSIS_SCRIPTS = {"python": "analyze.py", "r": "analyze.R"}
+_KWARGS_STRING = "~~KWARGS~~"
+_CONSTRUCTOR_STRING = "~~CONSTRUCTOR~~"
+
+
+@lru_cache(maxsize=None)
+def _load_python_analyzer() -> ModuleType:
+    """
+    Import ``bin/analyze.py`` as a module, so Python packages can be
+    described without starting a new interpreter.
+    """
+    script = os.path.join(os.path.dirname(__file__), "bin", _ANALYSIS_SCRIPTS["python"])
+    spec = importlib.util.spec_from_file_location("doppel_analyze", script)
+    module = importlib.util.module_from_spec(spec)  # type: ignore[arg-type]
+    spec.loader.exec_module(module)  # type: ignore[union-attr]
+    return module
+
+
+def _output_file(data_dir: str, language: str, pkg_name: str) -> str:
+    return os.path.join(data_dir, f"{language}_{pkg_name}.json")
+
+
+class _DescribeOptions(NamedTuple):
+    """
+    Options that apply to every package described in one run.
+    """
+
+    data_dir: str
+    verbose: bool
+    mode: str
+    incremental: bool
+    timings: bool = False
+    traversal: str = "dir"
+    resolve_lazy: bool = False
+    class_introspection: str = "getattr"
+    # where child processes write profiles, if profiling
+    profile_dir: Optional[str] = None
+    # where the import times of child processes are kept, if profiling imports
+    import_profile_dir: Optional[str] = None
+    # where child processes write trace events, if tracing
+    trace_dir: Optional[str] = None
+    # where child processes write phase timings, if collecting metrics
+    stats_dir: Optional[str] = None
+
+
+def _child_profile(language: str, pkg_name: str, options: _DescribeOptions) -> Optional[str]:
+    """
+    File the analysis script should write its profile to, or ``None``
+    if it shouldn't be profiled. ``analyze.R`` doesn't support profiling.
+    """
+    if options.profile_dir is None or language != "python":
+        return None
+    return os.path.join(options.profile_dir, f"{language}_{pkg_name}.prof")
+
+
+def _child_stats(language: str, pkg_name: str, options: _DescribeOptions) -> Optional[str]:
+    """
+    File the analysis script should write its phase timings and number
+    of modules walked to, or ``None`` if metrics aren't collected.
+    ``analyze.R`` doesn't support this.
+    """
+    if options.stats_dir is None or language != "python":
+        return None
+    return os.path.join(options.stats_dir, f"{language}_{pkg_name}.stats.json")
+
+
+def _record_analyzer_stats(
+    language: str, pkg_name: str, phases: Dict[str, float], modules_walked: int
+) -> None:
+    for name, seconds in phases.items():
+        metrics.record(
+            "package_phase_seconds", seconds, language=language, package=pkg_name, phase=name
+        )
+    metrics.record("modules_walked", modules_walked, language=language, package=pkg_name)
+
+
+def _record_child_stats(language: str, pkg_name: str, options: _DescribeOptions) -> None:
+    stats_file = _child_stats(language, pkg_name, options)
+    if stats_file is not None and os.path.isfile(stats_file):
+        with open(stats_file, "r") as f:
+            stats = json.load(f)
+        _record_analyzer_stats(language, pkg_name, stats["phases"], stats["modules_walked"])
+
+
+def _record_package_metrics(targets: List[Tuple[str, str]], data_dir: str) -> None:
+    """
+    Record the size of the description of each package.
+    """
+    for lang, pkg in targets:
+        with open(_output_file(data_dir, lang, pkg), "r") as f:
+            description = json.load(f)
+        classes = description["classes"].values()
+        metrics.record("functions", len(description["functions"]), language=lang, package=pkg)
+        metrics.record("classes", len(classes), language=lang, package=pkg)
+        num_methods = sum(len(c["public_methods"]) for c in classes)
+        metrics.record("methods", num_methods, language=lang, package=pkg)
+
+
+def _child_env(language: str, pkg_name: str, options: _DescribeOptions) -> Optional[Dict[str, str]]:
+    """
+    Environment for the analysis script, or ``None`` to use this process's.
+    When tracing, this tells the script where to write its trace events.
+    ``analyze.R`` doesn't support tracing.
+    """
+    if options.trace_dir is None or language != "python":
+        return None
+    return tracing.child_env(_child_trace(options.trace_dir, language, pkg_name))
+
+
+def _child_trace(trace_dir: str, language: str, pkg_name: str) -> str:
+    return os.path.join(trace_dir, f"{language}_{pkg_name}.trace.json")
+
+
+def _add_child_trace(language: str, pkg_name: str, options: _DescribeOptions) -> None:
+    if options.trace_dir is not None:
+        tracing.add_child(_child_trace(options.trace_dir, language, pkg_name))
+
+
+def _import_times_file(language: str, pkg_name: str, options: _DescribeOptions) -> Optional[str]:
+    """
+    File to keep the ``-X importtime`` output of the analysis script in, or
+    ``None`` if its imports shouldn't be profiled.
+    """
+    if options.import_profile_dir is None or language != "python" or options.mode != "import":
+        return None
+    return os.path.join(options.import_profile_dir, f"{language}_{pkg_name}.importtime")
+
+
+def _save_import_times(stderr: str, import_times_file: str) -> None:
+    """
+    Keep the import times written to stderr by ``python -X importtime``,
+    and pass everything else in it on to this process's stderr.
+    """
+    with open(import_times_file, "w") as f:
+        f.write(stderr)
+    _, other_lines = parse_importtime(stderr.splitlines(keepends=True))
+    sys.stderr.write("".join(other_lines))
+
+
+def _write_import_report(
+    report_file: str, targets: List[Tuple[str, str]], options: _DescribeOptions
+) -> None:
+    with open(report_file, "w") as out:
+        for lang, pkg in targets:
+            import_times_file = _import_times_file(lang, pkg, options)
+            if import_times_file is None or not os.path.isfile(import_times_file):
+                continue
+            with open(import_times_file, "r") as f:
+                records, _ = parse_importtime(f)
+            write_report(records, pkg_name=pkg, out=out)
+    logger.info(f"Wrote import time report to {report_file}")
+
+
+def _cache_key(language: str, pkg_name: str, options: _DescribeOptions) -> Optional[str]:
+    """
+    Key for this package's description in a ``DescribeCache``, or
+    ``None`` if the installed package can't be identified.
+    """
+    if language == "python":
+        fingerprint = python_package_fingerprint(pkg_name)
+    else:
+        fingerprint = r_package_fingerprint(pkg_name)
+    if fingerprint is None:
+        return None
+
+    analysis_script = os.path.join(os.path.dirname(__file__), "bin", _ANALYSIS_SCRIPTS[language])
+    with open(analysis_script, "rb") as f:
+        analyzer_hash = hashlib.sha256(f.read()).hexdigest()
+
+    is_python = language == "python"
+    return DescribeCache.key(
+        language=language,
+        pkg_name=pkg_name,
+        package=fingerprint,
+        analyzer=analyzer_hash,
+        mode=options.mode if is_python else None,
+        traversal=options.traversal if is_python else None,
+        resolve_lazy=options.resolve_lazy if is_python else None,
+        class_introspection=options.class_introspection if is_python else None,
+        kwargs_string=_KWARGS_STRING,
+        constructor_string=_CONSTRUCTOR_STRING,
+    )
+
+
+def _describe_in_process(pkg_name: str, options: _DescribeOptions) -> None:
+    logger.info(f"Describing package {pkg_name} in-process")
+    analyzer = _load_python_analyzer()
+    started = analyzer.usage_snapshot()
+    data_dir = options.data_dir
+    trace_ids = tracing.thread_ids()
+    if trace_ids is not None:
+        analyzer.start_tracing(**trace_ids)
+    try:
+        out = analyzer.describe_package(
+            pkg_name=pkg_name,
+            kwargs_string=_KWARGS_STRING,
+            constructor_string=_CONSTRUCTOR_STRING,
+            mode=options.mode,
+            sidecar_file=analyzer.sidecar_path(pkg_name, data_dir) if options.incremental else None,
+            timings=options.timings,
+            traversal=options.traversal,
+            resolve_lazy=options.resolve_lazy,
+            class_introspection=options.class_introspection,
+        )
+        # peak RSS is for this whole process, not just describing this package
+        usage = analyzer.resource_usage(started)
+        analyzer.log_resource_usage(pkg_name, usage)
+        if analyzer.META_KEY in out:
+            out[analyzer.META_KEY][analyzer.RESOURCES_KEY] = usage
+        analyzer.write_output(out, pkg_name=pkg_name, output_dir=data_dir)
+    finally:
+        tracing.add_events(analyzer.stop_tracing())
+    profiling.add_timings(analyzer.phase_timings())
+    _record_analyzer_stats("python", pkg_name, analyzer.phase_timings(), analyzer.modules_walked())
+
+
+def _analysis_command(language: str, pkg_name: str, options: _DescribeOptions) -> List[str]:
+    """
+    Command to describe one package in a child process.
+    """
+    analysis_script = os.path.join(os.path.dirname(__file__), "bin", _ANALYSIS_SCRIPTS[language])
+    interpreter = [sys.executable] if language == "python" else ["Rscript"]
+    if _import_times_file(language, pkg_name, options) is not None:
+        interpreter += ["-X", "importtime"]
+    cmd = interpreter + [
+        analysis_script,
+        "--pkg",
+        pkg_name,
+        "--output_dir",
+        options.data_dir,
+        "--kwargs-string",
+        _KWARGS_STRING,
+        "--constructor-string",
+        _CONSTRUCTOR_STRING,
+    ]
+
+    if options.verbose is True:
+        cmd += ["--verbose"]
+
+    if language == "python":
+        cmd += ["--mode", options.mode]
+        if options.incremental is True:
+            cmd += ["--incremental"]
+        if options.timings is True:
+            cmd += ["--timings"]
+        cmd += ["--traversal", options.traversal]
+        if options.resolve_lazy is True:
+            cmd += ["--resolve-lazy"]
+        cmd += ["--class-introspection", options.class_introspection]
+
+    profile_file = _child_profile(language, pkg_name, options)
+    if profile_file is not None:
+        cmd += ["--profile", profile_file]
+
+    stats_file = _child_stats(language, pkg_name, options)
+    if stats_file is not None:
+        cmd += ["--stats", stats_file]
+
+    return cmd
+
+
+def _run_measured(
+    cmd: List[str], capture: bool, env: Optional[Dict[str, str]] = None
+) -> Tuple["subprocess.CompletedProcess[str]", Optional[Dict[str, float]]]:
+    """
+    Run an analysis script and measure the wall time, CPU time and peak
+    RSS of the process. CPU time and peak RSS are only measured on
+    platforms with ``os.wait4()``. Everywhere else (e.g. Windows), only
+    wall time is.
+
+    :param capture: If ``True``, return stdout and stderr together in
+        the result's ``stdout`` instead of passing them through
+    """
+    output = subprocess.PIPE if capture else None
+    errors = subprocess.STDOUT if capture else None
+    started = time.perf_counter()
+    if not hasattr(os, "wait4"):
+        result = subprocess.run(cmd, check=False, stdout=output, stderr=errors, text=True, env=env)
+        return result, {"wall_seconds": time.perf_counter() - started}
+
+    with subprocess.Popen(cmd, stdout=output, stderr=errors, text=True, env=env) as proc:
+        logs = proc.stdout.read() if proc.stdout is not None else None
+        _, status, rusage = os.wait4(proc.pid, 0)
+        if os.WIFEXITED(status):
+            proc.returncode = os.WEXITSTATUS(status)
+        else:
+            proc.returncode = -os.WTERMSIG(status)
+    wall_seconds = time.perf_counter() - started
+
+    # ru_maxrss is in bytes on macOS and kilobytes everywhere else
+    rss_bytes = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+    usage = {
+        "wall_seconds": wall_seconds,
+        "user_cpu_seconds": rusage.ru_utime,
+        "system_cpu_seconds": rusage.ru_stime,
+        "peak_rss_mb": rss_bytes / (1024 * 1024),
+    }
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout=logs), usage
+
+
+def _log_child_usage(language: str, pkg_name: str, usage: Optional[Dict[str, float]]) -> None:
+    if usage is not None:
+        summary = ", ".join(f"{k}={v:.3f}" for k, v in usage.items())
+        logger.info(f"Resources used to describe {pkg_name} [{language}]: {summary}")
+
+
+def _describe_in_subprocess(language: str, pkg_name: str, options: _DescribeOptions) -> None:
+    cmd = _analysis_command(language, pkg_name, options)
+    logger.info(f"Describing package with command:\n {' '.join(cmd)}")
+
+    # Invoke the analysis script
+    import_times_file = _import_times_file(language, pkg_name, options)
+    env = _child_env(language, pkg_name, options)
+    if import_times_file is not None:
+        result = subprocess.run(cmd, check=False, stderr=subprocess.PIPE, text=True, env=env)
+        _save_import_times(result.stderr, import_times_file)
+        exit_code = result.returncode
+    elif language == "r":
+        # analyze.py measures itself, analyze.R doesn't
+        result, usage = _run_measured(cmd, capture=False, env=env)
+        _log_child_usage(language, pkg_name, usage)
+        exit_code = result.returncode
+    else:
+        exit_code = subprocess.run(cmd, check=False, env=env).returncode
+
+    if exit_code != 0:
+        msg = f"doppel-describe exited with non-zero exit code: {exit_code}"
+        logger.fatal(msg)  # type: ignore
+        raise RuntimeError(msg)
+
+    profile_file = _child_profile(language, pkg_name, options)
+    if profile_file is not None:
+        profiling.add_child(profile_file)
+    _add_child_trace(language, pkg_name, options)
+    _record_child_stats(language, pkg_name, options)
+
+
+def _describe_many(
+    targets: List[Tuple[str, str]],
+    options: _DescribeOptions,
+    jobs: int,
+    on_success: Callable[[str, str], None],
+) -> None:
+    """
+    Describe several packages, running up to ``jobs`` analysis scripts at
+    the same time. Every package gets its own interpreter, so packages
+    can't interfere with each other. Output files are written as soon as
+    each package is done.
+
+    :param targets: ``(language, package name)`` pairs
+    :param on_success: Called with ``(language, package name)`` after each
+        package is described successfully
+    """
+
+    def _run(
+        language: str, pkg_name: str
+    ) -> Tuple["subprocess.CompletedProcess[str]", Optional[Dict[str, float]]]:
+        cmd = _analysis_command(language, pkg_name, options)
+        logger.debug(f"Describing package with command:\n {' '.join(cmd)}")
+        # this runs on a worker thread, so the child's spans go on that thread's track
+        with tracing.span(f"describe {pkg_name} [{language}]"):
+            env = _child_env(language, pkg_name, options)
+            if language == "r":
+                return _run_measured(cmd, capture=True, env=env)
+            # keep stderr separate when it has import times in it
+            import_times = _import_times_file(language, pkg_name, options) is not None
+            result = subprocess.run(
+                cmd,
+                check=False,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE if import_times else subprocess.STDOUT,
+                text=True,
+                env=env,
+            )
+            return result, None
+
+    logger.info(f"Describing {len(targets)} packages with {jobs} jobs")
+    failures = []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(_run, language, pkg_name): (language, pkg_name)
+            for language, pkg_name in targets
+        }
+        for i, future in enumerate(as_completed(futures), start=1):
+            language, pkg_name = futures[future]
+            result, usage = future.result()
+
+            # only write each child's logs once it's done, so they don't interleave
+            stdout.write(result.stdout)
+            _log_child_usage(language, pkg_name, usage)
+            import_times_file = _import_times_file(language, pkg_name, options)
+            if import_times_file is not None:
+                _save_import_times(result.stderr, import_times_file)
+            if result.returncode != 0:
+                msg = (
+                    f"Describing {pkg_name} [{language}] failed with exit code {result.returncode}"
+                )
+                logger.error(msg)
+                failures.append(f"{pkg_name} [{language}]")
+            else:
+                out_file = _output_file(options.data_dir, language, pkg_name)
+                logger.info(f"({i}/{len(targets)}) Wrote {out_file}")
+                on_success(language, pkg_name)
+                profile_file = _child_profile(language, pkg_name, options)
+                if profile_file is not None:
+                    profiling.add_child(profile_file)
+                _add_child_trace(language, pkg_name, options)
+                _record_child_stats(language, pkg_name, options)
+
+    if failures:
+        msg = f"Failed to describe {len(failures)} package(s): {', '.join(failures)}"
+        logger.fatal(msg)  # type: ignore
+        raise RuntimeError(msg)
+
+
+def _describe_one(
+    targets: List[Tuple[str, str]],
+    options: _DescribeOptions,
+    isolated: bool,
+    on_success: Callable[[str, str], None],
+) -> None:
+    """
+    Describe a single package (``targets`` is empty if it was found in the
+    cache). Python packages are described in this process unless
+    ``isolated`` is ``True``.
+    """
+    for lang, pkg in targets:
+        logger.info(f"Testing package {pkg} [{lang}]")
+
+        with tracing.span(f"describe {pkg} [{lang}]"):
+            if lang == "python" and not isolated:
+                _describe_in_process(pkg, options)
+            else:
+                _describe_in_subprocess(lang, pkg, options)
+        on_success(lang, pkg)
+
+
+def _parse_targets(language: str, pkg_name: str, data_dir: str, mode: str) -> List[Tuple[str, str]]:
+    """
+    Check the options passed to ``doppel-describe`` and turn them
+    into a list of ``(language, package name)`` pairs.
+    """
+    if language is None:
+        raise RuntimeError('Missing option "--language"')
+
+    if pkg_name is None:
+        raise RuntimeError('Missing option "--pkg_name"')
+
+    if data_dir is None:
+        raise RuntimeError('Missing option "--data-dir"')
+
+    pkg_names = pkg_name.split(",")
+    languages = language.lower().split(",")
+    if len(languages) == 1:
+        languages = languages * len(pkg_names)
+    if len(languages) != len(pkg_names):
+        msg = (
+            f"Got {len(languages)} languages for {len(pkg_names)} packages. "
+            "Pass one language for all packages or one per package."
+        )
+        logger.fatal(msg)  # type: ignore
+        raise RuntimeError(msg)
+
+    if not os.path.isdir(data_dir):
+        msg = f"Directory '{data_dir}' passed to --data-dir does not exist."
+        logger.fatal(msg)  # type: ignore
+        raise RuntimeError(msg)
+
+    for lang in languages:
+        if lang not in _ANALYSIS_SCRIPTS:
+            msg = f"doppel does not know how to test {lang} packages"
+            logger.fatal(msg)  # type: ignore
+            raise KeyError(msg)
+
+        if mode == "static" and lang != "python":
+            msg = "--mode static is only supported for Python packages"
+            logger.fatal(msg)  # type: ignore
+            raise RuntimeError(msg)
+
+    return list(zip(languages, pkg_names))
+
+
+def _check_options(
+    targets: List[Tuple[str, str]], options: _DescribeOptions, cache_dir: Optional[str]
+) -> Optional[str]:
+    """
+    Warn about options that don't apply to some of the packages being described.
+
+    :return: The cache directory to use, if any
+    """
+    python_only = {
+        "profile": options.profile_dir is not None,
+        "timings": options.timings,
+        "import-profile": options.import_profile_dir is not None,
+        "traversal": options.traversal != "dir",
+        "resolve-lazy": options.resolve_lazy,
+        "class-introspection": options.class_introspection != "getattr",
+    }
+    if any(lang != "python" for lang, _ in targets):
+        for option, passed in python_only.items():
+            if passed:
+                logger.warning(f"--{option} is ignored for R packages")
+
+    if options.import_profile_dir is not None and options.mode == "static":
+        logger.warning("--import-profile is ignored with --mode static, nothing is imported")
+    if options.traversal != "dir" and options.mode == "static":
+        logger.warning("--traversal is ignored with --mode static, modules are not imported")
+    if options.class_introspection != "getattr" and options.mode == "static":
+        logger.warning(
+            "--class-introspection is ignored with --mode static, classes are not loaded"
+        )
+
+    # cached descriptions would come with timings from an earlier run,
+    # and packages that aren't described aren't imported
+    for option in ["timings", "import-profile"]:
+        if python_only[option] and cache_dir is not None:
+            logger.warning(f"--{option} was passed, so --cache-dir is not used")
+            cache_dir = None
+    return cache_dir
+
+
+def _start_diagnostics(  # pylint: disable=too-many-arguments
+    stack: ExitStack,
+    options: _DescribeOptions,
+    *,
+    profile: Optional[str],
+    import_profile: Optional[str],
+    trace: Optional[str],
+    metrics_dir: Optional[str],
+) -> _DescribeOptions:
+    """
+    Start profiling, tracing and collecting metrics, as requested, until
+    ``stack`` is closed. Each of these gets a temporary directory for
+    the files written by child processes.
+
+    :return: ``options``, with those directories filled in
+    """
+    # pylint: disable=consider-using-with
+    if profile is not None:
+        options = options._replace(profile_dir=stack.enter_context(tempfile.TemporaryDirectory()))
+        stack.enter_context(profiling.Profile(profile))
+    if import_profile is not None:
+        options = options._replace(
+            import_profile_dir=stack.enter_context(tempfile.TemporaryDirectory())
+        )
+    if trace is not None:
+        options = options._replace(trace_dir=stack.enter_context(tempfile.TemporaryDirectory()))
+        stack.enter_context(tracing.Trace(trace, name="doppel-describe"))
+    if metrics_dir is not None:
+        options = options._replace(stats_dir=stack.enter_context(tempfile.TemporaryDirectory()))
+        stack.enter_context(metrics.Metrics(metrics_dir, command="describe"))
+    return options
+
+
+def _check_cache(
+    cache: DescribeCache, targets: List[Tuple[str, str]], options: _DescribeOptions
+) -> Tuple[List[Tuple[str, str]], Dict[Tuple[str, str], str]]:
+    """
+    Copy cached descriptions into the data directory.
+
+    :return: The targets that weren't found in the cache, and the
+        cache key for each of them (if the package could be identified)
+    """
+    uncached_targets = []
+    cache_keys = {}
+    for lang, pkg in targets:
+        key = _cache_key(lang, pkg, options)
+        out_file = _output_file(options.data_dir, lang, pkg)
+        if key is not None and cache.get(key, out_file):
+            logger.info(f"Using cached description of {pkg} [{lang}]: {out_file}")
+            continue
+        if key is not None:
+            cache_keys[(lang, pkg)] = key
+        uncached_targets.append((lang, pkg))
+    return uncached_targets, cache_keys
+
+
+def _convert_to_binary(targets: List[Tuple[str, str]], data_dir: str) -> None:
+    # the analysis scripts (and the cache) always work with JSON
+    for lang, pkg in targets:
+        json_file = _output_file(data_dir, lang, pkg)
+        binary_file = os.path.splitext(json_file)[0] + ".bin"
+        json_to_binary(json_file, binary_file)
+        os.remove(json_file)
+        logger.info(f"Wrote {binary_file}")
+
 
 @click.command()
 @click.option(
     "--language",
     "-l",
     default=None,
-    help="Programming language. Currently python and R are supported.",
+    help=(
+        "Programming language. Currently python and R are supported. "
+        "When describing several packages, either one language for all of them "
+        "or a comma-delimited list with one language per package."
+    ),
+)
+@click.option(
+    "--pkg_name", "-p", default=None, help="Name of a package, or a comma-delimited list of them"
 )
-@click.option("--pkg_name", "-p", default=None, help="Name of a package")
 @click.option(
     "--data-dir",
     "-d",
@@ -42,10 +651,170 @@ logging.basicConfig(format="%(levelname)s [%(asctime)s] %(message)s", datefmt="%
     default=False,
     help="Use this flag to get more detailed logs",
 )
-def main(language: str, pkg_name: str, data_dir: str, version: bool, verbose: bool) -> None:
+@click.option(
+    "--mode",
+    type=click.Choice(["import", "static"]),
+    default="import",
+    help=(
+        "How to describe Python packages. 'import' (the default) imports the package. "
+        "'static' parses its source code instead, which is faster and does not require "
+        "the package's dependencies to be installed."
+    ),
+)
+@click.option(
+    "--traversal",
+    type=click.Choice(["dir", "namespace"]),
+    default="dir",
+    help=(
+        "Python packages only. How to find the names in each module. 'dir' (the default) "
+        "gets every attribute in dir(module). 'namespace' reads the module's __dict__, "
+        "limited to __all__ if it is defined, and skips names that a module-level "
+        "__getattr__ would load lazily (PEP 562), so lazily-loaded packages are "
+        "described without importing everything in them. Skipped names are logged."
+    ),
+)
+@click.option(
+    "--resolve-lazy",
+    is_flag=True,
+    default=False,
+    help="With --traversal namespace, load and describe lazily-loaded names too.",
+)
+@click.option(
+    "--class-introspection",
+    type=click.Choice(["getattr", "static"]),
+    default="getattr",
+    help=(
+        "Python packages only. How to get class attributes. 'getattr' (the default) "
+        "uses getattr(), which runs properties, descriptors and metaclass hooks. "
+        "'static' uses inspect.getattr_static() instead, so no code in the class runs. "
+        "Descriptors whose __get__() is written in Python are skipped."
+    ),
+)
+@click.option(
+    "--isolated",
+    is_flag=True,
+    default=False,
+    help=(
+        "Describe Python packages in a separate Python process, instead of importing "
+        "them into doppel-describe's process. R packages are always described in a "
+        "separate process."
+    ),
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    help=(
+        "Number of packages to describe at the same time. When describing more "
+        "than one package, each one is described in its own process."
+    ),
+)
+@click.option(
+    "--cache-dir",
+    default=None,
+    help=(
+        "Directory to cache descriptions in. If the same version of a package "
+        "was already described with the same options, the cached description is "
+        "used instead of describing it again. By default, nothing is cached."
+    ),
+)
+@click.option(
+    "--cache-max-size",
+    type=click.IntRange(min=0),
+    default=500,
+    help="Maximum size of --cache-dir, in MB. Least recently used entries are removed first.",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    default=False,
+    help=(
+        "Python packages only. Keep per-module results next to the output file, and "
+        "on later runs only re-introspect modules whose source code changed."
+    ),
+)
+@click.option(
+    "--output-format",
+    type=click.Choice(["json", "binary"]),
+    default="json",
+    help=(
+        "Format to write descriptions in. 'json' (the default) is the interchange format. "
+        "'binary' is faster for doppel-test to load, and is written to a '.bin' file."
+    ),
+)
+@click.option(
+    "--timings",
+    is_flag=True,
+    default=False,
+    help=(
+        "Python packages only. Add a '_meta' block to the output with the time spent on "
+        "each module and class, the number of attributes examined in each, and the wall "
+        "time, CPU time and peak memory usage of the analysis. doppel-test ignores it. "
+        "Descriptions are never read from --cache-dir with this flag."
+    ),
+)
+@click.option(
+    "--import-profile",
+    default=None,
+    help=(
+        "Python packages only. Describe packages with 'python -X importtime' and write "
+        "a report to this file on which modules and dependencies take the longest to import."
+    ),
+)
+@click.option(
+    "--profile",
+    default=None,
+    help=(
+        "Profile this run with cProfile and write the statistics (including those of "
+        "analysis scripts run in child processes) to this file. A summary of the time "
+        "spent in each phase is written to stderr. R analysis scripts are not profiled."
+    ),
+)
+@click.option(
+    "--trace",
+    default=None,
+    help=(
+        "Write a timeline of this run to this file as Chrome trace events, to view in "
+        "Perfetto or chrome://tracing. If the file already has a trace in it, events are "
+        "added to it. Only the total time of R analysis scripts is recorded."
+    ),
+)
+@click.option(
+    "--metrics-dir",
+    default=None,
+    help=(
+        "Write metrics about this run (the number of functions, classes and methods in "
+        "each package and, for Python packages described in this run, the time per phase "
+        "and modules walked) to 'doppel_describe.prom' in this directory, in the "
+        "Prometheus text format read by node_exporter's textfile collector."
+    ),
+)
+def main(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    language: str,
+    pkg_name: str,
+    data_dir: str,
+    version: bool,
+    verbose: bool,
+    mode: str,
+    traversal: str,
+    resolve_lazy: bool,
+    class_introspection: str,
+    isolated: bool,
+    jobs: int,
+    cache_dir: Optional[str],
+    cache_max_size: int,
+    incremental: bool,
+    output_format: str,
+    timings: bool,
+    import_profile: Optional[str],
+    profile: Optional[str],
+    trace: Optional[str],
+    metrics_dir: Optional[str],
+) -> None:
     """
-    Generate a description of the public API for a software package and
-    write out a JSON representation of it.
+    Generate a description of the public API for one or more software packages
+    and write out a JSON representation of each.
     """
     if version is True:
         version_file = os.path.join(os.path.dirname(__file__), "VERSION")
@@ -54,60 +823,67 @@ def main(language: str, pkg_name: str, data_dir: str, version: bool, verbose: bo
         stdout.write(out)
         return
 
-    if language is None:
-        raise RuntimeError('Missing option "--language"')
-
-    if pkg_name is None:
-        raise RuntimeError('Missing option "--pkg_name"')
-
-    if data_dir is None:
-        raise RuntimeError('Missing option "--data-dir"')
-
     if verbose is True:
         logger.setLevel(logging.DEBUG)
         logger.debug("Running doppel-describe with verbose logging.")
     else:
         logger.setLevel(logging.INFO)
 
-    language = language.lower()
-    logger.info(f"Testing package {pkg_name} [{language}]")
-
-    if not os.path.isdir(data_dir):
-        msg = f"Directory '{data_dir}' passed to --data-dir does not exist."
-        logger.fatal(msg)  # type: ignore
-        raise RuntimeError(msg)
-
-    try:
-        files = {"python": "analyze.py", "r": "analyze.R"}
-        analysis_script = pkg_resources.resource_filename("doppel", f"bin/{files[language]}")
-    except KeyError:
-        msg = f"doppel does not know how to test {language} packages"
-        logger.fatal(msg)  # type: ignore
-        raise KeyError(msg)
+    all_targets = _parse_targets(language, pkg_name, data_dir, mode)
 
-    logger.info(analysis_script)
+    with ExitStack() as stack:
+        options = _DescribeOptions(
+            data_dir=data_dir,
+            verbose=verbose,
+            mode=mode,
+            incremental=incremental,
+            timings=timings,
+            traversal=traversal,
+            resolve_lazy=resolve_lazy,
+            class_introspection=class_introspection,
+        )
+        options = _start_diagnostics(
+            stack,
+            options,
+            profile=profile,
+            import_profile=import_profile,
+            trace=trace,
+            metrics_dir=metrics_dir,
+        )
+        if import_profile is not None:
+            # doppel-describe's own imports would hide some of the package's
+            isolated = True
+        cache_dir = _check_options(all_targets, options, cache_dir)
 
-    cmd = (
-        "{} --pkg {} --output_dir {} "
-        "--kwargs-string ~~KWARGS~~ "
-        "--constructor-string ~~CONSTRUCTOR~~"
-    )
-    cmd = cmd.format(analysis_script, pkg_name, data_dir)
+        targets = all_targets
+        cache = None
+        cache_keys: Dict[Tuple[str, str], str] = {}
+        if cache_dir is not None:
+            cache = DescribeCache(cache_dir, max_size=cache_max_size * 1024 * 1024)
+            with tracing.span("cache lookup"):
+                targets, cache_keys = _check_cache(cache, targets, options)
 
-    if verbose is True:
-        cmd += " --verbose"
+        def _store(lang: str, pkg: str) -> None:
+            key = cache_keys.get((lang, pkg))
+            if cache is not None and key is not None:
+                cache.put(key, _output_file(data_dir, lang, pkg))
 
-    logger.info(f"Describing package with command:\n {cmd}")
+        if len(all_targets) > 1:
+            _describe_many(targets, options, jobs=jobs, on_success=_store)
+        else:
+            _describe_one(targets, options, isolated=isolated, on_success=_store)
 
-    # Invoke the analysis script
-    exit_code = os.system(cmd)
+        if import_profile is not None:
+            _write_import_report(import_profile, all_targets, options)
 
-    if exit_code != 0:
-        msg = f"doppel-describe exited with non-zero exit code: {exit_code}"
-        logger.fatal(msg)  # type: ignore
-        raise RuntimeError(msg)
+        if metrics_dir is not None:
+            metrics.record("packages", len(all_targets))
+            metrics.record("packages_cached", len(all_targets) - len(targets))
+            _record_package_metrics(all_targets, data_dir)
 
-    return
+        if output_format == "binary":
+            with tracing.span("binary conversion"):
+                _convert_to_binary(all_targets, data_dir)
 
 
 if __name__ == "__main__":
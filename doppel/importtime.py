@@ -0,0 +1,147 @@
+"""
+Reports on how long it takes to import a package, built from
+the output of ``python -X importtime`` (``--import-profile``).
+"""
+
+import os
+import pkgutil
+import re
+import sys
+import sysconfig
+from typing import IO, Dict, FrozenSet, Iterable, List, NamedTuple, Tuple
+
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+
+def _find_stdlib_modules() -> FrozenSet[str]:
+    """
+    Top-level modules installed with Python itself, for Pythons
+    older than 3.10 that don't have ``sys.stdlib_module_names``.
+    Unlike that list, this one only has the modules available on
+    this platform, and includes Python's own tests.
+    """
+    names = set(sys.builtin_module_names)
+    for path_name in ("stdlib", "platstdlib"):
+        stdlib_dir = sysconfig.get_paths()[path_name]
+        # site-packages isn't a package, so iter_modules() doesn't look in it
+        for module in pkgutil.iter_modules([stdlib_dir, os.path.join(stdlib_dir, "lib-dynload")]):
+            names.add(module.name)
+    return frozenset(names)
+
+
+_STDLIB_MODULES = frozenset(getattr(sys, "stdlib_module_names", None) or _find_stdlib_modules())
+
+
+class ImportRecord(NamedTuple):
+    """
+    One module imported while describing a package.
+
+    :param module: Fully-qualified name of the module
+    :param self_us: Microseconds spent importing just this module
+    :param cumulative_us: Microseconds spent importing this module
+        and everything it imported
+    :param depth: How deeply nested this import was
+    """
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(lines: Iterable[str]) -> Tuple[List[ImportRecord], List[str]]:
+    """
+    Parse the output of ``python -X importtime``.
+
+    :param lines: Lines written to stderr by the Python process
+    :return: The imports found, and all other lines (like warnings and errors)
+    """
+    records = []
+    other_lines = []
+    for line in lines:
+        match = _IMPORT_TIME_LINE.match(line)
+        if match is None:
+            if not line.startswith("import time: self [us]"):
+                other_lines.append(line)
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        records.append(
+            ImportRecord(
+                module=module,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=len(indent) // 2,
+            )
+        )
+    return records, other_lines
+
+
+def package_imports(records: List[ImportRecord], pkg_name: str) -> List[ImportRecord]:
+    """
+    Only the imports triggered by importing ``pkg_name``, including
+    ``pkg_name`` itself.
+
+    ``-X importtime`` writes each import when it finishes, so the modules
+    imported by a module come right before it, and are nested more deeply.
+    """
+    for end, record in enumerate(records):
+        if record.module == pkg_name:
+            start = end
+            while start > 0 and records[start - 1].depth > record.depth:
+                start -= 1
+            last = end + 1
+            return records[start:last]
+    return []
+
+
+def _kind(top_level: str, pkg_name: str) -> str:
+    if top_level == pkg_name:
+        return "this package"
+    if top_level in _STDLIB_MODULES or top_level in sys.builtin_module_names:
+        return "standard library"
+    return "third-party"
+
+
+def write_report(records: List[ImportRecord], pkg_name: str, out: IO[str]) -> None:
+    """
+    Write a report on the import time of one package: the total, the time
+    spent importing each top-level package (the package itself, its
+    dependencies and the standard library), and every module sorted by
+    cumulative import time. Only imports triggered by ``import pkg_name``
+    are included.
+
+    :param records: Imports parsed with ``parse_importtime()``
+    :param pkg_name: Name of the package that was described
+    :param out: Where to write the report
+    """
+    records = package_imports(records, pkg_name)
+    total_us = records[-1].cumulative_us if records else 0
+
+    # self times add up without double-counting nested imports
+    by_package: Dict[str, int] = {}
+    for record in records:
+        top_level = record.module.split(".")[0]
+        by_package[top_level] = by_package.get(top_level, 0) + record.self_us
+    all_us = max(sum(by_package.values()), 1)
+
+    out.write(f"Import time for {pkg_name} [python]\n")
+    out.write("=" * (len(pkg_name) + 25) + "\n")
+    out.write(f"'import {pkg_name}' took {total_us / 1000:.1f} ms\n")
+    out.write(
+        "Modules that were already imported (by Python itself or doppel's "
+        "analysis script) are not included.\n\n"
+    )
+
+    out.write("By top-level package (self time)\n")
+    out.write(f"{'ms':>10}  {'share':>6}  {'kind':<16}  package\n")
+    for top_level, self_us in sorted(by_package.items(), key=lambda x: (-x[1], x[0])):
+        share = 100 * self_us / all_us
+        kind = _kind(top_level, pkg_name)
+        out.write(f"{self_us / 1000:>10.1f}  {share:>5.1f}%  {kind:<16}  {top_level}\n")
+
+    out.write("\nBy module (cumulative time, including everything it imported)\n")
+    out.write(f"{'cumul. ms':>10}  {'self ms':>8}  module\n")
+    for record in sorted(records, key=lambda r: (-r.cumulative_us, r.module)):
+        cumulative_ms = record.cumulative_us / 1000
+        out.write(f"{cumulative_ms:>10.1f}  {record.self_us / 1000:>8.1f}  {record.module}\n")
+    out.write("\n")
@@ -0,0 +1,214 @@
+"""
+Read package descriptions (the output of ``doppel-describe``)
+into the compact form used by ``PackageAPI``.
+
+In the compact form, functions map to a tuple of their
+argument names and classes map to a dictionary of
+``{method_name: args}``. All names are interned and identical
+argument lists are shared, so big descriptions with lots of
+repetition (like generated SDKs) take up much less memory than
+the parsed JSON would.
+"""
+
+import json
+import re
+import sys
+from typing import IO, Any, Dict, Iterator, List, Mapping, Tuple
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class _Compactor:
+    """
+    Convert pieces of a package description to their compact form.
+    """
+
+    def __init__(self) -> None:
+        self._args: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+    def name(self, name: str) -> str:
+        return sys.intern(name)
+
+    def args(self, args: List[str]) -> Tuple[str, ...]:
+        out = tuple(sys.intern(arg) for arg in args)
+        return self._args.setdefault(out, out)
+
+    def function(self, func_dict: Dict[str, Any]) -> Tuple[str, ...]:
+        return self.args(func_dict["args"])
+
+    def klass(self, class_dict: Dict[str, Any]) -> Dict[str, Tuple[str, ...]]:
+        return {
+            self.name(method_name): self.args(method_dict["args"])
+            for method_name, method_dict in class_dict["public_methods"].items()
+        }
+
+
+def compact_package(pkg_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert an already-parsed package description to its compact form.
+
+    :param pkg_dict: A dictionary representation of a
+        software package, complying with the output format of
+        doppel-describe.
+    """
+    compactor = _Compactor()
+    out = dict(pkg_dict)
+    out["functions"] = {
+        compactor.name(func_name): compactor.function(func_dict)
+        for func_name, func_dict in pkg_dict["functions"].items()
+    }
+    out["classes"] = {
+        compactor.name(class_name): compactor.klass(class_dict)
+        for class_name, class_dict in pkg_dict["classes"].items()
+    }
+    return out
+
+
+def expand_package(compact: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a package description in compact form back to
+    the output format of doppel-describe.
+
+    :param compact: Package description, in compact form
+    """
+    out = dict(compact)
+    out["functions"] = {
+        func_name: {"args": list(args)} for func_name, args in compact["functions"].items()
+    }
+    out["classes"] = {
+        class_name: {
+            "public_methods": {
+                method_name: {"args": list(args)} for method_name, args in public_methods.items()
+            }
+        }
+        for class_name, public_methods in compact["classes"].items()
+    }
+    return out
+
+
+class _JSONStream:
+    """
+    Minimal incremental JSON reader. It walks through objects one key
+    at a time and only decodes (with the standard library's decoder)
+    the values it is asked for, so only a small window of the file is
+    held in memory at once.
+    """
+
+    def __init__(self, f: IO[str], chunk_size: int):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, size: int) -> bool:
+        if self._eof:
+            return False
+        chunk = self._f.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        # drop everything that has already been parsed
+        parsed = self._pos
+        self._buf = self._buf[parsed:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """
+        Skip whitespace and return the next character
+        (or an empty string at the end of the file).
+        """
+        while True:
+            match = _WHITESPACE.match(self._buf, self._pos)
+            assert match is not None
+            self._pos = match.end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill(self._chunk_size):
+                return ""
+
+    def _expect(self, char: str) -> None:
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found}' while reading JSON")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """
+        Decode the next JSON value.
+        """
+        self._peek()
+        size = self._chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # the value might just be split across chunks
+                if not self._fill(size):
+                    raise
+                size *= 2
+                continue
+
+            # a value running to the end of the buffer (like a number)
+            # could continue in the next chunk
+            if end == len(self._buf) and self._fill(size):
+                size *= 2
+                continue
+
+            self._pos = end
+            return value
+
+    def members(self) -> Iterator[str]:
+        """
+        Iterate over the keys of the next JSON object. The caller must
+        consume each key's value (with ``value()`` or ``members()``)
+        before moving on to the next key.
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise ValueError(f"Expected a string key but found {key!r} while reading JSON")
+            self._expect(":")
+            yield key
+            found = self._peek()
+            self._pos += 1
+            if found == "}":
+                return
+            if found != ",":
+                raise ValueError(f"Expected ',' or '}}' but found '{found}' while reading JSON")
+
+
+def read_package(f: IO[str], chunk_size: int = 64 * 1024) -> Dict[str, Any]:
+    """
+    Read a package description from a file, directly into
+    its compact form.
+
+    The ``functions`` and ``classes`` sections are read one entry
+    at a time, so the whole file is never held in memory.
+
+    :param f: File object opened in text mode
+    :param chunk_size: Number of characters to read at a time
+    """
+    stream = _JSONStream(f, chunk_size=chunk_size)
+    compactor = _Compactor()
+    out: Dict[str, Any] = {}
+    for key in stream.members():
+        if key == "functions":
+            functions = {}
+            for func_name in stream.members():
+                functions[compactor.name(func_name)] = compactor.function(stream.value())
+            out[key] = functions
+        elif key == "classes":
+            classes = {}
+            for class_name in stream.members():
+                classes[compactor.name(class_name)] = compactor.klass(stream.value())
+            out[key] = classes
+        else:
+            out[key] = stream.value()
+    return out
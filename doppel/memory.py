@@ -0,0 +1,149 @@
+"""
+Memory report for ``doppel-test`` (``--memory-report``).
+
+Allocations are traced with ``tracemalloc``, and a snapshot is taken at
+each checkpoint (like "after loading a file" or "after a check"). The
+report shows how much memory each phase between two checkpoints added,
+the peak during it, and the lines of code that allocated the most.
+
+Code anywhere in ``doppel`` can add a checkpoint with ``checkpoint()``.
+This does nothing unless a ``MemoryReport`` is active.
+"""
+
+import sys
+import tracemalloc
+from typing import IO, List, NamedTuple, Optional
+
+_MB = 1024 * 1024
+
+
+class PhaseMemory(NamedTuple):
+    """
+    Memory used by one phase of a run.
+
+    :param name: Name of the checkpoint at the end of the phase
+    :param delta_bytes: Change in traced memory during the phase
+    :param current_bytes: Traced memory at the end of the phase
+    :param peak_bytes: Highest traced memory during the phase. On Python
+        versions before 3.9, the highest since the report started.
+    :param top_sites: Lines of code whose allocations grew the most
+        during the phase
+    """
+
+    name: str
+    delta_bytes: int
+    current_bytes: int
+    peak_bytes: int
+    top_sites: List[tracemalloc.StatisticDiff]
+
+
+def _take_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ]
+    )
+
+
+class MemoryReport:
+    """
+    Trace memory allocations in a ``with`` block.
+
+    On exit, a report on the memory used in each phase is written to ``out``.
+
+    :param out: Where to write the report. Defaults to stderr, so it
+        doesn't mix with reports written to stdout.
+    :param top: Number of allocating lines of code to show for each phase
+    """
+
+    def __init__(self, out: Optional[IO[str]] = None, top: int = 5):
+        self.phases: List[PhaseMemory] = []
+        self._out = out
+        self._top = top
+        self._last: Optional[tracemalloc.Snapshot] = None
+        self._last_bytes = 0
+
+    def __enter__(self) -> "MemoryReport":
+        global _ACTIVE  # pylint: disable=global-statement
+        tracemalloc.start()
+        self._last = _take_snapshot()
+        self._last_bytes, _ = tracemalloc.get_traced_memory()
+        _ACTIVE = self
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        global _ACTIVE  # pylint: disable=global-statement
+        _ACTIVE = None
+        self.checkpoint("end")
+        tracemalloc.stop()
+        self._last = None
+        self.write()
+
+    def checkpoint(self, name: str) -> None:
+        """
+        End the current phase and start a new one.
+
+        :param name: What happened in the phase that just ended
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = _take_snapshot()
+        diffs = snapshot.compare_to(self._last, "lineno")  # type: ignore[arg-type]
+        top_sites = [diff for diff in diffs if diff.size_diff > 0][: self._top]
+        self.phases.append(
+            PhaseMemory(
+                name=name,
+                delta_bytes=current - self._last_bytes,
+                current_bytes=current,
+                peak_bytes=peak,
+                top_sites=top_sites,
+            )
+        )
+        # only keep one snapshot around, they can be big
+        self._last = snapshot
+        self._last_bytes = current
+        # tracemalloc.reset_peak() only exists on Python 3.9+
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+
+    def write(self) -> None:
+        """
+        Write the report to ``out``.
+        """
+        out = self._out or sys.stderr
+        width = max([len(p.name) for p in self.phases] + [len("phase")])
+        out.write("\nMemory per phase (tracemalloc)\n")
+        out.write("==============================\n")
+        out.write(f"{'phase':<{width}}  {'delta MB':>9}  {'total MB':>9}  {'peak MB':>9}\n")
+        for p in self.phases:
+            out.write(
+                f"{p.name:<{width}}  {p.delta_bytes / _MB:>+9.2f}  "
+                f"{p.current_bytes / _MB:>9.2f}  {p.peak_bytes / _MB:>9.2f}\n"
+            )
+
+        out.write("\nTop allocating sites per phase\n")
+        out.write("==============================\n")
+        for p in self.phases:
+            if not p.top_sites:
+                continue
+            out.write(f"{p.name}\n")
+            for diff in p.top_sites:
+                frame = diff.traceback[0]
+                out.write(
+                    f"  {diff.size_diff / 1024:>+10.1f} KB  {diff.count_diff:>+9} blocks  "
+                    f"{frame.filename}:{frame.lineno}\n"
+                )
+
+
+_ACTIVE: Optional[MemoryReport] = None
+
+
+def checkpoint(name: str) -> None:
+    """
+    Mark the end of a phase of the current run. This is a
+    no-op unless a memory report is being made.
+    """
+    if _ACTIVE is not None:
+        _ACTIVE.checkpoint(name)
@@ -0,0 +1,131 @@
+"""
+Metrics for ``doppel-describe`` and ``doppel-test`` (``--metrics-dir``).
+
+Metrics are written in the Prometheus text format to
+``doppel_<command>.prom`` in a directory read by node_exporter's
+textfile collector, replacing the file from the previous run. The file
+is written to a temporary file first and then renamed, so the collector
+never reads a partly-written file.
+
+The time spent in each ``profiling.phase()`` is always recorded. Code
+anywhere in ``doppel`` can record other metrics with ``record()``. This
+does nothing unless a ``Metrics`` is active.
+"""
+
+import os
+import time
+from contextlib import ExitStack
+from typing import Dict, Optional, Tuple
+
+from doppel.profiling import PhaseTimer, collect_phases
+
+# help text for every metric, without the "doppel_<command>_" prefix
+_HELP = {
+    "check_errors": "Errors found by each check",
+    "classes": "Classes described in each package",
+    "duration_seconds": "Seconds the whole run took",
+    "error_headroom": "Errors allowed minus errors found. Negative values fail the run.",
+    "errors": "Errors found",
+    "errors_allowed": "Errors allowed before the run fails (--errors-allowed)",
+    "functions": "Functions described in each package",
+    "last_run_timestamp_seconds": "Unix time at the end of the run",
+    "methods": "Public class methods (including constructors) described in each package",
+    "modules_walked": "Modules walked to describe each package",
+    "packages": "Packages in the run",
+    "package_phase_seconds": "Seconds the analyzer spent in each phase for each package",
+    "packages_cached": "Packages whose description was read from --cache-dir",
+    "phase_seconds": "Seconds spent in each phase",
+}
+
+# label names and values, sorted by name
+_Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_sample(name: str, labels: _Labels, value: float) -> str:
+    if labels:
+        label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+        name = f"{name}{{{label_str}}}"
+    return f"{name} {value!r}\n"
+
+
+class Metrics:
+    """
+    Collect metrics for everything run in a ``with`` block,
+    and write them to ``metrics_dir`` on exit.
+
+    :param metrics_dir: Directory to write ``doppel_<command>.prom`` to
+    :param command: ``"describe"`` or ``"test"``
+    """
+
+    def __init__(self, metrics_dir: str, command: str):
+        if not os.path.isdir(metrics_dir):
+            msg = f"Directory '{metrics_dir}' passed to --metrics-dir does not exist."
+            raise RuntimeError(msg)
+        self.path = os.path.join(metrics_dir, f"doppel_{command}.prom")
+        self.prefix = f"doppel_{command}_"
+        self.samples: Dict[Tuple[str, _Labels], float] = {}
+        self._label_names: Dict[str, Tuple[str, ...]] = {}
+        self.timer = PhaseTimer()
+        self._stack = ExitStack()
+        self._started = 0.0
+
+    def __enter__(self) -> "Metrics":
+        global _ACTIVE  # pylint: disable=global-statement
+        _ACTIVE = self
+        self._stack.enter_context(collect_phases(self.timer))
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        global _ACTIVE  # pylint: disable=global-statement
+        self.record("duration_seconds", time.perf_counter() - self._started)
+        self._stack.close()
+        _ACTIVE = None
+        for name, seconds in self.timer.timings.items():
+            self.record("phase_seconds", seconds, phase=name)
+        self.record("last_run_timestamp_seconds", time.time())
+        self.write()
+
+    def record(self, name: str, value: float, **labels: str) -> None:
+        """
+        Set the value of metric ``name`` (like ``"functions"``) for ``labels``.
+        Every sample of a metric must have the same label names.
+        """
+        label_names = tuple(sorted(labels))
+        if self._label_names.setdefault(name, label_names) != label_names:
+            expected = self._label_names[name]
+            msg = f"Metric '{name}' is recorded with labels {expected}, not {label_names}."
+            raise ValueError(msg)
+        self.samples[name, tuple((k, labels[k]) for k in label_names)] = value
+
+    def write(self) -> None:
+        """
+        Replace the file at ``path`` with the current metrics.
+        """
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            last_name = None
+            for (name, labels), value in sorted(self.samples.items()):
+                full_name = self.prefix + name
+                if name != last_name:
+                    f.write(f"# HELP {full_name} {_HELP[name]}\n")
+                    f.write(f"# TYPE {full_name} gauge\n")
+                    last_name = name
+                f.write(_format_sample(full_name, labels, value))
+        os.replace(tmp_path, self.path)
+
+
+_ACTIVE: Optional[Metrics] = None
+
+
+def record(name: str, value: float, **labels: str) -> None:
+    """
+    Set the value of metric ``name`` for ``labels`` in the
+    current run. This is a no-op unless metrics are collected.
+    """
+    if _ACTIVE is not None:
+        _ACTIVE.record(name, value, **labels)
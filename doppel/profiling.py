@@ -0,0 +1,187 @@
+"""
+Profiling for ``doppel-describe`` and ``doppel-test`` (``--profile``).
+
+A run is profiled with ``cProfile`` and split into named phases (like
+"load" or "JSON write"). Phase times are exclusive: time spent in a phase
+nested inside another one only counts towards the inner phase.
+
+Code anywhere in ``doppel`` can mark a phase with ``phase()`` and add
+results from child processes with ``add_child()``. These do nothing
+unless a ``Profile`` is active. Phases are also spans on the timeline
+written by ``--trace`` (see ``doppel.tracing``), and other code can time
+them with its own ``PhaseTimer`` using ``collect_phases()``.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+from contextlib import ExitStack, contextmanager
+from typing import IO, Dict, Iterator, List, Optional
+
+from doppel import tracing
+
+
+class PhaseTimer:
+    """
+    Accumulate the time spent in named phases.
+    """
+
+    def __init__(self) -> None:
+        self.timings: Dict[str, float] = {}
+        self._stack: List[str] = []
+        self._started = 0.0
+
+    def _charge(self, now: float) -> None:
+        # give the time since the last switch to whatever phase was running
+        if self._stack:
+            name = self._stack[-1]
+            self.timings[name] = self.timings.get(name, 0.0) + now - self._started
+        self._started = now
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Count the time spent in this block towards phase ``name``.
+        """
+        self._charge(time.perf_counter())
+        self._stack.append(name)
+        try:
+            yield
+        finally:
+            self._charge(time.perf_counter())
+            self._stack.pop()
+
+    def add(self, timings: Dict[str, float]) -> None:
+        """
+        Add timings measured somewhere else, like in a child process.
+        """
+        for name, seconds in timings.items():
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+
+def read_phase_timings(filename: str) -> Dict[str, float]:
+    """
+    Read the phase timings written by ``analyze.py --profile``.
+
+    :param filename: Path passed to ``--profile``
+    """
+    with open(f"{filename}.phases.json", "r") as f:
+        return json.load(f)
+
+
+class Profile:
+    """
+    Profile everything run in a ``with`` block.
+
+    On exit, the ``cProfile`` statistics (merged with those from any child
+    processes added with ``add_child()``) are written to ``path`` in the
+    ``pstats`` format, and a summary of time per phase is written to ``out``.
+
+    :param path: File to write statistics to
+    :param out: Where to write the summary. Defaults to stderr, so it
+        doesn't mix with reports written to stdout.
+    """
+
+    def __init__(self, path: str, out: Optional[IO[str]] = None):
+        self.path = path
+        self.timer = PhaseTimer()
+        self._out = out
+        self._profiler = cProfile.Profile()
+        self._child_stats: List[str] = []
+        self._started = 0.0
+        self.wall_seconds = 0.0
+
+    def __enter__(self) -> "Profile":
+        global _ACTIVE  # pylint: disable=global-statement
+        _ACTIVE = self
+        _TIMERS.append(self.timer)
+        self._started = time.perf_counter()
+        self._profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        global _ACTIVE  # pylint: disable=global-statement
+        self._profiler.disable()
+        self.wall_seconds = time.perf_counter() - self._started
+        _ACTIVE = None
+        _TIMERS.remove(self.timer)
+        self.write()
+
+    def add_child(self, stats_file: str) -> None:
+        """
+        Include the results of ``analyze.py --profile stats_file``,
+        run in a child process.
+        """
+        self._child_stats.append(stats_file)
+        self.timer.add(read_phase_timings(stats_file))
+
+    def write(self) -> None:
+        """
+        Write statistics to ``path`` and the summary to ``out``.
+        """
+        stats = pstats.Stats(self._profiler)
+        for stats_file in self._child_stats:
+            stats.add(stats_file)
+        stats.dump_stats(self.path)
+
+        out = self._out or sys.stderr
+        out.write("\nTime per phase\n")
+        out.write("==============\n")
+        width = max([len(name) for name in self.timer.timings] + [len("other")])
+        for name, seconds in self.timer.timings.items():
+            out.write(f"{name:<{width}}  {seconds:9.3f}s\n")
+        other = max(0.0, self.wall_seconds - sum(self.timer.timings.values()))
+        out.write(f"{'other':<{width}}  {other:9.3f}s\n")
+        out.write(f"Total wall time: {self.wall_seconds:.3f}s. Profile written to {self.path}\n")
+
+
+_ACTIVE: Optional[Profile] = None
+
+# every timer that phase() charges time to
+_TIMERS: List[PhaseTimer] = []
+
+
+@contextmanager
+def collect_phases(timer: PhaseTimer) -> Iterator[PhaseTimer]:
+    """
+    Count the time spent in every ``phase()`` towards ``timer``
+    while this block runs, whether or not the run is profiled.
+    """
+    _TIMERS.append(timer)
+    try:
+        yield timer
+    finally:
+        _TIMERS.remove(timer)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Mark a phase of the current run. This is a no-op unless
+    the run is being profiled or traced, or phases are collected.
+    """
+    with tracing.span(name), ExitStack() as stack:
+        for timer in _TIMERS:
+            stack.enter_context(timer.phase(name))
+        yield
+
+
+def add_timings(timings: Dict[str, float]) -> None:
+    """
+    Add phase timings measured outside of ``phase()``, like
+    the ones from ``analyze.py`` run in this process.
+    """
+    if _ACTIVE is not None:
+        _ACTIVE.timer.add(timings)
+
+
+def add_child(stats_file: str) -> None:
+    """
+    Add the results of ``analyze.py --profile stats_file`` to the current
+    profile. Does nothing if the run isn't profiled or the file doesn't exist.
+    """
+    if _ACTIVE is not None and os.path.isfile(stats_file):
+        _ACTIVE.add_child(stats_file)
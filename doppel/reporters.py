@@ -5,40 +5,384 @@ to consider a comparison "failed" (which results in a
 non-0 exit code)
 """
 
+import json
+import re
+import shutil
 import sys
+import tempfile
+import unicodedata
 from sys import stdout
-from typing import List
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import quoteattr
 
-from tabulate import tabulate
+try:
+    from tabulate import tabulate
+except ImportError:  # pragma: no cover
+    tabulate = None
 
 import doppel
 from doppel.DoppelTestError import DoppelTestError
+from doppel.memory import checkpoint
+from doppel.metrics import record
 from doppel.PackageAPI import PackageAPI
+from doppel.profiling import phase
+
+TABLE_FORMATTERS = ["builtin", "tabulate"]
+
+# number of lines to hold before writing them out
+_WRITE_BUFFER_LINES = 1000
+
+# characters that aren't allowed anywhere in an XML 1.0 document
+_XML_ILLEGAL = re.compile("[^\t\n\r\u0020-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]")
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _char_width(char: str) -> int:
+    if unicodedata.category(char) in ("Mn", "Me", "Cf"):
+        return 0
+    return 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+
+
+def _display_width(text: str) -> int:
+    """
+    Number of columns the widest line of ``text`` takes up in a
+    terminal. Like ``wcwidth``, wide East Asian characters take up two
+    columns and combining marks take up none.
+    """
+    if "\n" in text:
+        return max(_display_width(line) for line in text.split("\n"))
+    if text.isascii():
+        return len(text)
+    return sum(_char_width(char) for char in text)
+
+
+def _decimals(cell: str) -> int:
+    """
+    Number of characters after the decimal point (or, if there isn't
+    one, the exponent) of a formatted number. -1 if it has neither.
+    """
+    pos = cell.rfind(".")
+    if pos < 0:
+        pos = cell.rfind("e")
+    return len(cell) - pos - 1 if pos >= 0 else -1
 
 
 class _OutputTable:
     """
     Many checks will write tabular output. Wrapping
-    this in a class so the choice of format from
-    tabulate() is configurable without lots of code
-    changes.
+    this in a class so the choice of format is
+    configurable without lots of code changes.
+
+    By default, tables are written by a built-in renderer that
+    produces the same "grid" layout as tabulate (with ``wcwidth``
+    installed, so wide characters are measured the same way):
+    columns of numbers are right-aligned, floats are written with
+    format ``"g"`` and aligned on the decimal point, and cells with
+    newlines in them span several lines. Unlike tabulate, strings
+    that look like numbers are treated as text.
+
+    It measures the rows in one pass (or not at all, if ``widths`` are
+    given, in which case rows are written as they're generated and
+    each cell is aligned by its own type) and writes them out in
+    batches. tabulate, which is an optional dependency, can be used
+    instead.
 
     Ref: https://pypi.org/project/tabulate/#description
+
+    :param rows: Rows of the table. This can be a generator.
+    :param headers: Column names
+    :param formatter: One of ``TABLE_FORMATTERS``
+    :param widths: Width of each column (not counting padding).
+        Every value must fit in these.
     """
 
-    def __init__(self, rows: list, headers: list):
+    def __init__(
+        self,
+        rows: Iterable,
+        headers: list,
+        formatter: str = "builtin",
+        widths: Optional[List[int]] = None,
+    ):
         self.rows = rows
         self.headers = headers
+        self.formatter = formatter
+        self.widths = widths
 
     def write(self) -> None:
         """
         Write out a table of results to stdout.
         """
-        stdout.write(tabulate(self.rows, self.headers, tablefmt="grid"))
-        stdout.write("\n")
+        with phase("render"):
+            self._write()
+
+    def _write(self) -> None:
+        if self.formatter == "tabulate":
+            stdout.write(tabulate(self.rows, self.headers, tablefmt="grid"))
+            stdout.write("\n")
+            return
+
+        if not self.headers:
+            stdout.write("\n")
+            return
+
+        if self.widths is None:
+            rows, widths, numeric_columns = self._measure()
+        else:
+            rows = (self._stringify(row) for row in self.rows)
+            widths = self.widths
+            numeric_columns = [False] * len(self.headers)
+
+        border = "+" + "+".join("-" * (width + 2) for width in widths) + "+\n"
+        headers = [str(h) for h in self.headers]
+        lines = [
+            border,
+            self._format_row(headers, widths, numeric_columns),
+            border.replace("-", "="),
+        ]
+        num_rows = 0
+        for cells, numeric in rows:
+            lines.append(self._format_row(cells, widths, numeric))
+            lines.append(border)
+            num_rows += 1
+            if len(lines) >= _WRITE_BUFFER_LINES:
+                stdout.write("".join(lines))
+                lines = []
+        if num_rows == 0:
+            lines.append(border)
+        stdout.write("".join(lines))
+
+    @staticmethod
+    def _stringify(row: Iterable[Any]) -> Tuple[List[str], List[bool]]:
+        cells = []
+        numeric = []
+        for value in row:
+            if value is None:
+                cells.append("")
+                numeric.append(False)
+            elif _is_number(value):
+                cells.append(str(value))
+                numeric.append(True)
+            else:
+                # like tabulate, ignore whitespace around text
+                cells.append(str(value).strip())
+                numeric.append(False)
+        return cells, numeric
+
+    def _measure(self) -> Tuple[Iterable[Tuple[List[str], List[bool]]], List[int], List[bool]]:
+        """
+        Stringify all the rows and find the width of each column.
+        Like tabulate, columns with only numbers in them are right-aligned,
+        and if any of those numbers are floats, the whole column is
+        written with format "g" and aligned on the decimal point.
+        """
+        widths = [_display_width(str(h)) + 2 for h in self.headers]
+        has_numbers = [False] * len(self.headers)
+        has_floats = [False] * len(self.headers)
+        has_text = [False] * len(self.headers)
+        rows = []
+        for row in self.rows:
+            values = row if isinstance(row, list) else list(row)
+            cells, numeric = self._stringify(values)
+            joined = "".join(cells)
+            measure = len if joined.isascii() and "\n" not in joined else _display_width
+            for i, cell in enumerate(cells):
+                widths[i] = max(widths[i], measure(cell))
+                if numeric[i]:
+                    has_numbers[i] = True
+                    has_floats[i] = has_floats[i] or isinstance(values[i], float)
+                elif cell:
+                    has_text[i] = True
+            rows.append(cells)
+        numeric_columns = [n and not t for n, t in zip(has_numbers, has_text)]
+
+        for i, is_float in enumerate(has_floats):
+            if numeric_columns[i] and is_float:
+                # str() of an int or float converts back to the same float
+                column = [format(float(cells[i]), "g") if cells[i] else "" for cells in rows]
+                decimals = [_decimals(cell) for cell in column]
+                most = max(decimals)
+                for cells, cell, num_decimals in zip(rows, column, decimals):
+                    cells[i] = cell + " " * (most - num_decimals)
+                header_width = _display_width(str(self.headers[i])) + 2
+                widths[i] = max([header_width] + [len(cells[i]) for cells in rows])
+        return ((cells, numeric_columns) for cells in rows), widths, numeric_columns
+
+    @staticmethod
+    def _format_row(cells: List[str], widths: List[int], numeric: List[bool]) -> str:
+        joined = "".join(cells)
+        if joined.isascii() and "\n" not in joined:
+            padded = [
+                cell.rjust(width) if is_number else cell.ljust(width)
+                for cell, width, is_number in zip(cells, widths, numeric)
+            ]
+            return "| " + " | ".join(padded) + " |\n"
+
+        cell_lines = [cell.split("\n") for cell in cells]
+        lines = []
+        for n in range(max(len(c) for c in cell_lines)):
+            padded = []
+            for c, width, is_number in zip(cell_lines, widths, numeric):
+                line = c[n] if n < len(c) else ""
+                padding = " " * (width - _display_width(line))
+                padded.append(padding + line if is_number else line + padding)
+            lines.append("| " + " | ".join(padded) + " |\n")
+        return "".join(lines)
+
+
+class StreamingReporter:
+    """
+    Interface for reporters that receive the results of a
+    comparison while ``SimpleReporter`` is running it.
+
+    Pass instances of subclasses to ``SimpleReporter(reporters=...)``
+    to write results in other formats, in the same pass that
+    writes the text report.
+    """
+
+    def start(self, pkg_names: List[str]) -> None:
+        """
+        Called once, before any checks are run.
+
+        :param pkg_names: Names of the packages being compared
+        """
+
+    def start_check(self, check: str) -> None:
+        """
+        Called before each check is run.
+
+        :param check: Name of the check, like ``"function_names"``
+        """
+
+    def add_error(self, error: DoppelTestError) -> None:
+        """
+        Called for every error, as soon as it is found.
+
+        :param error: The error
+        """
+
+    def end_check(self, check: str, num_errors: int) -> None:
+        """
+        Called after each check has finished.
+
+        :param check: Name of the check
+        :param num_errors: Number of errors the check found
+        """
+
+    def finish(self, num_errors: int, errors_allowed: int) -> None:
+        """
+        Called once, after all checks have been run.
+
+        :param num_errors: Total number of errors found
+        :param errors_allowed: Number of errors that are permissible
+        """
+
+
+class JSONLinesReporter(StreamingReporter):
+    """
+    Write results as JSON Lines, one event per line.
+    Every line is flushed when it's written, so other
+    processes can follow the file while doppel-test runs.
+
+    Each event has an ``"event"`` key, which is one of
+    ``"start"``, ``"error"``, ``"check"`` (a check finished)
+    or ``"summary"``.
+
+    :param f: File object opened in text mode
+    """
+
+    def __init__(self, f: IO[str]):
+        self._f = f
 
+    def _write(self, event: Dict[str, Any]) -> None:
+        self._f.write(json.dumps(event) + "\n")
+        self._f.flush()
 
-class SimpleReporter:
+    def start(self, pkg_names: List[str]) -> None:
+        self._write({"event": "start", "packages": pkg_names})
+
+    def add_error(self, error: DoppelTestError) -> None:
+        self._write({"event": "error", "check": error.check, "message": error.msg})
+
+    def end_check(self, check: str, num_errors: int) -> None:
+        self._write({"event": "check", "check": check, "errors": num_errors})
+
+    def finish(self, num_errors: int, errors_allowed: int) -> None:
+        self._write(
+            {
+                "event": "summary",
+                "errors": num_errors,
+                "errors_allowed": errors_allowed,
+                "passed": num_errors <= errors_allowed,
+            }
+        )
+
+
+def _xml_attr(value: str) -> str:
+    """
+    Quote ``value`` as an XML attribute, dropping any
+    characters that XML documents can't contain.
+    """
+    return quoteattr(_XML_ILLEGAL.sub("", value))
+
+
+class JUnitXMLReporter(StreamingReporter):
+    """
+    Write results as JUnit XML. Every error is a failed test
+    case, and every check that doesn't find any errors is a
+    passing test case.
+
+    ``<testsuite>`` has to start with the number of tests and failures,
+    so test cases are held (in memory, or in a temporary file once there
+    are lots of them) until ``finish()`` writes out the whole document.
+
+    :param f: File object opened in text mode
+    """
+
+    def __init__(self, f: IO[str]):
+        self._f = f
+        # closed in finish()
+        self._cases = tempfile.SpooledTemporaryFile(  # pylint: disable=consider-using-with
+            max_size=1024 * 1024, mode="w+", encoding="utf-8"
+        )
+        self._name = "doppel-test"
+        self._num_tests = 0
+        self._num_failures = 0
+
+    def start(self, pkg_names: List[str]) -> None:
+        self._name = "doppel-test: " + ", ".join(pkg_names)
+
+    def add_error(self, error: DoppelTestError) -> None:
+        classname = _xml_attr(f"doppel.{error.check}")
+        message = _xml_attr(error.msg)
+        self._cases.write(
+            f"<testcase classname={classname} name={message}>"
+            f"<failure message={message}/></testcase>\n"
+        )
+        self._num_tests += 1
+        self._num_failures += 1
+
+    def end_check(self, check: str, num_errors: int) -> None:
+        if num_errors == 0:
+            self._cases.write(
+                f"<testcase classname={_xml_attr('doppel.' + check)} name={_xml_attr(check)}/>\n"
+            )
+            self._num_tests += 1
+
+    def finish(self, num_errors: int, errors_allowed: int) -> None:
+        counts = f'tests="{self._num_tests}" failures="{self._num_failures}" errors="0"'
+        self._f.write(f'<?xml version="1.0" encoding="utf-8"?>\n<testsuites {counts}>\n')
+        self._f.write(f"<testsuite name={_xml_attr(self._name)} {counts}>\n")
+        self._cases.seek(0)
+        shutil.copyfileobj(self._cases, self._f)
+        self._cases.close()
+        self._f.write("</testsuite>\n</testsuites>\n")
+        self._f.flush()
+
+
+class SimpleReporter:  # pylint: disable=too-many-instance-attributes
     """Default object used to manage doppel reporting
 
     This object implements the interface used by doppel-cli
@@ -50,19 +394,40 @@ class SimpleReporter:
         permissible before throwing a non-zero exit
         code. Set this to a higher value to make doppel-cli
         more permissive.
+    :param table_formatter: How to write tables. One of
+        ``"builtin"`` (the default) or ``"tabulate"`` (requires
+        the ``tabulate`` package).
+    :param reporters: Other reporters (like ``JSONLinesReporter``)
+        to send results to while the comparison runs.
 
     """
 
-    def __init__(self, pkgs: List[PackageAPI], errors_allowed: int):
+    def __init__(
+        self,
+        pkgs: List[PackageAPI],
+        errors_allowed: int,
+        table_formatter: str = "builtin",
+        reporters: Optional[List[StreamingReporter]] = None,
+    ):
         for pkg in pkgs:
             assert isinstance(pkg, doppel.PackageAPI)
 
+        if table_formatter not in TABLE_FORMATTERS:
+            msg = f"Unknown table formatter '{table_formatter}'. Use one of {TABLE_FORMATTERS}."
+            raise ValueError(msg)
+        if table_formatter == "tabulate" and tabulate is None:
+            msg = "Writing tables with tabulate requires it to be installed: pip install tabulate"
+            raise ImportError(msg)
+        self.table_formatter = table_formatter
+        self.reporters = reporters or []
+
         self.errors: List[DoppelTestError] = []
         self.exists_string = "yes"
         self.absent_string = "no"
 
         self.pkgs = pkgs
         self.pkg_collection = doppel.PackageCollection(pkgs)
+        checkpoint("PackageCollection")
         self._errors_allowed = errors_allowed
 
     def compare(self) -> None:
@@ -73,20 +438,43 @@ class SimpleReporter:
         * return the appropriate exit code
         """
 
+        for reporter in self.reporters:
+            reporter.start(self.pkg_collection.package_names())
+
         # Checks (these print output as they're run)
-        self._check_function_count()
-        self._check_function_names()
-        self._check_function_args()
+        self._run_check("function_count", self._check_function_count)
+        self._run_check("function_names", self._check_function_names)
+        self._run_check("function_args", self._check_function_args)
 
-        self._check_class_count()
-        self._check_class_names()
+        self._run_check("class_count", self._check_class_count)
+        self._run_check("class_names", self._check_class_names)
 
-        self._check_class_public_methods()
-        self._check_class_public_method_args()
+        self._run_check("class_public_methods", self._check_class_public_methods)
+        self._run_check("class_public_method_args", self._check_class_public_method_args)
+
+        for reporter in self.reporters:
+            reporter.finish(len(self.errors), self._errors_allowed)
 
         # Finally
         self._respond()
 
+    def _run_check(self, check: str, check_function: Callable[[], None]) -> None:
+        for reporter in self.reporters:
+            reporter.start_check(check)
+        num_errors = len(self.errors)
+        with phase(f"_check_{check}"):
+            check_function()
+        checkpoint(f"_check_{check}")
+        for reporter in self.reporters:
+            reporter.end_check(check, len(self.errors) - num_errors)
+        record("check_errors", len(self.errors) - num_errors, check=check)
+
+    def _add_error(self, check: str, msg: str) -> None:
+        error = DoppelTestError(msg, check=check)
+        self.errors.append(error)
+        for reporter in self.reporters:
+            reporter.add_error(error)
+
     def _respond(self) -> None:  # pragma: no cover
         """
         After all evaluations, determine final exit status.
@@ -98,15 +486,48 @@ class SimpleReporter:
         num_errors = len(self.errors)
         i = 1
         if num_errors > 0:
-            stdout.write(f"\nTest Failures ({num_errors})\n")
-            stdout.write("===================\n")
-            for err in self.errors:
-                stdout.write(f"{i}. {str(err)}\n")
-                i += 1
+            with phase("render"):
+                stdout.write(f"\nTest Failures ({num_errors})\n")
+                stdout.write("===================\n")
+                for err in self.errors:
+                    stdout.write(f"{i}. {str(err)}\n")
+                    i += 1
+            checkpoint("render")
+
+        record("errors", num_errors)
+        record("errors_allowed", self._errors_allowed)
+        record("error_headroom", self._errors_allowed - num_errors)
 
         # Only throw a non-zero exit code if you had too many errors
         sys.exit(max(0, num_errors - self._errors_allowed))
 
+    def _write_presence_table(
+        self, header: str, names: List[str], presence: Callable[[str], List[bool]]
+    ) -> None:
+        """
+        Write a table showing which packages each name exists in.
+        All the column widths are known up front, so rows are
+        generated while the table is being written.
+        """
+        pkg_names = self.pkg_collection.package_names()
+        headers = [header] + pkg_names
+        value_width = max(_display_width(self.exists_string), _display_width(self.absent_string))
+        widths = [max([_display_width(header) + 2] + [_display_width(name) for name in names])] + [
+            max(_display_width(pkg_name) + 2, value_width) for pkg_name in pkg_names
+        ]
+
+        def _rows() -> Iterator[List[str]]:
+            for name in names:
+                yield [name] + [
+                    self.exists_string if exists else self.absent_string
+                    for exists in presence(name)
+                ]
+
+        out = _OutputTable(
+            headers=headers, rows=_rows(), formatter=self.table_formatter, widths=widths
+        )
+        out.write()
+
     def _check_function_count(self) -> None:
         """
         Check consistency between exported functions
@@ -123,7 +544,7 @@ class SimpleReporter:
             counts.append(pkg.num_functions())
 
         # Report output
-        out = _OutputTable(headers=pkg_names, rows=[counts])
+        out = _OutputTable(headers=pkg_names, rows=[counts], formatter=self.table_formatter)
         out.write()
 
         # Append errors
@@ -132,7 +553,7 @@ class SimpleReporter:
             error_txt = error_txt.format(
                 ", ".join([f"{x} ({y})" for x, y in zip(pkg_names, counts)])
             )
-            self.errors.append(DoppelTestError(error_txt))
+            self._add_error("function_count", error_txt)
 
         # Print output
         stdout.write("\n")
@@ -147,39 +568,19 @@ class SimpleReporter:
         stdout.write("\nFunction Names\n")
         stdout.write("==============\n")
 
-        pkg_names = []
-        functions_by_package = {}
-        for pkg in self.pkgs:
-            pkg_name = pkg.name()
-            pkg_names.append(pkg_name)
-            functions_by_package[pkg_name] = pkg.function_names()
-
-        # Headers are easy money
-        headers = ["function_name"] + [pkg.name() for pkg in self.pkgs]
-
-        # Build up the rows. This is slow but w/e it works.
         all_functions = self.pkg_collection.all_functions()
         non_shared_functions = self.pkg_collection.non_shared_functions()
 
-        rows = []
-        for func_name in all_functions:
-            row = [func_name]
-            for pkg_name in pkg_names:
-                if func_name in functions_by_package[pkg_name]:
-                    row += [self.exists_string]
-                else:
-                    row += [self.absent_string]
-            rows += [row]
-
         # Report output
-        out = _OutputTable(headers=headers, rows=rows)
-        out.write()
+        self._write_presence_table(
+            "function_name", all_functions, self.pkg_collection.function_presence
+        )
 
         # Append errors
         if len(non_shared_functions) > 0:
             for func_name in non_shared_functions:
                 error_txt = f"Function '{func_name}()' is not exported by all packages"
-                self.errors.append(DoppelTestError(error_txt))
+                self._add_error("function_names", error_txt)
 
         # Print output
         stdout.write("\n")
@@ -192,8 +593,6 @@ class SimpleReporter:
         stdout.write("\nFunction Argument Names\n")
         stdout.write("=======================\n")
 
-        func_blocks_by_package = {pkg.name(): pkg.pkg_dict["functions"] for pkg in self.pkgs}
-        pkg_names = self.pkg_collection.package_names()
         shared_functions = self.pkg_collection.shared_functions()
 
         # If there are no shared functions, skip
@@ -207,7 +606,7 @@ class SimpleReporter:
         for func_name in shared_functions:
             identical_api = "yes"
 
-            args = [func_blocks_by_package[p][func_name]["args"] for p in pkg_names]
+            args = [pkg.function_args(func_name) for pkg in self.pkgs]
 
             # check 1: same number of arguments?
             same_length = all([len(func_arg_list) == len(args[0]) for func_arg_list in args])
@@ -217,7 +616,7 @@ class SimpleReporter:
                     "differing number of arguments ({})."
                 )
                 error_txt = error_txt.format(func_name, ",".join([str(len(a)) for a in args]))
-                self.errors.append(DoppelTestError(error_txt))
+                self._add_error("function_args", error_txt)
                 identical_api = "no"
 
             # check 2: same set of arguments
@@ -228,7 +627,7 @@ class SimpleReporter:
                     "are not shared in all implementations."
                 )
                 error_txt = error_txt.format(func_name)
-                self.errors.append(DoppelTestError(error_txt))
+                self._add_error("function_args", error_txt)
                 identical_api = "no"
 
             # check 3: same set of arguments and same order
@@ -244,7 +643,7 @@ class SimpleReporter:
                     "order of keyword arguments."
                 )
                 error_txt = error_txt.format(func_name)
-                self.errors.append(DoppelTestError(error_txt))
+                self._add_error("function_args", error_txt)
                 identical_api = "no"
 
             # if you get here, we're gucci
@@ -256,7 +655,7 @@ class SimpleReporter:
         )
         stdout.write(message.format(len([r for r in rows if r[1] == "yes"]), len(shared_functions)))
 
-        out = _OutputTable(headers=headers, rows=rows)
+        out = _OutputTable(headers=headers, rows=rows, formatter=self.table_formatter)
         out.write()
 
         # Print output
@@ -278,14 +677,14 @@ class SimpleReporter:
             counts.append(pkg.num_classes())
 
         # Report output
-        out = _OutputTable(headers=names, rows=[counts])
+        out = _OutputTable(headers=names, rows=[counts], formatter=self.table_formatter)
         out.write()
 
         # Append errors
         if len(set(counts)) > 1:
             error_txt = "Packages have different counts of exported classes! {}"
             error_txt = error_txt.format(", ".join([f"{x} ({y})" for x, y in zip(names, counts)]))
-            self.errors.append(DoppelTestError(error_txt))
+            self._add_error("class_count", error_txt)
 
         # Print output
         stdout.write("\n")
@@ -300,39 +699,17 @@ class SimpleReporter:
         stdout.write("\nClass Names\n")
         stdout.write("===========\n")
 
-        pkg_names = []
-        classes_by_package = {}
-        for pkg in self.pkgs:
-            pkg_name = pkg.name()
-            pkg_names.append(pkg_name)
-            classes_by_package[pkg_name] = pkg.class_names()
-
-        # Headers are easy money
-        headers = ["class_name"] + [pkg.name() for pkg in self.pkgs]
-
-        # Build up the rows. This is slow but w/e it works.
         all_classes = self.pkg_collection.all_classes()
         non_shared_classes = self.pkg_collection.non_shared_classes()
 
-        rows = []
-        for class_name in all_classes:
-            row = [class_name]
-            for pkg_name in pkg_names:
-                if class_name in classes_by_package[pkg_name]:
-                    row += [self.exists_string]
-                else:
-                    row += [self.absent_string]
-            rows += [row]
-
         # Report output
-        out = _OutputTable(headers=headers, rows=rows)
-        out.write()
+        self._write_presence_table("class_name", all_classes, self.pkg_collection.class_presence)
 
         # Append errors
         if len(non_shared_classes) > 0:
             for class_name in non_shared_classes:
                 error_txt = f"Class '{class_name}' is not exported by all packages"
-                self.errors.append(DoppelTestError(error_txt))
+                self._add_error("class_names", error_txt)
 
         # Print output
         stdout.write("\n")
@@ -356,23 +733,13 @@ class SimpleReporter:
 
         # Figure out which methods are not shared across
         # all packages
-        for class_name in shared_classes:
-            shared_methods = set(self.pkgs[0].public_methods(class_name))
-            nonshared_methods = set([])
-
-            for pkg in self.pkgs[1:]:
-                methods = pkg.public_methods(class_name)
-                diff = shared_methods.symmetric_difference(methods)
-
-                shared_methods = shared_methods.intersection(methods)
-                for m in diff:
-                    nonshared_methods.add(m)
-
+        non_shared_methods_by_class = self.pkg_collection.non_shared_methods_by_class()
+        for class_name, nonshared_methods in non_shared_methods_by_class.items():
             # If anything is in nonshared methods, add an error
             for method in nonshared_methods:
                 error_txt = "Not all implementations of class '{}' have public method '{}()'"
                 error_txt = error_txt.format(class_name, method)
-                self.errors.append(DoppelTestError(error_txt))
+                self._add_error("class_public_methods", error_txt)
 
     def _check_class_public_method_args(self) -> None:
         """
@@ -412,7 +779,7 @@ class SimpleReporter:
                     error_txt = error_txt.format(
                         method_name, class_name, ",".join([str(len(a)) for a in args])
                     )
-                    self.errors.append(DoppelTestError(error_txt))
+                    self._add_error("class_public_method_args", error_txt)
                     identical_api = "no"
 
                 # check 2: same set of arguments
@@ -425,7 +792,7 @@ class SimpleReporter:
                         "packages but some arguments are not shared in all implementations."
                     )
                     error_txt = error_txt.format(method_name, class_name)
-                    self.errors.append(DoppelTestError(error_txt))
+                    self._add_error("class_public_method_args", error_txt)
                     identical_api = "no"
 
                 # check 3: same set or arguments and same order
@@ -436,14 +803,14 @@ class SimpleReporter:
                         "all packages but with differing order of keyword arguments."
                     )
                     error_txt = error_txt.format(method_name, class_name)
-                    self.errors.append(DoppelTestError(error_txt))
+                    self._add_error("class_public_method_args", error_txt)
                     identical_api = "no"
 
                 # if you get here, we're gucci
                 rows.append([display_name, identical_api])
 
         # Report output
-        out = _OutputTable(headers=headers, rows=rows)
+        out = _OutputTable(headers=headers, rows=rows, formatter=self.table_formatter)
         out.write()
 
         # Print output
@@ -0,0 +1,217 @@
+"""
+Timelines for ``doppel-describe`` and ``doppel-test`` (``--trace``).
+
+A run is recorded as Chrome trace events, which can be viewed in Perfetto
+(https://ui.perfetto.dev) or ``chrome://tracing``. Every ``profiling.phase()``
+is a span on the timeline, and code anywhere in ``doppel`` can add other
+spans with ``span()``. These do nothing unless a ``Trace`` is active.
+
+The analysis script can add spans when it runs in a child process. The
+process and thread it should put them on, and the file to write them to,
+are passed to it in the ``DOPPEL_TRACE_CONTEXT`` environment variable,
+so its spans show up inside the span of the parent that started it.
+Timestamps are microseconds since the Unix epoch, so spans from different
+processes line up.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+if sys.platform == "win32":
+    import msvcrt  # pylint: disable=import-error
+else:
+    import fcntl
+
+# has to match TRACE_ENV_VAR in bin/analyze.py
+TRACE_ENV_VAR = "DOPPEL_TRACE_CONTEXT"
+
+
+def _now_us() -> float:
+    return time.time_ns() / 1000
+
+
+def _ids() -> Dict[str, int]:
+    return {"pid": os.getpid(), "tid": threading.get_native_id()}
+
+
+@contextmanager
+def _locked(path: str) -> Iterator[None]:
+    """
+    Hold an exclusive lock on ``path`` (using the file ``<path>.lock``),
+    so runs that add to the same trace at the same time take turns.
+
+    The lock file is left in place afterwards. Deleting it on release
+    would let a run still waiting on the deleted file and a run that
+    creates a new one both hold the lock at the same time.
+    """
+    with open(f"{path}.lock", "w") as lock_file:
+        if sys.platform == "win32":
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if sys.platform == "win32":
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read_events(path: str) -> List[Dict[str, Any]]:
+    """
+    Events in a trace file, in either of Chrome's formats: an object
+    with the events in ``"traceEvents"``, or just an array of events
+    (where the closing ``]`` is optional).
+    """
+    with open(path, "r") as f:
+        text = f.read().strip()
+    if not text:
+        return []
+    if text.startswith("[") and not text.endswith("]"):
+        text = text.rstrip(",") + "]"
+    trace = json.loads(text)
+    if isinstance(trace, list):
+        return trace
+    return trace.get("traceEvents", [])
+
+
+class Trace:
+    """
+    Record a timeline of everything run in a ``with`` block.
+
+    On exit, the events (including those from child processes added
+    with ``add_child()``) are written to ``path``. If ``path`` already
+    has a trace in it, the events are added to it, so runs can share a
+    timeline, even if they finish at the same time. An empty
+    ``<path>.lock`` file is left next to it, which can be ignored.
+
+    :param path: File to write events to
+    :param name: Name of the span covering the whole block, like
+        ``"doppel-describe"``
+    """
+
+    def __init__(self, path: str, name: str):
+        self.path = path
+        self.name = name
+        self.events: List[Dict[str, Any]] = []
+        self._started = 0.0
+
+    def __enter__(self) -> "Trace":
+        global _ACTIVE  # pylint: disable=global-statement
+        _ACTIVE = self
+        self._started = _now_us()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        global _ACTIVE  # pylint: disable=global-statement
+        _ACTIVE = None
+        self.add_span(self.name, self._started, _now_us())
+        self.add_events(
+            [{"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": self.name}}]
+        )
+        self.write()
+
+    def add_span(
+        self, name: str, start_us: float, end_us: float, args: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Add a span that ran on this thread.
+        """
+        event = {"name": name, "ph": "X", "ts": start_us, "dur": end_us - start_us, **_ids()}
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def add_events(self, events: List[Dict[str, Any]]) -> None:
+        """
+        Add events recorded somewhere else, like in the analysis script.
+        """
+        self.events.extend(events)
+
+    def add_child(self, events_file: str) -> None:
+        """
+        Add the events written by a child process.
+        """
+        with open(events_file, "r") as f:
+            self.add_events(json.load(f))
+
+    def write(self) -> None:
+        """
+        Write all the events to ``path``, after the ones already in it.
+        """
+        with _locked(self.path):
+            events = _read_events(self.path) if os.path.isfile(self.path) else []
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"traceEvents": events + self.events, "displayTimeUnit": "ms"}, f)
+
+            # rename so other processes never see a partially-written trace
+            os.replace(tmp_path, self.path)
+
+
+_ACTIVE: Optional[Trace] = None
+
+
+@contextmanager
+def span(name: str, **args: Any) -> Iterator[None]:
+    """
+    Add a span covering this block to the timeline. This
+    is a no-op unless the run is being traced.
+
+    :param args: Details to show for the span
+    """
+    if _ACTIVE is None:
+        yield
+        return
+    trace = _ACTIVE
+    start_us = _now_us()
+    try:
+        yield
+    finally:
+        trace.add_span(name, start_us, _now_us(), args)
+
+
+def add_events(events: List[Dict[str, Any]]) -> None:
+    """
+    Add events recorded outside of ``span()``, like the
+    ones from ``analyze.py`` run in this process.
+    """
+    if _ACTIVE is not None:
+        _ACTIVE.add_events(events)
+
+
+def child_env(events_file: str) -> Optional[Dict[str, str]]:
+    """
+    Environment for a child process that should write its events to
+    ``events_file``, or ``None`` if the run isn't traced. The child's
+    spans go on this thread, so start it from the thread that is
+    waiting for it.
+    """
+    if _ACTIVE is None:
+        return None
+    env = dict(os.environ)
+    env[TRACE_ENV_VAR] = json.dumps({"file": events_file, **_ids()})
+    return env
+
+
+def add_child(events_file: str) -> None:
+    """
+    Add the events written by a child process to the current trace.
+    Does nothing if the run isn't traced or the file doesn't exist.
+    """
+    if _ACTIVE is not None and os.path.isfile(events_file):
+        _ACTIVE.add_child(events_file)
+
+
+def thread_ids() -> Optional[Dict[str, int]]:
+    """
+    Process and thread ID to put spans recorded on this thread on,
+    or ``None`` if the run isn't traced.
+    """
+    return _ids() if _ACTIVE is not None else None
@@ -529,3 +529,346 @@ class TestMissingFiles:
         result = subprocess.run(["doppel-test"], stderr=subprocess.PIPE)
         error_text = result.stderr.decode("utf-8")
         assert bool(re.search('Missing option "--files"', error_text))
+
+
+class TestIsolated:
+    """
+    doppel-describe --isolated should describe packages in
+    a separate process, and get the same answer
+    """
+
+    def test_isolated(self, rundescribe, tmp_path):
+        for package_name, expected in rundescribe.items():
+            cmd = "doppel-describe --language python -p {} --data-dir {} --isolated".format(
+                package_name, tmp_path
+            )
+            exit_code = os.system(cmd)
+            assert exit_code == 0
+
+            with open(os.path.join(tmp_path, "python_{}.json".format(package_name)), "r") as f:
+                result_json = json.loads(f.read())
+            assert result_json == expected
+
+
+class TestMultiplePackages:
+    """
+    doppel-describe should be able to describe several
+    packages in parallel
+    """
+
+    def test_multiple_packages(self, rundescribe, tmp_path):
+        cmd = "doppel-describe --language python -p {} --data-dir {} --jobs 3".format(
+            ",".join(rundescribe.keys()), tmp_path
+        )
+        exit_code = os.system(cmd)
+        assert exit_code == 0
+
+        for package_name, expected in rundescribe.items():
+            with open(os.path.join(tmp_path, "python_{}.json".format(package_name)), "r") as f:
+                result_json = json.loads(f.read())
+            assert result_json == expected
+
+    def test_wrong_number_of_languages(self, tmp_path):
+        result = subprocess.run(
+            [
+                "doppel-describe",
+                "--language",
+                "python,python,python",
+                "-p",
+                "testpkguno,testpkgdos",
+                "--data-dir",
+                str(tmp_path),
+            ],
+            stderr=subprocess.PIPE,
+        )
+        error_text = result.stderr.decode("utf-8")
+        assert bool(re.search("Got 3 languages for 2 packages", error_text))
+
+
+class TestCache:
+    """
+    doppel-describe --cache-dir should re-use descriptions
+    of packages that haven't changed
+    """
+
+    def test_cache(self, rundescribe, tmp_path):
+        cache_dir = tmp_path / "cache"
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        cmd = [
+            "doppel-describe",
+            "--language",
+            "python",
+            "-p",
+            "testpkguno",
+            "--data-dir",
+            str(data_dir),
+            "--cache-dir",
+            str(cache_dir),
+        ]
+        first = subprocess.run(cmd, stderr=subprocess.PIPE)
+        assert first.returncode == 0
+        assert "Using cached description" not in first.stderr.decode("utf-8")
+
+        os.remove(data_dir / "python_testpkguno.json")
+        second = subprocess.run(cmd, stderr=subprocess.PIPE)
+        assert second.returncode == 0
+        assert "Using cached description" in second.stderr.decode("utf-8")
+
+        with open(data_dir / "python_testpkguno.json", "r") as f:
+            assert json.loads(f.read()) == rundescribe["testpkguno"]
+
+
+class TestStaticMode:
+    """
+    doppel-describe --mode static should describe packages
+    without importing them, and get the same answer
+    """
+
+    def test_static_mode(self, rundescribe, tmp_path):
+        for package_name, expected in rundescribe.items():
+            cmd = "doppel-describe --language python -p {} --data-dir {} --mode static".format(
+                package_name, tmp_path
+            )
+            exit_code = os.system(cmd)
+            assert exit_code == 0
+
+            with open(os.path.join(tmp_path, "python_{}.json".format(package_name)), "r") as f:
+                result_json = json.loads(f.read())
+            assert result_json == expected
+
+    def test_static_mode_r(self, tmp_path):
+        """
+        --mode static is not supported for R packages
+        """
+        result = subprocess.run(
+            [
+                "doppel-describe",
+                "--language",
+                "r",
+                "-p",
+                "testpkguno",
+                "--data-dir",
+                str(tmp_path),
+                "--mode",
+                "static",
+            ],
+            stderr=subprocess.PIPE,
+        )
+        error_text = result.stderr.decode("utf-8")
+        assert bool(re.search("only supported for Python packages", error_text))
+
+
+class TestBinaryOutput:
+    """
+    doppel-describe --output-format binary should write
+    descriptions that convert back to the same JSON
+    """
+
+    def test_binary_output(self, rundescribe, tmp_path):
+        from doppel.binary import binary_to_json
+
+        cmd = "doppel-describe --language python -p {} --data-dir {} --output-format binary".format(
+            "testpkguno", tmp_path
+        )
+        exit_code = os.system(cmd)
+        assert exit_code == 0
+        assert not os.path.exists(os.path.join(tmp_path, "python_testpkguno.json"))
+
+        json_file = os.path.join(tmp_path, "converted.json")
+        binary_to_json(os.path.join(tmp_path, "python_testpkguno.bin"), json_file)
+        with open(json_file, "r") as f:
+            assert json.loads(f.read()) == rundescribe["testpkguno"]
+
+
+class TestProfile:
+    """
+    doppel-describe --profile should write cProfile statistics, including
+    those from the analysis script when it runs in a separate process
+    """
+
+    @pytest.mark.parametrize("isolated", ["", "--isolated"])
+    def test_profile(self, tmp_path, isolated):
+        import pstats
+
+        profile_file = os.path.join(tmp_path, "describe.prof")
+        result = subprocess.run(
+            [
+                "doppel-describe",
+                "--language",
+                "python",
+                "-p",
+                "testpkguno",
+                "--data-dir",
+                str(tmp_path),
+                "--profile",
+                profile_file,
+            ]
+            + ([isolated] if isolated else []),
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        assert result.returncode == 0
+        for phase in ["import", "module walk", "class introspection", "JSON write"]:
+            assert phase in result.stderr
+
+        stats = pstats.Stats(profile_file)
+        assert any(filename.endswith("analyze.py") for filename, _, _ in stats.stats)
+
+
+class TestImportProfile:
+    """
+    doppel-describe --import-profile should write a report on
+    how long it took to import the package
+    """
+
+    def test_import_profile(self, rundescribe, tmp_path):
+        report_file = os.path.join(tmp_path, "imports.txt")
+        cmd = "doppel-describe --language python -p {} --data-dir {} --import-profile {}".format(
+            "testpkguno", tmp_path, report_file
+        )
+        exit_code = os.system(cmd)
+        assert exit_code == 0
+
+        with open(report_file, "r") as f:
+            report = f.read()
+        assert "'import testpkguno' took" in report
+        assert "this package      testpkguno" in report
+
+        with open(os.path.join(tmp_path, "python_testpkguno.json"), "r") as f:
+            assert json.loads(f.read()) == rundescribe["testpkguno"]
+
+
+class TestResources:
+    """
+    doppel-describe should log the resources used to describe each package,
+    and add them to the output with --timings
+    """
+
+    @pytest.mark.parametrize("isolated", ["", "--isolated"])
+    def test_resources(self, rundescribe, tmp_path, isolated):
+        cmd = [
+            "doppel-describe",
+            "--language",
+            "python",
+            "-p",
+            "testpkguno",
+            "--data-dir",
+            str(tmp_path),
+        ] + ([isolated] if isolated else [])
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        assert result.returncode == 0
+        assert "Resources used to describe testpkguno: wall_seconds=" in result.stdout
+
+        # only --timings adds them to the output, so it doesn't change between runs
+        with open(os.path.join(tmp_path, "python_testpkguno.json"), "r") as f:
+            assert json.loads(f.read()) == rundescribe["testpkguno"]
+
+        subprocess.run(cmd + ["--timings"], check=True)
+        with open(os.path.join(tmp_path, "python_testpkguno.json"), "r") as f:
+            resources = json.loads(f.read())["_meta"]["resources"]
+        assert resources["peak_rss_mb"] > 0
+        assert resources["wall_seconds"] >= 0
+
+
+class TestTrace:
+    """
+    doppel-describe --trace should write a timeline where the analysis
+    script's spans are inside the span for describing the package
+    """
+
+    @pytest.mark.parametrize("isolated", ["", "--isolated"])
+    def test_trace(self, tmp_path, isolated):
+        trace_file = os.path.join(tmp_path, "trace.json")
+        cmd = "doppel-describe --language python -p testpkguno --data-dir {} --trace {} {}"
+        exit_code = os.system(cmd.format(tmp_path, trace_file, isolated))
+        assert exit_code == 0
+
+        with open(trace_file, "r") as f:
+            events = [e for e in json.loads(f.read())["traceEvents"] if e["ph"] == "X"]
+        spans = {e["name"]: e for e in events}
+        assert set(spans) >= {
+            "doppel-describe",
+            "describe testpkguno [python]",
+            "import",
+            "module walk",
+            "class introspection",
+            "JSON write",
+        }
+        outer = spans["describe testpkguno [python]"]
+        for name in ["import", "module walk", "JSON write"]:
+            inner = spans[name]
+            assert (inner["pid"], inner["tid"]) == (outer["pid"], outer["tid"])
+            assert outer["ts"] <= inner["ts"]
+            assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+
+
+class TestMetrics:
+    """
+    doppel-describe --metrics-dir should write Prometheus metrics
+    about every package described
+    """
+
+    @pytest.mark.parametrize("isolated", ["", "--isolated"])
+    def test_metrics(self, rundescribe, tmp_path, isolated):
+        cmd = "doppel-describe --language python -p testpkguno --data-dir {} --metrics-dir {} {}"
+        exit_code = os.system(cmd.format(tmp_path, tmp_path, isolated))
+        assert exit_code == 0
+
+        with open(os.path.join(tmp_path, "doppel_describe.prom"), "r") as f:
+            lines = f.read().splitlines()
+        labels = '{language="python",package="testpkguno"}'
+        num_functions = len(rundescribe["testpkguno"]["functions"])
+        assert f"doppel_describe_functions{labels} {num_functions}" in lines
+        assert f"doppel_describe_modules_walked{labels} 1" in lines
+        assert "doppel_describe_packages 1" in lines
+        phase = (
+            "doppel_describe_package_phase_seconds"
+            '{language="python",package="testpkguno",phase="import"}'
+        )
+        assert any(line.startswith(phase) for line in lines)
+
+        # output from doppel-describe doesn't change
+        with open(os.path.join(tmp_path, "python_testpkguno.json"), "r") as f:
+            assert json.loads(f.read()) == rundescribe["testpkguno"]
+
+
+class TestNamespaceTraversal:
+    """
+    doppel-describe --traversal namespace should find the same names as the
+    default traversal, except for names left out of __all__
+    """
+
+    def test_namespace_traversal(self, rundescribe, tmp_path):
+        for pkg in ["testpkguno", "pythonspecific", "pythonspecific2"]:
+            cmd = "doppel-describe --language python -p {} --data-dir {} --traversal namespace"
+            exit_code = os.system(cmd.format(pkg, tmp_path))
+            assert exit_code == 0
+
+            with open(os.path.join(tmp_path, f"python_{pkg}.json"), "r") as f:
+                result = json.loads(f.read())
+            expected = rundescribe[pkg]
+            if pkg == "pythonspecific2":
+                # not in pythonspecific2.__all__
+                expected["functions"].pop("create_warm_things")
+            assert result == expected
+
+
+class TestStaticClassIntrospection:
+    """
+    doppel-describe --class-introspection static should describe the
+    same classes as the default for classes without descriptors
+    """
+
+    def test_static_class_introspection(self, rundescribe, tmp_path):
+        for pkg in ["testpkguno", "testpkgdos", "testpkgtres", "pythonspecific"]:
+            cmd = (
+                "doppel-describe --language python -p {} --data-dir {} "
+                "--class-introspection static"
+            )
+            exit_code = os.system(cmd.format(pkg, tmp_path))
+            assert exit_code == 0
+
+            with open(os.path.join(tmp_path, f"python_{pkg}.json"), "r") as f:
+                result = json.loads(f.read())
+            assert result == rundescribe[pkg]
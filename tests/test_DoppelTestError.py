@@ -14,3 +14,8 @@ class TestDoppelTestError(unittest.TestCase):
 
         txt = str(e)
         self.assertEqual(txt, "hello I am a message\n")
+
+    def test_check(self):
+        e = DoppelTestError("hello I am a message", check="function_names")
+        self.assertEqual(e.check, "function_names")
+        self.assertIsNone(DoppelTestError("hello I am a message").check)
@@ -0,0 +1,107 @@
+import json
+import os
+import struct
+import tempfile
+import unittest
+
+from doppel import PackageAPI
+from doppel.binary import binary_to_json, is_binary, json_to_binary, read_binary
+
+TESTDATA_DIR = os.path.join("tests", "testdata")
+
+
+class TestBinaryFormat(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _path(self, filename):
+        return os.path.join(self._tmp.name, filename)
+
+    def test_round_trip(self):
+        """
+        Converting JSON to the binary format and back
+        should not lose anything
+        """
+        for filename in os.listdir(TESTDATA_DIR):
+            json_file = os.path.join(TESTDATA_DIR, filename)
+            binary_file = self._path("pkg.bin")
+            json_to_binary(json_file, binary_file)
+            self.assertTrue(is_binary(binary_file))
+            self.assertFalse(is_binary(json_file))
+
+            binary_to_json(binary_file, self._path("pkg.json"))
+            with open(json_file, "r") as f:
+                expected = json.load(f)
+            with open(self._path("pkg.json"), "r") as f:
+                self.assertEqual(json.load(f), expected, msg=filename)
+
+    def test_from_file(self):
+        """
+        PackageAPI.from_file() should give the same package
+        for JSON and binary files
+        """
+        json_file = os.path.join(TESTDATA_DIR, "r_package1.json")
+        binary_file = self._path("r_package1.bin")
+        json_to_binary(json_file, binary_file)
+
+        from_json = PackageAPI.from_file(json_file)
+        from_binary = PackageAPI.from_file(binary_file)
+        self.assertEqual(from_binary.name(), from_json.name())
+        self.assertEqual(from_binary.function_names(), from_json.function_names())
+        self.assertEqual(from_binary.function_args("playback"), ("bpm", "bass"))
+        self.assertEqual(from_binary.class_names(), from_json.class_names())
+        self.assertEqual(
+            from_binary.public_methods("LupeFiasco"), from_json.public_methods("LupeFiasco")
+        )
+        self.assertEqual(
+            from_binary.public_method_args("LupeFiasco", "words"), ("i_said", "i_never_said")
+        )
+        self.assertTrue(from_binary.has_public_method("LupeFiasco", "words"))
+        self.assertFalse(from_binary.has_public_method("LupeFiasco", "playback"))
+        self.assertEqual(from_binary.pkg_dict, from_json.pkg_dict)
+
+    def test_lazy_args(self):
+        """
+        read_binary() should only read argument lists
+        when they are looked up
+        """
+        binary_file = self._path("python_package1.bin")
+        json_to_binary(os.path.join(TESTDATA_DIR, "python_package1.json"), binary_file)
+
+        compact = read_binary(binary_file)
+        self.assertEqual(list(compact["functions"]), ["playback"])
+        self.assertEqual(compact["functions"]._file._arg_lists, {})
+        self.assertEqual(compact["functions"]["playback"], ("bpm", "bass"))
+        self.assertEqual(len(compact["functions"]._file._arg_lists), 1)
+
+        # classes are listed without reading their methods
+        self.assertIn("LupeFiasco", compact["classes"])
+        self.assertNotIn("playback", compact["classes"])
+        self.assertEqual(compact["classes"]._classes, {})
+
+    def test_invalid_files(self):
+        """
+        read_binary() should reject files that are not in
+        the binary format or use a different version of it
+        """
+        with self.assertRaisesRegex(ValueError, "is not a binary doppel package description"):
+            read_binary(os.path.join(TESTDATA_DIR, "python_package1.json"))
+
+        binary_file = self._path("pkg.bin")
+        json_to_binary(os.path.join(TESTDATA_DIR, "python_package1.json"), binary_file)
+        with open(binary_file, "r+b") as f:
+            f.seek(8)
+            f.write(struct.pack("<I", 999))
+        with self.assertRaisesRegex(ValueError, "uses version 999 of the binary format"):
+            read_binary(binary_file)
+
+        # too short to hold the header
+        with open(binary_file, "rb") as f:
+            start = f.read(4)
+        with open(binary_file, "wb") as f:
+            f.write(start)
+        with self.assertRaisesRegex(ValueError, "is not a binary doppel package description"):
+            read_binary(binary_file)
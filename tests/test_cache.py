@@ -0,0 +1,237 @@
+import importlib.metadata
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from doppel.cache import DescribeCache, python_package_fingerprint, r_package_fingerprint
+
+
+class TestDescribeCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self._tmp.name, "cache")
+        self.source = os.path.join(self._tmp.name, "python_pkg.json")
+        with open(self.source, "w") as f:
+            f.write('{"name": "pkg [python]"}')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_key(self):
+        """
+        DescribeCache.key() should only depend on the
+        values passed to it, not their order
+        """
+        key = DescribeCache.key(language="python", pkg_name="pkg", mode="import")
+        self.assertEqual(key, DescribeCache.key(mode="import", pkg_name="pkg", language="python"))
+        self.assertNotEqual(
+            key, DescribeCache.key(language="python", pkg_name="pkg", mode="static")
+        )
+
+    def test_get_and_put(self):
+        """
+        DescribeCache.get() should copy out descriptions
+        added with DescribeCache.put()
+        """
+        cache = DescribeCache(self.cache_dir, max_size=1024)
+        destination = os.path.join(self._tmp.name, "out.json")
+
+        self.assertFalse(cache.get("some-key", destination))
+        self.assertFalse(os.path.exists(destination))
+
+        cache.put("some-key", self.source)
+        self.assertTrue(cache.get("some-key", destination))
+        with open(destination, "r") as f:
+            self.assertEqual(f.read(), '{"name": "pkg [python]"}')
+
+    def test_get_evicted_while_copying(self):
+        """
+        DescribeCache.get() should still be a hit if another process
+        evicts the entry after it was copied
+        """
+        cache = DescribeCache(self.cache_dir, max_size=1024)
+        destination = os.path.join(self._tmp.name, "out.json")
+        cache.put("some-key", self.source)
+        with mock.patch("doppel.cache.os.utime", side_effect=FileNotFoundError):
+            self.assertTrue(cache.get("some-key", destination))
+        self.assertTrue(os.path.isfile(destination))
+
+    def test_eviction_races(self):
+        """
+        DescribeCache eviction should ignore files that aren't entries,
+        and entries that another process removed first
+        """
+        entry_size = os.path.getsize(self.source)
+        cache = DescribeCache(self.cache_dir, max_size=entry_size)
+        with open(os.path.join(self.cache_dir, "partial.tmp"), "w") as f:
+            f.write("x" * 10 * entry_size)
+        cache.put("first", self.source)
+        os.utime(os.path.join(self.cache_dir, "first.json"), (1, 1))
+
+        stat = os.stat
+        remove = os.remove
+
+        def _stat(path, *args, **kwargs):
+            if path.endswith("gone.json"):
+                raise FileNotFoundError(path)
+            return stat(path, *args, **kwargs)
+
+        def _remove(path):
+            remove(path)
+            # another process removed it first
+            raise FileNotFoundError(path)
+
+        with open(os.path.join(self.cache_dir, "gone.json"), "w") as f:
+            f.write("{}")
+        with mock.patch("doppel.cache.os.stat", side_effect=_stat), mock.patch(
+            "doppel.cache.os.remove", side_effect=_remove
+        ):
+            cache.put("second", self.source)
+
+        destination = os.path.join(self._tmp.name, "out.json")
+        self.assertFalse(cache.get("first", destination))
+        self.assertTrue(cache.get("second", destination))
+        self.assertTrue(os.path.isfile(os.path.join(self.cache_dir, "partial.tmp")))
+
+    def test_eviction(self):
+        """
+        DescribeCache should remove the least recently used
+        entries once it is bigger than max_size
+        """
+        entry_size = os.path.getsize(self.source)
+        cache = DescribeCache(self.cache_dir, max_size=2 * entry_size)
+        destination = os.path.join(self._tmp.name, "out.json")
+
+        cache.put("first", self.source)
+        cache.put("second", self.source)
+        os.utime(os.path.join(self.cache_dir, "first.json"), (1, 1))
+        os.utime(os.path.join(self.cache_dir, "second.json"), (2, 2))
+
+        # using "first" makes "second" the least recently used
+        self.assertTrue(cache.get("first", destination))
+        cache.put("third", self.source)
+
+        self.assertTrue(cache.get("first", destination))
+        self.assertFalse(cache.get("second", destination))
+        self.assertTrue(cache.get("third", destination))
+
+    def test_python_package_fingerprint(self):
+        """
+        python_package_fingerprint() should identify installed
+        packages and return None for ones that don't exist
+        """
+        fingerprint = python_package_fingerprint("click")
+        self.assertIsNotNone(fingerprint["version"])
+        self.assertEqual(fingerprint, python_package_fingerprint("click"))
+        self.assertIsNone(python_package_fingerprint("there_is_no_package_with_this_name"))
+
+    def _write_package(self, pkg_name):
+        pkg_dir = os.path.join(self._tmp.name, "src", pkg_name)
+        os.makedirs(os.path.join(pkg_dir, "__pycache__"))
+        with open(os.path.join(pkg_dir, "__init__.py"), "w") as f:
+            f.write("def playback(bpm):\n    pass\n")
+        with open(os.path.join(pkg_dir, "__pycache__", "__init__.cpython.pyc"), "w") as f:
+            f.write("not really bytecode")
+        with open(os.path.join(self._tmp.name, "src", pkg_name + "_module.py"), "w") as f:
+            f.write("def playback(bpm):\n    pass\n")
+        return pkg_dir
+
+    def test_python_package_fingerprint_from_source(self):
+        """
+        python_package_fingerprint() should hash the source files of packages
+        that weren't installed from a distribution, and ignore bytecode
+        """
+        pkg_dir = self._write_package("boombap")
+        sys.path.insert(0, os.path.dirname(pkg_dir))
+        self.addCleanup(sys.path.remove, os.path.dirname(pkg_dir))
+
+        fingerprint = python_package_fingerprint("boombap")
+        self.assertIsNone(fingerprint["version"])
+        with open(os.path.join(pkg_dir, "__pycache__", "__init__.cpython.pyc"), "w") as f:
+            f.write("different bytecode")
+        self.assertEqual(python_package_fingerprint("boombap"), fingerprint)
+        with open(os.path.join(pkg_dir, "__init__.py"), "a") as f:
+            f.write("def rewind(bpm):\n    pass\n")
+        self.assertNotEqual(python_package_fingerprint("boombap"), fingerprint)
+
+        module_fingerprint = python_package_fingerprint("boombap_module")
+        self.assertNotEqual(module_fingerprint["files"], fingerprint["files"])
+
+        # built-in modules have no files to hash
+        self.assertIsNone(python_package_fingerprint("sys"))
+
+    def test_python_package_fingerprint_from_distribution(self):
+        """
+        python_package_fingerprint() should find distributions whose name
+        isn't the import name, and hash the package's files if the
+        distribution has no RECORD or (like editable installs) the
+        package isn't in the distribution's install directory
+        """
+        pkg_dir = self._write_package("boombap")
+        sys.path.insert(0, os.path.dirname(pkg_dir))
+        self.addCleanup(sys.path.remove, os.path.dirname(pkg_dir))
+        source_fingerprint = python_package_fingerprint("boombap")
+
+        # an editable install: the distribution is elsewhere
+        with mock.patch(
+            "importlib.metadata.packages_distributions",
+            return_value={"boombap": ["no-such-distribution", "click"]},
+            create=True,
+        ):
+            fingerprint = python_package_fingerprint("boombap")
+        self.assertEqual(fingerprint["version"], importlib.metadata.version("click"))
+        self.assertEqual(fingerprint["files"], source_fingerprint["files"])
+
+        # a distribution without a RECORD, installed where the package is
+        dist = mock.Mock(version="1.2.3")
+        dist.read_text.return_value = None
+        dist.locate_file.return_value = os.path.dirname(pkg_dir)
+        with mock.patch("doppel.cache._find_distribution", return_value=dist):
+            fingerprint = python_package_fingerprint("boombap")
+        self.assertEqual(fingerprint["version"], "1.2.3")
+        self.assertEqual(fingerprint["files"], source_fingerprint["files"])
+
+        dist.read_text.return_value = "boombap/__init__.py,sha256=abc,10\n"
+        with mock.patch("doppel.cache._find_distribution", return_value=dist):
+            fingerprint = python_package_fingerprint("boombap")
+        self.assertNotEqual(fingerprint["files"], source_fingerprint["files"])
+
+    def test_r_package_fingerprint(self):
+        """
+        r_package_fingerprint() should pass the package name to R
+        as an argument, not as part of the code it runs
+        """
+        pkg_dir = os.path.join(self._tmp.name, "boombap")
+        os.mkdir(pkg_dir)
+        with open(os.path.join(pkg_dir, "DESCRIPTION"), "w") as f:
+            f.write("Package: boombap\nVersion: 1.2.3\n")
+
+        pkg_name = "boombap'); system('echo oops'); ('"
+        found = subprocess.CompletedProcess(args=[], returncode=0, stdout=pkg_dir)
+        with mock.patch("doppel.cache.subprocess.run", return_value=found) as run:
+            fingerprint = r_package_fingerprint(pkg_name)
+        self.assertEqual(fingerprint["version"], "1.2.3")
+        cmd = run.call_args[0][0]
+        self.assertEqual(cmd[-1], pkg_name)
+        self.assertNotIn(pkg_name, cmd[-2])
+
+        # the MD5 file has checksums of every installed file
+        with open(os.path.join(pkg_dir, "MD5"), "w") as f:
+            f.write("abc R/boombap\n")
+        with mock.patch("doppel.cache.subprocess.run", return_value=found):
+            self.assertNotEqual(r_package_fingerprint("boombap"), fingerprint)
+
+    def test_r_package_fingerprint_not_found(self):
+        """
+        r_package_fingerprint() should return None if R isn't
+        installed or can't find the package
+        """
+        with mock.patch("doppel.cache.subprocess.run", side_effect=FileNotFoundError):
+            self.assertIsNone(r_package_fingerprint("boombap"))
+
+        not_found = subprocess.CompletedProcess(args=[], returncode=1, stdout="")
+        with mock.patch("doppel.cache.subprocess.run", return_value=not_found):
+            self.assertIsNone(r_package_fingerprint("boombap"))
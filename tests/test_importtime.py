@@ -0,0 +1,83 @@
+import io
+import sys
+import unittest
+
+from doppel.importtime import (
+    ImportRecord,
+    _find_stdlib_modules,
+    package_imports,
+    parse_importtime,
+    write_report,
+)
+
+IMPORTTIME_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       221 |        221 |   _io
+import time:       470 |        691 | _frozen_importlib_external
+import time:       300 |        300 |     json.decoder
+import time:       100 |        400 |   json
+import time:      1500 |       1500 |     somedep
+import time:       200 |       1700 |   mypkg.core
+import time:      1000 |       3100 | mypkg
+import time:        50 |         50 | textwrap
+some warning written to stderr
+"""
+
+
+class TestImportTime(unittest.TestCase):
+    def test_parse_importtime(self):
+        """
+        parse_importtime() should parse every import and
+        return any other lines separately
+        """
+        records, other_lines = parse_importtime(IMPORTTIME_OUTPUT.splitlines(keepends=True))
+        self.assertEqual(len(records), 8)
+        self.assertEqual(
+            records[5],
+            ImportRecord(module="mypkg.core", self_us=200, cumulative_us=1700, depth=1),
+        )
+        self.assertEqual(other_lines, ["some warning written to stderr\n"])
+
+    def test_package_imports(self):
+        """
+        package_imports() should only keep the imports
+        triggered by importing the package
+        """
+        records, _ = parse_importtime(IMPORTTIME_OUTPUT.splitlines())
+        modules = [r.module for r in package_imports(records, "mypkg")]
+        self.assertEqual(modules, ["json.decoder", "json", "somedep", "mypkg.core", "mypkg"])
+        self.assertEqual(package_imports(records, "notimported"), [])
+
+    def test_write_report(self):
+        """
+        write_report() should include the total import time, time per
+        top-level package and modules sorted by cumulative time
+        """
+        records, _ = parse_importtime(IMPORTTIME_OUTPUT.splitlines())
+        out = io.StringIO()
+        write_report(records, pkg_name="mypkg", out=out)
+        report = out.getvalue()
+
+        self.assertIn("'import mypkg' took 3.1 ms", report)
+        self.assertNotIn("_frozen_importlib_external", report)
+        self.assertNotIn("textwrap", report)
+
+        by_package = report.split("By top-level package")[1].split("By module")[0]
+        by_module = report.split("By module")[1]
+        self.assertLess(by_package.index("somedep"), by_package.index("this package"))
+        self.assertLess(by_package.index("this package"), by_package.index("json"))
+        self.assertLess(by_module.index("mypkg.core"), by_module.index("somedep"))
+
+    def test_find_stdlib_modules(self):
+        """
+        _find_stdlib_modules() should find the standard library without
+        sys.stdlib_module_names, and nothing that was installed separately
+        """
+        modules = _find_stdlib_modules()
+        self.assertTrue({"json", "os", "sys", "textwrap", "xml", "_json"} <= modules)
+        self.assertNotIn("doppel", modules)
+        self.assertNotIn("pytest", modules)
+        if sys.version_info >= (3, 10):
+            self.assertEqual(
+                {name for name in modules - sys.stdlib_module_names if not name.startswith("_")},
+                {name for name in modules if name.startswith(("test", "xx"))},
+            )
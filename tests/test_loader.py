@@ -0,0 +1,76 @@
+import io
+import json
+import os
+import unittest
+
+from doppel import PackageAPI
+from doppel.loader import compact_package, read_package
+from doppel.PackageAPI import _read_only
+
+TESTDATA_DIR = os.path.join("tests", "testdata")
+
+
+class TestReadPackage(unittest.TestCase):
+    def test_matches_json(self):
+        """
+        read_package() should give the same result as parsing
+        the whole file, no matter how the file is split into chunks
+        """
+        for filename in os.listdir(TESTDATA_DIR):
+            with open(os.path.join(TESTDATA_DIR, filename), "r") as f:
+                text = f.read()
+            expected = compact_package(json.loads(text))
+            for chunk_size in [1, 2, 7, 64 * 1024]:
+                result = read_package(io.StringIO(text), chunk_size=chunk_size)
+                self.assertEqual(result, expected, msg=f"{filename}, chunk_size={chunk_size}")
+
+    def test_other_keys(self):
+        """
+        read_package() should keep values other than
+        functions and classes as they are
+        """
+        text = json.dumps(
+            {
+                "name": "pkg [python]",
+                "_meta": {"elapsed": 1.5e-3, "counts": [1, 22, 333]},
+                "language": "python",
+                "functions": {"f": {"args": ["x"]}, "g": {"args": ["x"]}},
+                "classes": {},
+            }
+        )
+        result = read_package(io.StringIO(text), chunk_size=3)
+        self.assertEqual(result["_meta"], {"elapsed": 1.5e-3, "counts": [1, 22, 333]})
+        self.assertEqual(result["functions"], {"f": ("x",), "g": ("x",)})
+
+        # identical argument lists should be shared
+        self.assertIs(result["functions"]["f"], result["functions"]["g"])
+
+    def test_invalid_json(self):
+        """
+        read_package() should reject files that aren't valid JSON
+        """
+        invalid = [
+            '{"name": "pkg"',
+            '{"name" "pkg"}',
+            '{"functions": {"f": {"args": [}}}',
+            '{"functions": {1: {"args": []}}}',
+        ]
+        for text in invalid:
+            with self.assertRaises(ValueError, msg=text):
+                read_package(io.StringIO(text), chunk_size=4)
+
+
+class TestPackageDict(unittest.TestCase):
+    def test_round_trip(self):
+        """
+        PackageAPI.pkg_dict should match the file
+        the package was read from, with read-only containers
+        """
+        for filename in os.listdir(TESTDATA_DIR):
+            path = os.path.join(TESTDATA_DIR, filename)
+            with open(path, "r") as f:
+                expected = json.load(f)
+            from_dict = PackageAPI(expected).pkg_dict
+            expected = _read_only(expected)
+            self.assertEqual(PackageAPI.from_json(path).pkg_dict, expected, msg=filename)
+            self.assertEqual(from_dict, expected, msg=filename)
@@ -0,0 +1,53 @@
+import io
+import unittest
+
+from doppel import memory
+from doppel.memory import MemoryReport, checkpoint
+
+
+class TestMemoryReport(unittest.TestCase):
+    def test_checkpoint_without_report(self):
+        """
+        checkpoint() should be a no-op when no memory report is being made
+        """
+        self.assertIsNone(memory._ACTIVE)
+        checkpoint("load")
+
+    def test_memory_report(self):
+        """
+        MemoryReport should report the memory allocated in
+        each phase, and the lines of code that allocated it
+        """
+        out = io.StringIO()
+        with MemoryReport(out=out) as report:
+            big_list = [str(i) for i in range(50_000)]
+            checkpoint("allocate")
+            del big_list
+            checkpoint("free")
+        self.assertIsNone(memory._ACTIVE)
+
+        phases = {p.name: p for p in report.phases}
+        self.assertEqual(list(phases), ["allocate", "free", "end"])
+        self.assertGreater(phases["allocate"].delta_bytes, 1_000_000)
+        self.assertLess(phases["free"].delta_bytes, -1_000_000)
+        self.assertGreaterEqual(phases["allocate"].peak_bytes, phases["allocate"].current_bytes)
+        top_site = phases["allocate"].top_sites[0].traceback[0]
+        self.assertEqual(top_site.filename, __file__)
+
+        text = out.getvalue()
+        self.assertIn("Memory per phase", text)
+        self.assertIn("allocate", text)
+        self.assertIn(f"{__file__}:", text)
+
+    def test_report_on_exit(self):
+        """
+        MemoryReport should still write its report if the block
+        raises an exception, like the SystemExit from doppel-test
+        """
+        out = io.StringIO()
+        with self.assertRaises(SystemExit):
+            with MemoryReport(out=out):
+                checkpoint("load")
+                raise SystemExit(1)
+        self.assertIsNone(memory._ACTIVE)
+        self.assertIn("load", out.getvalue())
@@ -0,0 +1,100 @@
+import copy
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from doppel import PackageAPI, SimpleReporter, metrics
+from doppel.metrics import Metrics, record
+from doppel.profiling import phase
+
+PACKAGE = {
+    "name": "pkg1",
+    "language": "python",
+    "functions": {"playback": {"args": ["bpm", "bass"]}},
+    "classes": {},
+}
+
+
+class TestMetrics(unittest.TestCase):
+    def test_record_without_metrics(self):
+        """
+        record() should be a no-op when no metrics are being collected
+        """
+        self.assertIsNone(metrics._ACTIVE)
+        record("errors", 1)
+
+    def test_missing_dir(self):
+        """
+        Metrics should fail right away if the directory doesn't exist
+        """
+        with self.assertRaisesRegex(RuntimeError, "does not exist"):
+            Metrics("/does/not/exist", command="test")
+
+    def test_metrics(self):
+        """
+        Metrics should write every metric recorded and the time
+        spent in each phase in the Prometheus text format
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with Metrics(tmp_dir, command="describe"):
+                record("functions", 1, language="python", package="pkg1")
+                record("functions", 3, language="python", package="pkg1")
+                record("functions", 2, language="r", package='a"b')
+                with phase("load"):
+                    pass
+            self.assertIsNone(metrics._ACTIVE)
+            self.assertEqual(os.listdir(tmp_dir), ["doppel_describe.prom"])
+            with open(os.path.join(tmp_dir, "doppel_describe.prom"), "r") as f:
+                lines = f.read().splitlines()
+
+        self.assertIn("# TYPE doppel_describe_functions gauge", lines)
+        self.assertIn('doppel_describe_functions{language="python",package="pkg1"} 3', lines)
+        self.assertIn('doppel_describe_functions{language="r",package="a\\"b"} 2', lines)
+        self.assertTrue(
+            any(line.startswith('doppel_describe_phase_seconds{phase="load"} ') for line in lines)
+        )
+        self.assertTrue(any(line.startswith("doppel_describe_duration_seconds ") for line in lines))
+        for line in lines:
+            if line.startswith("# HELP"):
+                self.assertGreater(len(line.split(" ", 3)[3]), 0)
+
+    def test_inconsistent_labels(self):
+        """
+        Metrics.record() should refuse to record a metric
+        with different label names than before
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            collected = Metrics(tmp_dir, command="describe")
+            collected.record("functions", 1, language="python", package="pkg1")
+            collected.record("functions", 2, package="pkg2", language="python")
+            with self.assertRaisesRegex(ValueError, "functions"):
+                collected.record("functions", 3, package="pkg3")
+        self.assertEqual(len(collected.samples), 2)
+
+    def test_test_metrics(self):
+        """
+        SimpleReporter should record the errors from each check
+        and the headroom under errors_allowed
+        """
+        pkg2 = copy.deepcopy(PACKAGE)
+        pkg2["name"] = "pkg2"
+        pkg2["functions"]["playback"]["args"] = ["bpm"]
+        reporter = SimpleReporter([PackageAPI(PACKAGE), PackageAPI(pkg2)], errors_allowed=3)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with Metrics(tmp_dir, command="test") as collected:
+                with mock.patch("doppel.reporters.stdout"), self.assertRaises(SystemExit):
+                    reporter.compare()
+
+        samples = collected.samples
+        check_errors = {
+            dict(labels)["check"]: value
+            for (name, labels), value in samples.items()
+            if name == "check_errors"
+        }
+        self.assertEqual(check_errors["function_names"], 0)
+        self.assertGreater(check_errors["function_args"], 0)
+        num_errors = sum(check_errors.values())
+        self.assertEqual(samples["errors", ()], num_errors)
+        self.assertEqual(samples["errors_allowed", ()], 3)
+        self.assertEqual(samples["error_headroom", ()], 3 - num_errors)
@@ -1,4 +1,6 @@
+import json
 import os
+import tempfile
 import unittest
 
 from doppel import PackageAPI
@@ -23,13 +25,13 @@ class TestPackageAPI(unittest.TestCase):
 
         self.assertEqual(pkg.name(), "boombap [python]")
         self.assertEqual(pkg.num_functions(), 1)
-        self.assertEqual(pkg.function_names(), ["playback"])
-        self.assertEqual(pkg.functions_with_args(), {"playback": {"args": ["bpm", "bass"]}})
+        self.assertEqual(pkg.function_names(), ("playback",))
+        self.assertEqual(pkg.functions_with_args(), {"playback": {"args": ("bpm", "bass")}})
         self.assertEqual(pkg.num_classes(), 1)
-        self.assertEqual(pkg.class_names(), ["LupeFiasco"])
-        self.assertEqual(pkg.public_methods("LupeFiasco"), ["coast", "~~CONSTRUCTOR~~"])
-        self.assertEqual(pkg.public_method_args("LupeFiasco", "~~CONSTRUCTOR~~"), ["kick", "push"])
-        self.assertEqual(pkg.public_method_args("LupeFiasco", "coast"), [])
+        self.assertEqual(pkg.class_names(), ("LupeFiasco",))
+        self.assertEqual(pkg.public_methods("LupeFiasco"), ("coast", "~~CONSTRUCTOR~~"))
+        self.assertEqual(pkg.public_method_args("LupeFiasco", "~~CONSTRUCTOR~~"), ("kick", "push"))
+        self.assertEqual(pkg.public_method_args("LupeFiasco", "coast"), ())
 
     def test_from_json_r(self):
         """
@@ -39,11 +41,82 @@ class TestPackageAPI(unittest.TestCase):
 
         self.assertEqual(pkg.name(), "boombap [r]")
         self.assertEqual(pkg.num_functions(), 1)
-        self.assertEqual(pkg.function_names(), ["playback"])
-        self.assertEqual(pkg.functions_with_args(), {"playback": {"args": ["bpm", "bass"]}})
+        self.assertEqual(pkg.function_names(), ("playback",))
+        self.assertEqual(pkg.functions_with_args(), {"playback": {"args": ("bpm", "bass")}})
         self.assertEqual(pkg.num_classes(), 1)
-        self.assertEqual(pkg.class_names(), ["LupeFiasco"])
-        self.assertEqual(pkg.public_methods("LupeFiasco"), ["coast", "words", "~~CONSTRUCTOR~~"])
-        self.assertEqual(pkg.public_method_args("LupeFiasco", "~~CONSTRUCTOR~~"), ["kick", "push"])
-        self.assertEqual(pkg.public_method_args("LupeFiasco", "coast"), [])
-        self.assertEqual(pkg.public_method_args("LupeFiasco", "words"), ["i_said", "i_never_said"])
+        self.assertEqual(pkg.class_names(), ("LupeFiasco",))
+        self.assertEqual(pkg.public_methods("LupeFiasco"), ("coast", "words", "~~CONSTRUCTOR~~"))
+        self.assertEqual(pkg.public_method_args("LupeFiasco", "~~CONSTRUCTOR~~"), ("kick", "push"))
+        self.assertEqual(pkg.public_method_args("LupeFiasco", "coast"), ())
+        self.assertEqual(pkg.public_method_args("LupeFiasco", "words"), ("i_said", "i_never_said"))
+
+    def test_membership(self):
+        """
+        PackageAPI.has_function(), has_class() and has_public_method()
+        should work as expected
+        """
+        pkg = PackageAPI.from_json(self.r_pkg_file)
+
+        self.assertTrue(pkg.has_function("playback"))
+        self.assertFalse(pkg.has_function("LupeFiasco"))
+        self.assertTrue(pkg.has_class("LupeFiasco"))
+        self.assertFalse(pkg.has_class("playback"))
+        self.assertTrue(pkg.has_public_method("LupeFiasco", "words"))
+        self.assertFalse(pkg.has_public_method("LupeFiasco", "playback"))
+        self.assertFalse(pkg.has_public_method("NotAClass", "words"))
+
+    def test_pkg_dict(self):
+        """
+        PackageAPI.pkg_dict should be a read-only copy of the dictionary
+        the package was created from, and setting it should replace the package
+        """
+        with open(self.py_pkg_file, "r") as f:
+            pkg_dict = json.load(f)
+        pkg = PackageAPI(pkg_dict)
+        self.assertEqual(pkg.pkg_dict["functions"], {"playback": {"args": ("bpm", "bass")}})
+        self.assertIs(pkg.functions_with_args(), pkg.functions_with_args())
+
+        # changing the package in place would leave its names out of date
+        with self.assertRaises(TypeError):
+            pkg.pkg_dict["functions"]["rewind"] = {"args": []}
+        with self.assertRaises(TypeError):
+            pkg.functions_with_args()["playback"]["args"] = []
+        with self.assertRaises(AttributeError):
+            pkg.functions_with_args()["playback"]["args"].append("drums")
+
+        # neither would changing the dictionary it was created from
+        pkg_dict["functions"]["rewind"] = {"args": []}
+        self.assertNotIn("rewind", pkg.pkg_dict["functions"])
+        self.assertEqual(pkg.function_names(), ("playback",))
+
+        with open(self.r_pkg_file, "r") as f:
+            r_pkg_dict = json.load(f)
+        pkg.pkg_dict = r_pkg_dict
+        self.assertEqual(
+            pkg.pkg_dict["classes"]["LupeFiasco"]["public_methods"]["coast"], {"args": ()}
+        )
+        self.assertEqual(pkg.name(), "boombap [r]")
+        self.assertEqual(pkg.public_methods("LupeFiasco"), ("coast", "words", "~~CONSTRUCTOR~~"))
+
+    def test_meta_is_ignored(self):
+        """
+        PackageAPI should ignore the optional '_meta' block
+        written by doppel-describe --timings
+        """
+        with open(self.py_pkg_file, "r") as f:
+            pkg_dict = json.load(f)
+        pkg_dict["_meta"] = {
+            "modules": {"boombap": {"seconds": 0.1, "attributes": 2}},
+            "classes": {"boombap.LupeFiasco": {"seconds": 0.05, "attributes": 30}},
+        }
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pkg_file = os.path.join(tmp_dir, "python_boombap.json")
+            with open(pkg_file, "w") as f:
+                json.dump(pkg_dict, f)
+            pkg = PackageAPI.from_json(pkg_file)
+
+        expected = PackageAPI.from_json(self.py_pkg_file)
+        self.assertEqual(pkg.function_names(), expected.function_names())
+        self.assertEqual(pkg.class_names(), expected.class_names())
+        self.assertEqual(pkg.functions_with_args(), expected.functions_with_args())
@@ -85,3 +85,70 @@ class TestPackageAPI(unittest.TestCase):
                 ]
             ),
         )
+
+
+def _package(name, functions, classes):
+    return PackageAPI(
+        {
+            "name": name,
+            "language": "python",
+            "functions": {f: {"args": []} for f in functions},
+            "classes": {
+                c: {"public_methods": {m: {"args": []} for m in methods}}
+                for c, methods in classes.items()
+            },
+        }
+    )
+
+
+class TestPackageCollectionQueries(unittest.TestCase):
+    def setUp(self):
+        self.pkg_collection = PackageCollection(
+            packages=[
+                _package("one", ["a", "b", "c"], {"X": ["m1", "m2"], "Y": []}),
+                _package("two", ["a", "b"], {"X": ["m1"]}),
+                _package("three", ["a", "d"], {"X": ["m1", "m3"], "Z": []}),
+            ]
+        )
+
+    def test_shared_and_non_shared(self):
+        """
+        PackageCollection should split symbols into those
+        present in all packages and those that are not
+        """
+        self.assertEqual(sorted(self.pkg_collection.all_functions()), ["a", "b", "c", "d"])
+        self.assertEqual(self.pkg_collection.shared_functions(), ["a"])
+        self.assertEqual(sorted(self.pkg_collection.non_shared_functions()), ["b", "c", "d"])
+        self.assertEqual(self.pkg_collection.shared_classes(), ["X"])
+        self.assertEqual(sorted(self.pkg_collection.non_shared_classes()), ["Y", "Z"])
+
+    def test_in_at_least(self):
+        """
+        PackageCollection should find symbols present
+        in at least k packages
+        """
+        self.assertEqual(sorted(self.pkg_collection.functions_in_at_least(2)), ["a", "b"])
+        self.assertEqual(self.pkg_collection.functions_in_at_least(3), ["a"])
+        self.assertEqual(self.pkg_collection.functions_in_at_least(4), [])
+        self.assertEqual(sorted(self.pkg_collection.classes_in_at_least(1)), ["X", "Y", "Z"])
+        self.assertEqual(self.pkg_collection.classes_in_at_least(2), ["X"])
+
+    def test_presence(self):
+        """
+        PackageCollection should report which packages
+        contain a symbol
+        """
+        self.assertEqual(self.pkg_collection.function_presence("b"), [True, True, False])
+        self.assertEqual(self.pkg_collection.function_presence("d"), [False, False, True])
+        self.assertEqual(self.pkg_collection.class_presence("Z"), [False, False, True])
+        self.assertEqual(self.pkg_collection.function_presence("nope"), [False, False, False])
+
+    def test_methods_by_class(self):
+        """
+        PackageCollection should compare public methods
+        of shared classes
+        """
+        self.assertEqual(self.pkg_collection.shared_methods_by_class(), {"X": ["m1"]})
+        non_shared = self.pkg_collection.non_shared_methods_by_class()
+        self.assertEqual(list(non_shared.keys()), ["X"])
+        self.assertEqual(sorted(non_shared["X"]), ["m2", "m3"])
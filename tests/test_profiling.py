@@ -0,0 +1,109 @@
+import io
+import os
+import pstats
+import tempfile
+import time
+import unittest
+
+from doppel import profiling
+from doppel.profiling import PhaseTimer, Profile, collect_phases, phase
+
+
+class TestPhaseTimer(unittest.TestCase):
+    def test_nested_phases(self):
+        """
+        PhaseTimer should not count time in a nested
+        phase towards the phase around it
+        """
+        timer = PhaseTimer()
+        with timer.phase("outer"):
+            with timer.phase("inner"):
+                time.sleep(0.05)
+        self.assertGreaterEqual(timer.timings["inner"], 0.05)
+        self.assertLess(timer.timings["outer"], 0.05)
+
+    def test_add(self):
+        """
+        PhaseTimer.add() should add to existing timings
+        """
+        timer = PhaseTimer()
+        timer.add({"load": 1.0})
+        timer.add({"load": 2.0, "render": 0.5})
+        self.assertEqual(timer.timings, {"load": 3.0, "render": 0.5})
+
+
+class TestProfile(unittest.TestCase):
+    def test_phase_without_profile(self):
+        """
+        phase() should be a no-op when nothing is being profiled
+        """
+        self.assertIsNone(profiling._ACTIVE)
+        with phase("load"):
+            pass
+
+    def test_profile(self):
+        """
+        Profile should write cProfile statistics and
+        a summary of the time spent in each phase
+        """
+        out = io.StringIO()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            stats_file = os.path.join(tmp_dir, "doppel.prof")
+            with Profile(stats_file, out=out) as prof:
+                with phase("load"):
+                    sorted(range(1000))
+            self.assertIsNone(profiling._ACTIVE)
+            self.assertIn("load", prof.timer.timings)
+            self.assertTrue(pstats.Stats(stats_file).total_calls > 0)
+
+        summary = out.getvalue()
+        self.assertIn("Time per phase", summary)
+        self.assertIn("load", summary)
+        self.assertIn("other", summary)
+
+    def test_add_child(self):
+        """
+        Profile should merge in the statistics and
+        phase timings written by child processes
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            child_file = os.path.join(tmp_dir, "child.prof")
+            child = Profile(child_file, out=io.StringIO())
+            with child:
+                sorted(range(1000))
+            with open(f"{child_file}.phases.json", "w") as f:
+                f.write('{"import": 1.5}')
+
+            stats_file = os.path.join(tmp_dir, "doppel.prof")
+            with Profile(stats_file, out=io.StringIO()) as prof:
+                profiling.add_child(child_file)
+                profiling.add_child(os.path.join(tmp_dir, "does-not-exist.prof"))
+
+            self.assertEqual(prof.timer.timings, {"import": 1.5})
+            functions = [func for _, _, func in pstats.Stats(stats_file).stats]
+            self.assertIn("<built-in method builtins.sorted>", functions)
+
+    def test_add_timings(self):
+        """
+        add_timings() should add to the current profile's
+        phases, and do nothing when the run isn't profiled
+        """
+        profiling.add_timings({"describe": 2.0})
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            stats_file = os.path.join(tmp_dir, "doppel.prof")
+            with Profile(stats_file, out=io.StringIO()) as prof:
+                profiling.add_timings({"describe": 1.0})
+                profiling.add_timings({"describe": 0.5, "import": 0.25})
+        self.assertEqual(prof.timer.timings, {"describe": 1.5, "import": 0.25})
+
+    def test_collect_phases(self):
+        """
+        collect_phases() should time phases whether or not the run is profiled
+        """
+        timer = PhaseTimer()
+        with collect_phases(timer):
+            with phase("load"):
+                pass
+        with phase("render"):
+            pass
+        self.assertEqual(list(timer.timings), ["load"])
@@ -1,9 +1,15 @@
 import copy
+import importlib.util
+import io
+import json
 import re
 import unittest
 from typing import Any, Dict
+from unittest import mock
+from xml.etree import ElementTree
 
 from doppel import DoppelTestError, PackageAPI, SimpleReporter
+from doppel.reporters import JSONLinesReporter, JUnitXMLReporter, _OutputTable
 
 BASE_PACKAGE: Dict[str, Any] = {
     "name": "pkg1",
@@ -305,6 +311,22 @@ class TestSimpleReporter(unittest.TestCase):
             )
         )
 
+    def test_name_checks_are_sorted(self):
+        """
+        SimpleReporter should report functions and classes
+        missing from some packages in sorted order
+        """
+        reporter = SimpleReporter(
+            pkgs=[PackageAPI(PACKAGE_EMPTY), PackageAPI(PACKAGE_BEEFY)],
+            errors_allowed=100,
+        )
+        reporter._check_function_names()
+        reporter._check_class_names()
+        missing = [re.search("'(.*?)(\\(\\))?'", err.msg).group(1) for err in reporter.errors]
+        functions = sorted(PACKAGE_BEEFY["functions"].keys())
+        classes = sorted(PACKAGE_BEEFY["classes"].keys())
+        self.assertEqual(missing, functions + classes)
+
     def test_totally_empty(self):
         """
         SimpleReporter should be fine if two packages
@@ -493,3 +515,169 @@ class TestSimpleReporter(unittest.TestCase):
                 ]
             )
         )
+
+
+class TestOutputTable(unittest.TestCase):
+    def _write(self, **kwargs):
+        out = io.StringIO()
+        with mock.patch("doppel.reporters.stdout", out):
+            _OutputTable(**kwargs).write()
+        return out.getvalue()
+
+    def test_grid(self):
+        """
+        _OutputTable should write a grid, with numeric
+        columns right-aligned
+        """
+        result = self._write(headers=["name", "pkg1"], rows=iter([["a", 1], ["bcdefg", 22]]))
+        expected = (
+            "+--------+--------+\n"
+            "| name   |   pkg1 |\n"
+            "+========+========+\n"
+            "| a      |      1 |\n"
+            "+--------+--------+\n"
+            "| bcdefg |     22 |\n"
+            "+--------+--------+\n"
+        )
+        self.assertEqual(result, expected)
+
+    def test_fixed_widths(self):
+        """
+        _OutputTable should use column widths it is given
+        """
+        result = self._write(headers=["x", "y"], rows=iter([["a", "yes"]]), widths=[4, 3])
+        expected = (
+            "+------+-----+\n| x    | y   |\n+======+=====+\n| a    | yes |\n+------+-----+\n"
+        )
+        self.assertEqual(result, expected)
+
+    @unittest.skipIf(importlib.util.find_spec("tabulate") is None, "tabulate is not installed")
+    def test_matches_tabulate(self):
+        """
+        _OutputTable should write the same tables with
+        the built-in formatter and with tabulate
+        """
+        tables = [
+            {"headers": ["function_name", "pkg1", "pkg2"], "rows": [["f", "yes", "no"]]},
+            {"headers": ["function_name", "pkg1"], "rows": []},
+            {"headers": ["pkg1", "some_other_package"], "rows": [[10, 2]]},
+            {"headers": ["class.method", "identical api?"], "rows": [["A.b()", "no"], ["C", None]]},
+            {"headers": ["x", "y"], "rows": [[1.5, 3], [22.25, 10], [3, None], [-0.125, 7]]},
+            {"headers": ["f"], "rows": [[0.123456789], [1e10], [12345678], [float("nan")]]},
+            {"headers": ["name", "n"], "rows": [["b\nccc", 1], [" padded ", 22], [True, 3]]},
+            {"headers": ["two\nlines", "pkg"], "rows": [["a", "yes"]]},
+            {"headers": [], "rows": []},
+            # more lines than are buffered before writing
+            {"headers": ["i", "name"], "rows": [[i, f"f{i}"] for i in range(1500)]},
+        ]
+        for table in tables:
+            self.assertEqual(
+                self._write(**table, formatter="builtin"),
+                self._write(**table, formatter="tabulate"),
+                msg=str(table),
+            )
+
+    @unittest.skipIf(
+        importlib.util.find_spec("tabulate") is None or importlib.util.find_spec("wcwidth") is None,
+        "tabulate and wcwidth are not installed",
+    )
+    def test_wide_characters_match_tabulate(self):
+        """
+        _OutputTable should measure wide characters the same
+        way as tabulate does with wcwidth installed
+        """
+        table = {
+            "headers": ["関数", "pkg1"],
+            "rows": [["日本語", "yes"], ["cafe\u0301", "no"], ["ｆｕｌｌ", None]],
+        }
+        self.assertEqual(
+            self._write(**table, formatter="builtin"),
+            self._write(**table, formatter="tabulate"),
+        )
+
+    def test_tabulate_not_installed(self):
+        """
+        SimpleReporter should say so when asked to use
+        tabulate but it isn't installed
+        """
+        with mock.patch("doppel.reporters.tabulate", None):
+            with self.assertRaisesRegex(ImportError, "pip install tabulate"):
+                SimpleReporter(
+                    pkgs=[PackageAPI(BASE_PACKAGE)], errors_allowed=0, table_formatter="tabulate"
+                )
+
+    def test_unknown_formatter(self):
+        """
+        SimpleReporter should reject unknown table formatters
+        """
+        with self.assertRaisesRegex(ValueError, "Unknown table formatter 'html'"):
+            SimpleReporter(
+                pkgs=[PackageAPI(BASE_PACKAGE)], errors_allowed=0, table_formatter="html"
+            )
+
+
+class TestStreamingReporters(unittest.TestCase):
+    def _compare(self, reporters):
+        reporter = SimpleReporter(
+            pkgs=[PackageAPI(PACKAGE_BEEFY), PackageAPI(PACKAGE_SUPER_DIFFERENT)],
+            errors_allowed=100,
+            reporters=reporters,
+        )
+        reporter._respond = lambda: None
+        with mock.patch("doppel.reporters.stdout", io.StringIO()):
+            reporter.compare()
+        return reporter.errors
+
+    def test_jsonl_and_junit(self):
+        """
+        SimpleReporter should send every error to all the
+        reporters passed to it, tagged with the check that found it
+        """
+        jsonl = io.StringIO()
+        junit = io.StringIO()
+        errors = self._compare([JSONLinesReporter(jsonl), JUnitXMLReporter(junit)])
+        self.assertTrue(len(errors) > 0)
+        self.assertTrue(all(err.check is not None for err in errors))
+
+        events = [json.loads(line) for line in jsonl.getvalue().splitlines()]
+        self.assertEqual(events[0]["event"], "start")
+        self.assertEqual(
+            [(e["check"], e["message"]) for e in events if e["event"] == "error"],
+            [(err.check, err.msg) for err in errors],
+        )
+        checks = [e for e in events if e["event"] == "check"]
+        self.assertEqual(len(checks), 7)
+        self.assertEqual(sum(e["errors"] for e in checks), len(errors))
+        self.assertEqual(
+            events[-1],
+            {"event": "summary", "errors": len(errors), "errors_allowed": 100, "passed": True},
+        )
+
+        suite = ElementTree.fromstring(junit.getvalue()).find("testsuite")
+        failures = [case for case in suite.iter("testcase") if case.find("failure") is not None]
+        self.assertEqual([case.get("name") for case in failures], [err.msg for err in errors])
+        self.assertEqual(failures[0].get("classname"), f"doppel.{errors[0].check}")
+        num_passed = sum(1 for check in checks if check["errors"] == 0)
+        self.assertEqual(suite.get("failures"), str(len(errors)))
+        self.assertEqual(suite.get("tests"), str(len(errors) + num_passed))
+        self.assertEqual(suite.get("errors"), "0")
+
+    def test_junit_illegal_characters(self):
+        """
+        JUnitXMLReporter should drop characters that XML
+        can't contain, so the output still parses
+        """
+        junit = io.StringIO()
+        reporter = JUnitXMLReporter(junit)
+        reporter.start(["pkg\x00"])
+        reporter.add_error(DoppelTestError("\x1b[31mbad\x1b[0m \x00name\ufffe", check="function"))
+        reporter.end_check("function", 1)
+        reporter.end_check("class", 0)
+        reporter.finish(num_errors=1, errors_allowed=0)
+
+        root = ElementTree.fromstring(junit.getvalue())
+        self.assertEqual((root.get("tests"), root.get("failures")), ("2", "1"))
+        suite = root.find("testsuite")
+        self.assertEqual(suite.get("name"), "doppel-test: pkg")
+        names = [case.get("name") for case in suite.iter("testcase")]
+        self.assertEqual(names, ["[31mbad[0m name", "class"])
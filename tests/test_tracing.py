@@ -0,0 +1,170 @@
+import importlib.util
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from doppel import tracing
+from doppel.profiling import phase
+from doppel.tracing import TRACE_ENV_VAR, Trace, span
+
+
+def _write_trace(trace_file, name):
+    with Trace(trace_file, name=name):
+        pass
+
+
+class TestTrace(unittest.TestCase):
+    def test_span_without_trace(self):
+        """
+        span() and child_env() should be no-ops when nothing is being traced
+        """
+        self.assertIsNone(tracing._ACTIVE)
+        with span("load"):
+            pass
+        self.assertIsNone(tracing.child_env("events.json"))
+        self.assertIsNone(tracing.thread_ids())
+
+    def test_trace(self):
+        """
+        Trace should write a span for the whole run, every span() and
+        every profiling phase as Chrome trace events
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            trace_file = os.path.join(tmp_dir, "trace.json")
+            with Trace(trace_file, name="doppel-test"):
+                with span("describe", pkg="testpkg"):
+                    with phase("load"):
+                        pass
+            self.assertIsNone(tracing._ACTIVE)
+            with open(trace_file, "r") as f:
+                events = {e["name"]: e for e in json.load(f)["traceEvents"]}
+
+        self.assertEqual(events["process_name"]["args"], {"name": "doppel-test"})
+        self.assertEqual(events["describe"]["args"], {"pkg": "testpkg"})
+        outer = events["doppel-test"]
+        inner = events["load"]
+        self.assertEqual((inner["pid"], inner["tid"]), (outer["pid"], outer["tid"]))
+        self.assertGreaterEqual(inner["ts"], outer["ts"])
+        self.assertLessEqual(inner["ts"] + inner["dur"], outer["ts"] + outer["dur"])
+
+    def test_add_to_existing_trace(self):
+        """
+        Trace should keep the events already in the file it writes to
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            trace_file = os.path.join(tmp_dir, "trace.json")
+            with Trace(trace_file, name="doppel-describe"):
+                pass
+            with Trace(trace_file, name="doppel-test"):
+                pass
+            with open(trace_file, "r") as f:
+                names = [e["name"] for e in json.load(f)["traceEvents"] if e["ph"] == "X"]
+        self.assertEqual(names, ["doppel-describe", "doppel-test"])
+
+    def test_add_to_array_trace(self):
+        """
+        Trace should keep the events in a file in the JSON
+        array format, with or without the closing bracket
+        """
+        event = {"name": "earlier", "ph": "X", "ts": 1, "dur": 1, "pid": 1, "tid": 1}
+        for contents in [json.dumps([event]), json.dumps([event])[:-1] + ",\n"]:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                trace_file = os.path.join(tmp_dir, "trace.json")
+                with open(trace_file, "w") as f:
+                    f.write(contents)
+                with Trace(trace_file, name="doppel-test"):
+                    pass
+                with open(trace_file, "r") as f:
+                    names = [e["name"] for e in json.load(f)["traceEvents"] if e["ph"] == "X"]
+            self.assertEqual(names, ["earlier", "doppel-test"], msg=contents)
+
+    def test_read_empty_trace(self):
+        """
+        Trace should write a new trace to an empty file, and
+        keep the file when writing the trace fails
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            trace_file = os.path.join(tmp_dir, "trace.json")
+            open(trace_file, "w").close()
+            with Trace(trace_file, name="doppel-test"):
+                tracing.add_events([{"name": "analyze", "ph": "X", "ts": 1, "dur": 1}])
+            with open(trace_file, "r") as f:
+                names = [e["name"] for e in json.load(f)["traceEvents"]]
+            self.assertEqual(names, ["analyze", "doppel-test", "process_name"])
+
+            with mock.patch("doppel.tracing.os.replace", side_effect=OSError("disk full")):
+                with self.assertRaisesRegex(OSError, "disk full"):
+                    with Trace(trace_file, name="doppel-describe"):
+                        pass
+            with open(trace_file, "r") as f:
+                self.assertEqual(len(json.load(f)["traceEvents"]), 3)
+            # the lock is released even though writing failed
+            with Trace(trace_file, name="doppel-describe"):
+                pass
+
+    def test_windows_lock(self):
+        """
+        Trace should lock the trace with msvcrt on Windows
+        """
+        msvcrt = mock.Mock(LK_LOCK=1, LK_UNLCK=0)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            trace_file = os.path.join(tmp_dir, "trace.json")
+            with mock.patch.object(sys, "platform", "win32"), mock.patch.dict(
+                sys.modules, {"msvcrt": msvcrt}
+            ):
+                spec = importlib.util.spec_from_file_location("windows_tracing", tracing.__file__)
+                windows_tracing = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(windows_tracing)
+                with windows_tracing.Trace(trace_file, name="doppel-test"):
+                    pass
+            self.assertTrue(os.path.isfile(trace_file))
+        lock_call, unlock_call = msvcrt.locking.call_args_list
+        self.assertEqual(lock_call.args[1:], (msvcrt.LK_LOCK, 1))
+        self.assertEqual(unlock_call.args[1:], (msvcrt.LK_UNLCK, 1))
+        self.assertEqual(lock_call.args[0], unlock_call.args[0])
+
+    def test_concurrent_writes(self):
+        """
+        Runs that write to the same trace at the same time
+        should not lose each other's events
+        """
+        names = [f"run-{i}" for i in range(8)]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            trace_file = os.path.join(tmp_dir, "trace.json")
+            processes = [
+                multiprocessing.Process(target=_write_trace, args=(trace_file, name))
+                for name in names
+            ]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            with open(trace_file, "r") as f:
+                events = json.load(f)["traceEvents"]
+            self.assertFalse([p for p in os.listdir(tmp_dir) if p.endswith(".tmp")])
+        self.assertEqual(sorted(e["name"] for e in events if e["ph"] == "X"), names)
+
+    def test_add_child(self):
+        """
+        Trace should tell child processes where to write their events and
+        which thread to put them on, and add the events they wrote
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            trace_file = os.path.join(tmp_dir, "trace.json")
+            child_file = os.path.join(tmp_dir, "child.json")
+            with Trace(trace_file, name="doppel-describe"):
+                context = json.loads(tracing.child_env(child_file)[TRACE_ENV_VAR])
+                self.assertEqual(context["file"], child_file)
+                self.assertEqual(context, {"file": child_file, **tracing.thread_ids()})
+                with open(child_file, "w") as f:
+                    event = {"name": "import", "ph": "X", "ts": 1, "dur": 1, "pid": 1, "tid": 1}
+                    json.dump([event], f)
+                tracing.add_child(child_file)
+                tracing.add_child(os.path.join(tmp_dir, "does-not-exist.json"))
+            with open(trace_file, "r") as f:
+                names = [e["name"] for e in json.load(f)["traceEvents"]]
+        self.assertIn("import", names)